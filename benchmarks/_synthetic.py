@@ -0,0 +1,56 @@
+"""Deterministic synthetic clipboard histories shared by the benchmarks."""
+
+import random
+import string
+from datetime import datetime, timedelta
+
+_BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        length = rng.randint(3, 11)
+        words.add("".join(rng.choices(string.ascii_lowercase, k=length)))
+    return sorted(words)
+
+
+def make_history(count, seed=1234, vocabulary_size=5000):
+    """Returns *count* clipse-style items, newest first.
+
+    Entries mix prose drawn from a shared vocabulary with the unique tokens
+    real histories are full of (hashes, paths, URLs, log lines), so the
+    number of distinct words keeps growing with the history like it does in
+    practice. Roughly one entry in fifty is an image with a real `filePath`;
+    text entries carry clipse's literal "null" placeholder.
+    """
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, vocabulary_size)
+    items = []
+    for i in range(count):
+        kind = rng.random()
+        file_path = "null"
+        if kind < 0.02:
+            name = f"{rng.choice(vocabulary)}_{i}.png"
+            value = name
+            file_path = f"/home/user/.config/clipse/tmp_files/{name}"
+        elif kind < 0.15:
+            value = f"https://example.com/{rng.choice(vocabulary)}/{i:x}?ref={rng.choice(vocabulary)}"
+        elif kind < 0.30:
+            lines = [
+                f"{_BASE_TIME.isoformat()} ERROR {rng.choice(vocabulary)}: "
+                f"request {rng.getrandbits(48):012x} failed after {rng.randint(1, 999)}ms"
+                for _ in range(rng.randint(2, 12))
+            ]
+            value = "\n".join(lines)
+        else:
+            value = " ".join(rng.choices(vocabulary, k=rng.randint(1, 40)))
+        items.append(
+            {
+                "value": value,
+                "recorded": (_BASE_TIME - timedelta(seconds=i)).isoformat(),
+                "filePath": file_path,
+                "pinned": rng.random() < 0.01,
+            }
+        )
+    return items
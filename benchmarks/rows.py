@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""List row throughput: building fresh row widgets against rebinding pooled ones.
+
+Shows a synthetic history in screenfuls, the way the list view replaces its
+rows on every search keystroke, once with `create_list_row_widget` building
+every row and once with a `RowPool` rebinding the rows the previous screenful
+released. Thumbnails are not loaded, so only widget work is timed. Each run
+starts with an empty display model cache, so both pay for working out what
+the rows show.
+
+Needs GTK 3 and a display (run it from a desktop session, or under
+`xvfb-run`).
+
+Usage (from the repository root):
+    python -m benchmarks.rows
+    python -m benchmarks.rows --rows 5000 --page 40 --compact
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from gi.repository import Gtk
+
+from benchmarks._synthetic import make_history
+from clipse_gui.ui import list_row
+from clipse_gui.ui.list_row import RowPool, create_list_row_widget
+
+
+class _NoImages:
+    """Image handler that never loads anything."""
+
+    def _skip(self, *args):
+        pass
+
+    load_image_async = load_remote_image_async = _skip
+    load_data_uri_async = load_svg_async = _skip
+
+
+def _no_update(*args):
+    return False
+
+
+def _pages(items, page):
+    for start in range(0, len(items), page):
+        yield [
+            {"item": item, "filtered_index": start + offset}
+            for offset, item in enumerate(items[start : start + page])
+        ]
+
+
+def _run(items, page, make_row, release_row):
+    list_box = Gtk.ListBox()
+    list_row._row_display.cache_clear()
+    start = time.perf_counter()
+    for infos in _pages(items, page):
+        for row in list_box.get_children():
+            list_box.remove(row)
+            release_row(row)
+        for info in infos:
+            list_box.add(make_row(info))
+        list_box.show_all()
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--page", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args()
+
+    items = make_history(args.rows)
+    handler = _NoImages()
+
+    def fresh(info):
+        return create_list_row_widget(info, handler, _no_update, args.compact)
+
+    def drop(row):
+        pass
+
+    fresh_rates = []
+    pooled_rates = []
+    for _ in range(args.repeat):
+        fresh_rates.append(_run(items, args.page, fresh, drop))
+        pool = RowPool(handler, _no_update)
+        pooled_rates.append(
+            _run(
+                items,
+                args.page,
+                lambda info, pool=pool: pool.acquire(info, args.compact),
+                pool.release,
+            )
+        )
+
+    fresh_rate = statistics.median(fresh_rates)
+    pooled_rate = statistics.median(pooled_rates)
+    print(f"{args.rows:,} rows in screenfuls of {args.page}")
+    print(f"  {'fresh':<8} {fresh_rate:10,.0f} rows/s")
+    print(f"  {'pooled':<8} {pooled_rate:10,.0f} rows/s")
+    print(f"  {'speedup':<8} {pooled_rate / fresh_rate:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
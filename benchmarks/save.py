@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""History save time and file size: indented JSON against compact JSON.
+
+Saves a synthetic history the way a full `DataManager` save does (encode,
+write, fsync, atomic replace) in both formats `compact_history_json`
+selects between, and times parsing the result back, which is what clipse
+and the next startup pay for the file.
+
+Usage (from the repository root):
+    python -m benchmarks.save
+    python -m benchmarks.save --sizes 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from benchmarks._synthetic import make_history
+from clipse_gui.data_manager import DataManager
+
+
+def _time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _parse(path):
+    with open(path, "r", encoding="utf-8") as f:
+        json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = DataManager()
+        manager.file_path = os.path.join(directory, "clipboard_history.json")
+        manager.snapshot_path = None
+        manager.journal = None
+
+        for size in args.sizes:
+            items = make_history(size)
+            print(f"{size:,} entries")
+            print(f"  {'format':<10} {'save':>10} {'parse':>10} {'size':>10}")
+            results = {}
+            for label, compact in (("indented", False), ("compact", True)):
+                manager.compact_json = compact
+                save = _time(partial(manager._write_history, items, None), args.repeat)
+                parse = _time(partial(_parse, manager.file_path), args.repeat)
+                megabytes = os.path.getsize(manager.file_path) / 1e6
+                results[label] = (save, parse, megabytes)
+                print(
+                    f"  {label:<10} {save:7.1f} ms {parse:7.1f} ms {megabytes:7.1f} MB"
+                )
+            ratios = [
+                compact / indented
+                for indented, compact in zip(results["indented"], results["compact"])
+            ]
+            print(
+                f"  {'ratio':<10} {ratios[0]:10.2f} {ratios[1]:10.2f} {ratios[2]:10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Per-keystroke search latency on synthetic histories.
+
+Simulates typing a few queries one character at a time and reports the median
+and worst `fuzzy_search` call for the indexed path, next to the original
+linear scan for the sizes where running it is still practical.
+
+Usage (from the repository root):
+    python -m benchmarks.search_latency
+    python -m benchmarks.search_latency --sizes 10000 100000 --linear-limit 0
+    python -m benchmarks.search_latency --sizes 100000 --processes 4
+    python -m benchmarks.search_latency --fuzzy-matcher edit_distance
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from benchmarks._synthetic import make_history
+from clipse_gui.search_index import SearchIndex
+from clipse_gui.search_pool import SearchPool
+from clipse_gui.utils import FUZZY_MATCHERS, fuzzy_search
+
+QUERIES = ["request", "example.com", "error fail", "png"]
+# Ranked up front, like the first page of rows the app shows
+TOP_K = 30
+
+
+def _keystrokes(query):
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def _time_queries(items, search_index, fuzzy_matcher="charset"):
+    timings = []
+    for query in QUERIES:
+        for term in _keystrokes(query):
+            start = time.perf_counter()
+            fuzzy_search(
+                items,
+                term,
+                search_index=search_index,
+                top_k=TOP_K,
+                fuzzy_matcher=fuzzy_matcher,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _row(label, timings):
+    return f"  {label:<10} median {statistics.median(timings):9.2f} ms   max {max(timings):9.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--linear-limit",
+        type=int,
+        default=100_000,
+        help="largest history to also time with the unindexed linear scan",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="also time the worker-process backend with this many processes",
+    )
+    parser.add_argument("--fuzzy-matcher", choices=FUZZY_MATCHERS, default="charset")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        items = make_history(size)
+        index = SearchIndex(fuzzy_matcher=args.fuzzy_matcher)
+        start = time.perf_counter()
+        index.sync(items)
+        build_s = time.perf_counter() - start
+
+        print(f"{size:,} entries — index build {build_s:.2f} s")
+        print(_row("indexed", _time_queries(items, index)))
+        if args.processes:
+            pool = SearchPool(args.processes, fuzzy_matcher=args.fuzzy_matcher)
+            try:
+                start = time.perf_counter()
+                pool.sync(items)
+                pool.search(["warmup"])
+                print(
+                    f"  pool of {args.processes} ready in {time.perf_counter() - start:.2f} s"
+                )
+                print(_row("processes", _time_queries(items, pool)))
+            finally:
+                pool.stop()
+        if size <= args.linear_limit:
+            print(_row("linear", _time_queries(items, None, args.fuzzy_matcher)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""History load time at startup: cold JSON parse against a warm snapshot.
+
+Writes a synthetic history in the layout clipse-gui saves, then times
+`DataManager.load_history` with no snapshot (parsing the JSON and writing
+the snapshot) and with the snapshot in place. Preparing the search fields is
+part of both loads, so the reading step alone is timed as well.
+
+Usage (from the repository root):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --sizes 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from benchmarks._synthetic import make_history
+from clipse_gui.data_manager import DataManager
+from clipse_gui.history_snapshot import load_snapshot
+
+
+def _time(function, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _row(label, timings):
+    return f"  {label:<16} median {statistics.median(timings):9.1f} ms   max {max(timings):9.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = DataManager()
+        manager.file_path = os.path.join(directory, "clipboard_history.json")
+        manager.snapshot_path = os.path.join(directory, "history_snapshot.bin")
+
+        for size in args.sizes:
+            items = make_history(size)
+            with open(manager.file_path, "w", encoding="utf-8") as f:
+                json.dump({"clipboardHistory": items}, f, indent=2, ensure_ascii=False)
+
+            def drop_snapshot():
+                manager.search_fields.clear()
+                if os.path.exists(manager.snapshot_path):
+                    os.remove(manager.snapshot_path)
+
+            cold = _time(manager.load_history, args.repeat, setup=drop_snapshot)
+            warm = _time(
+                manager.load_history, args.repeat, setup=manager.search_fields.clear
+            )
+            parse = _time(
+                lambda: [
+                    item for chunk in manager.iter_history_chunks() for item in chunk
+                ],
+                args.repeat,
+            )
+            read = _time(
+                lambda: load_snapshot(manager.snapshot_path, manager.snapshot_key()),
+                args.repeat,
+            )
+            print(
+                f"{size:,} entries — history {os.path.getsize(manager.file_path) / 1e6:.1f} MB, "
+                f"snapshot {os.path.getsize(manager.snapshot_path) / 1e6:.1f} MB"
+            )
+            print(_row("cold (JSON)", cold))
+            print(_row("warm (snapshot)", warm))
+            print(_row("JSON parse only", parse))
+            print(_row("snapshot only", read))
+
+
+if __name__ == "__main__":
+    main()
@@ -309,16 +309,14 @@ class ClipseGuiApplication(Gtk.Application):
     def do_shutdown(self):
         """Called when the application is shutting down."""
         log.debug(f"Application {APPLICATION_ID} shutting down.")
-        # Ensure any pending save is triggered before exiting
-        if (
-            self.controller
-            and hasattr(self.controller, "_save_timer_id")
-            and self.controller._save_timer_id
-        ):
-            GLib.source_remove(self.controller._save_timer_id)
-            log.info("Removed pending save timer on shutdown.")
-            if hasattr(self.controller, "_trigger_save"):
-                self.controller._trigger_save()
+        # Write any pending edit before exiting
+        if self.controller and hasattr(self.controller, "flush_history"):
+            self.controller.flush_history()
+
+        if self.controller and hasattr(self.controller, "search_worker"):
+            self.controller.search_worker.stop()
+        if self.controller and getattr(self.controller, "search_pool", None):
+            self.controller.search_pool.stop()
 
         # Cleanup tray resources
         if self.tray_manager:
@@ -26,6 +26,7 @@ DEFAULT_SETTINGS = {
         "highlight_search": "True",
         "save_debounce_ms": "300",
         "search_debounce_ms": "250",
+        "history_debounce_ms": "100",
         "paste_simulation_delay_ms": "150",
         "minimize_to_tray": "True",
         "tray_items_count": "20",
@@ -33,6 +34,7 @@ DEFAULT_SETTINGS = {
         "open_links_with_browser": "True",
         "preview_rich_content": "True",
         "clear_search_on_escape": "True",
+        "fuzzy_matcher": "charset",
     },
     "Style": {
         "border_radius": "6",
@@ -63,9 +65,17 @@ DEFAULT_SETTINGS = {
     },
     "Performance": {
         "initial_load_count": "30",
-        "load_batch_size": "20",
-        "load_threshold_factor": "0.95",
+        "row_overscan": "10",
+        "row_build_budget_ms": "8",
         "image_cache_max_size": "50",
+        "search_cache_size": "32",
+        "search_max_chars": "100000",
+        "search_processes": "0",
+        "search_process_min_items": "50000",
+        "history_snapshot": "True",
+        "save_journal_max_entries": "200",
+        "save_journal_compact_s": "30",
+        "compact_history_json": "False",
     },
 }
 
@@ -90,6 +100,7 @@ HOVER_TO_SELECT = config.getboolean("General", "hover_to_select", fallback=False
 HIGHLIGHT_SEARCH = config.getboolean("General", "highlight_search", fallback=True)
 SAVE_DEBOUNCE_MS = config.getint("General", "save_debounce_ms", fallback=300)
 SEARCH_DEBOUNCE_MS = config.getint("General", "search_debounce_ms", fallback=250)
+HISTORY_DEBOUNCE_MS = config.getint("General", "history_debounce_ms", fallback=100)
 PASTE_SIMULATION_DELAY_MS = config.getint(
     "General", "paste_simulation_delay_ms", fallback=150
 )
@@ -105,6 +116,10 @@ PREVIEW_RICH_CONTENT = config.getboolean("General", "preview_rich_content", fall
 CLEAR_SEARCH_ON_ESCAPE = config.getboolean(
     "General", "clear_search_on_escape", fallback=True
 )
+FUZZY_MATCHER = config.get("General", "fuzzy_matcher", fallback="charset").strip()
+if FUZZY_MATCHER not in ("charset", "edit_distance"):
+    log.warning(f"Unknown fuzzy_matcher '{FUZZY_MATCHER}', using 'charset'.")
+    FUZZY_MATCHER = "charset"
 
 # Style settings
 BORDER_RADIUS = config.getint("Style", "border_radius", fallback=6)
@@ -150,11 +165,27 @@ LIST_ITEM_IMAGE_WIDTH = config.getint("UI", "list_item_image_width", fallback=20
 LIST_ITEM_IMAGE_HEIGHT = config.getint("UI", "list_item_image_height", fallback=100)
 
 INITIAL_LOAD_COUNT = config.getint("Performance", "initial_load_count", fallback=30)
-LOAD_BATCH_SIZE = config.getint("Performance", "load_batch_size", fallback=20)
-LOAD_THRESHOLD_FACTOR = config.getfloat(
-    "Performance", "load_threshold_factor", fallback=0.95
-)
+ROW_OVERSCAN = config.getint("Performance", "row_overscan", fallback=10)
+ROW_BUILD_BUDGET_MS = config.getint("Performance", "row_build_budget_ms", fallback=8)
 IMAGE_CACHE_MAX_SIZE = config.getint("Performance", "image_cache_max_size", fallback=50)
+SEARCH_CACHE_SIZE = config.getint("Performance", "search_cache_size", fallback=32)
+SEARCH_MAX_CHARS = config.getint("Performance", "search_max_chars", fallback=100000)
+SEARCH_PROCESSES = config.getint("Performance", "search_processes", fallback=0)
+SEARCH_PROCESS_MIN_ITEMS = config.getint(
+    "Performance", "search_process_min_items", fallback=50000
+)
+HISTORY_SNAPSHOT = config.getboolean("Performance", "history_snapshot", fallback=True)
+HISTORY_SNAPSHOT_PATH = os.path.join(CONFIG_DIR, "history_snapshot.bin")
+SAVE_JOURNAL_MAX_ENTRIES = config.getint(
+    "Performance", "save_journal_max_entries", fallback=200
+)
+SAVE_JOURNAL_COMPACT_S = config.getint(
+    "Performance", "save_journal_compact_s", fallback=30
+)
+HISTORY_JOURNAL_PATH = os.path.join(CONFIG_DIR, "history_journal.jsonl")
+COMPACT_HISTORY_JSON = config.getboolean(
+    "Performance", "compact_history_json", fallback=False
+)
 
 
 # CSS Styles
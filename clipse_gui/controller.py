@@ -11,7 +11,16 @@ import threading
 
 from gi.repository import GLib, Gtk
 
-from .constants import HOVER_TO_SELECT, IMAGE_CACHE_MAX_SIZE, config
+from .constants import (
+    FUZZY_MATCHER,
+    HOVER_TO_SELECT,
+    IMAGE_CACHE_MAX_SIZE,
+    ROW_BUILD_BUDGET_MS,
+    SEARCH_CACHE_SIZE,
+    SEARCH_MAX_CHARS,
+    SEARCH_PROCESSES,
+    config,
+)
 from .controller_mixins import (
     ClipboardMixin,
     DataMixin,
@@ -27,6 +36,11 @@ from .controller_mixins import (
 )
 from .data_manager import DataManager
 from .image_handler import ImageHandler
+from .row_scheduler import RowBuildScheduler
+from .search_index import SearchIndex
+from .search_pool import SearchPool
+from .search_worker import SearchWorker
+from .ui.list_row import RowPool
 from .ui_builder import build_main_window_content
 
 log = logging.getLogger(__name__)
@@ -52,6 +66,7 @@ class ClipboardHistoryController(
     def __init__(self, application_window: Gtk.ApplicationWindow):
         self.window = application_window
         self.items = []
+        self.items_by_id = {}  # item_id -> item, for every entry in self.items
         self.filtered_items = []
         self.show_only_pinned = False
         self.zoom_level = 1.0
@@ -59,17 +74,51 @@ class ClipboardHistoryController(
         self.compact_mode = config.getboolean("General", "compact_mode", fallback=False)
         self.hover_to_select = HOVER_TO_SELECT
         self.selection_mode = False
-        self.selected_indices = set()
-
-        self._loading_more = False
+        self.selected_ids = set()
+
+        self._list_view_filter = None  # (search term, pinned only) of the rows
+        self._row_window = (0, 0)  # filtered indices [start, end) that have rows
+        self._row_target = (0, 0)  # the row window being built
+        self._row_view = (0, 0)  # filtered indices in view, built first
+        self._row_height = None  # average height of the rows built so far
+        self._scroll_anchor = None  # (filtered index, offset) to keep at the top
+        self._updating_rows = False
+        self._offscreen_selection = None  # item_id of a selected row not built
+        self._history_loaded = False
+        self._history_partial = False  # only the first rows of the file so far
         self._save_timer_id = None
+        self._compact_timer_id = None  # writes journaled edits into the file
+        self._unsaved_changes = []  # journal records; None if a full save is due
         self._search_timer_id = None
+        self._items_version = 0  # bumped when self.items changes membership
+        self._synced_version = None  # version the search backends last saw
         self._vadjustment_handler_id = None
         self._is_wayland = "wayland" in os.environ.get("XDG_SESSION_TYPE", "").lower()
         log.debug(f"Detected session type: {'Wayland' if self._is_wayland else 'X11'}")
 
         self.data_manager = DataManager(update_callback=self._on_history_updated)
+        self.search_index = SearchIndex(
+            cache_size=SEARCH_CACHE_SIZE,
+            field_cache=self.data_manager.search_fields,
+            fuzzy_matcher=FUZZY_MATCHER,
+        )
+        self.search_pool = (
+            SearchPool(
+                SEARCH_PROCESSES,
+                cache_size=SEARCH_CACHE_SIZE,
+                max_chars=SEARCH_MAX_CHARS,
+                fuzzy_matcher=FUZZY_MATCHER,
+            )
+            if SEARCH_PROCESSES > 0
+            else None
+        )
+        self.search_worker = SearchWorker()
         self.image_handler = ImageHandler(IMAGE_CACHE_MAX_SIZE or 50)
+        self.row_pool = RowPool(
+            self.image_handler,
+            self._update_row_image_widget,
+            self._on_row_single_click,
+        )
 
         ui_elements = build_main_window_content()
         self.main_box = ui_elements["main_box"]
@@ -79,6 +128,9 @@ class ClipboardHistoryController(
         self.compact_mode_button = ui_elements["compact_mode_button"]
         self.scrolled_window = ui_elements["scrolled_window"]
         self.list_box = ui_elements["list_box"]
+        self.row_scheduler = RowBuildScheduler(self.list_box, ROW_BUILD_BUDGET_MS)
+        self.top_spacer = ui_elements["top_spacer"]
+        self.bottom_spacer = ui_elements["bottom_spacer"]
         self.status_label = ui_elements["status_label"]
         self.selection_mode_banner = ui_elements["selection_mode_banner"]
         self.vadj = self.scrolled_window.get_vadjustment()
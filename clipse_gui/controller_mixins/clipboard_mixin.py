@@ -222,25 +222,22 @@ class ClipboardMixin:
             log.warning("Copy called with no row selected.")
             return
 
-        original_index = getattr(selected_row, "item_index", -1)
+        item_id = getattr(selected_row, "item_id", None)
         is_image = getattr(selected_row, "file_path") not in [None, "null"]
         item_value = getattr(selected_row, "item_value", None)
 
-        if original_index == -1:
-            log.error("Selected row missing valid item_index attribute.")
+        if item_id is None:
+            log.error("Selected row missing valid item_id attribute.")
             self.flash_status("Error: Invalid selected item data.")
             return
 
         try:
-            if not (0 <= original_index < len(self.items)):
-                log.error(
-                    f"Item with original index {original_index} no longer exists in master list."
-                )
+            item = self.items_by_id.get(item_id)
+            if item is None:
+                log.error(f"Item {item_id} no longer exists in master list.")
                 self.flash_status("Error: Selected item no longer exists.")
                 return
 
-            item = self.items[original_index]
-
             def close_window_callback(window):
                 if window and window.get_realized():
                     log.info("Closing window after successful copy.")
@@ -254,7 +251,7 @@ class ClipboardMixin:
                     copy_successful = self.copy_image_to_clipboard(image_path)
                 else:
                     log.error(
-                        f"Image path invalid or file missing for item {original_index}: {image_path}"
+                        f"Image path invalid or file missing for item {item_id}: {image_path}"
                     )
                     self.flash_status("Image path invalid or file missing")
             else:
@@ -262,7 +259,7 @@ class ClipboardMixin:
                 if text_to_copy is not None:
                     copy_successful = self.copy_text_to_clipboard(item_value)
                 else:
-                    log.error(f"Text item {original_index} has None value in data.")
+                    log.error(f"Text item {item_id} has None value in data.")
                     self.flash_status("Cannot copy null text value.")
 
             if copy_successful:
@@ -4,34 +4,99 @@ import logging
 
 from gi.repository import GLib
 
-from ..constants import SAVE_DEBOUNCE_MS
+from ..constants import (
+    INITIAL_LOAD_COUNT,
+    SAVE_DEBOUNCE_MS,
+    SAVE_JOURNAL_COMPACT_S,
+)
+from ..data_manager import apply_history_diff, index_items
 
 log = logging.getLogger(__name__)
 
+# Longest wait for the history writer when the app quits
+_FLUSH_TIMEOUT_S = 10
+
 
 class DataMixin:
 
-    def _on_history_updated(self, loaded_items):
-        """Callback function called when the file watcher detects a change."""
-        log.debug("Received history update signal from DataManager.")
-        self.items = loaded_items
+    def _on_history_updated(self, diff):
+        """Applies the `HistoryDiff` the file watcher found to the item list."""
+        log.debug(
+            f"Received history update from DataManager: {len(diff.added)} added, "
+            f"{len(diff.removed)} removed, {len(diff.pinned)} pin changes."
+        )
+        self.items = apply_history_diff(self.items, self.items_by_id, diff)
+        self.selected_ids.intersection_update(self.items_by_id)
+        self._sync_search_index()
         self.update_filtered_items()
 
     def _load_initial_data(self):
-        """Loads history in background thread."""
-        loaded_items = self.data_manager.load_history()
+        """Loads history in background thread, showing the first rows early."""
+        loaded_items = self.data_manager.load_snapshot()
+        if loaded_items is not None:
+            GLib.idle_add(self._finish_initial_load, loaded_items)
+            # A copy, as deletes edit the controller's list in place
+            self.data_manager._start_history_watcher(
+                self._on_history_updated, known_items=list(loaded_items)
+            )
+            return
+
+        key = self.data_manager.snapshot_key()
+        loaded_items = []
+        try:
+            for chunk in self.data_manager.iter_history_chunks(
+                first_chunk_size=INITIAL_LOAD_COUNT or 30
+            ):
+                if not loaded_items:
+                    preview = self.data_manager.replay_journal(
+                        sorted(chunk, key=lambda x: x.get("recorded", ""), reverse=True)
+                    )
+                    GLib.idle_add(self._show_history_preview, preview)
+                loaded_items.extend(chunk)
+        except Exception as e:
+            log.error(f"Error loading history file {self.data_manager.file_path}: {e}")
+            loaded_items = []
+            key = None
+        loaded_items = self.data_manager.finish_load(loaded_items, key)
         GLib.idle_add(self._finish_initial_load, loaded_items)
-        self.data_manager._start_history_watcher(self._on_history_updated)
+        self.data_manager._start_history_watcher(
+            self._on_history_updated, known_items=list(loaded_items)
+        )
+
+    def _show_history_preview(self, first_items):
+        """Shows the first parsed items while the rest of the file loads."""
+        if self._history_loaded:
+            return False
+        self._history_partial = True
+        self._set_items(first_items)
+        self._sync_search_index()
+        self.update_filtered_items(on_applied=self._on_history_preview_shown)
+        return False
+
+    def _on_history_preview_shown(self):
+        self.status_label.set_text("Loading history...")
+        GLib.idle_add(self._focus_first_item)
 
     def _finish_initial_load(self, loaded_items):
         """Updates UI after initial data load."""
-        self.items = loaded_items
-        self.update_filtered_items()
+        self._history_loaded = True
+        self._history_partial = False
+        self._set_items(loaded_items)
+        self._sync_search_index()
+        self.update_filtered_items(on_applied=self._on_initial_load_shown)
+        return False
+
+    def _on_initial_load_shown(self):
         if not self.items:
             self.status_label.set_text("No history items found. Press ? for help.")
         else:
             GLib.idle_add(self._focus_first_item)
-        return False
+
+    def _set_items(self, items):
+        """Replaces the item list and rebuilds the item ID map."""
+        self.items = items
+        self.items_by_id = index_items(items)
+        self.selected_ids.intersection_update(self.items_by_id)
 
     def _focus_first_item(self):
         """Selects and focuses the first item in the list."""
@@ -42,8 +107,16 @@ class DataMixin:
                 first_row.grab_focus()
         return False
 
-    def schedule_save_history(self):
-        """Schedules saving the history after a debounce delay."""
+    def schedule_save_history(self, changes=None):
+        """Schedules saving the history after a debounce delay.
+
+        *changes* are the journal records for the edit being saved; edits
+        saved without them make the next save rewrite the whole file.
+        """
+        if changes is None:
+            self._unsaved_changes = None
+        elif self._unsaved_changes is not None:
+            self._unsaved_changes.extend(changes)
         if self._save_timer_id:
             GLib.source_remove(self._save_timer_id)
         self._save_timer_id = GLib.timeout_add(
@@ -52,11 +125,65 @@ class DataMixin:
 
     def _trigger_save(self):
         """Calls the DataManager to save history."""
+        if self._history_partial:
+            # Saving now would truncate the file to the rows shown so far
+            log.debug("History still loading; postponing save.")
+            self._save_timer_id = None
+            self.schedule_save_history([])
+            return False
         log.debug("Triggering history save.")
-        self.data_manager.save_history(self.items, self._handle_save_error)
+        self.data_manager.save_history(
+            self.items, self._handle_save_error, self._unsaved_changes
+        )
+        self._schedule_journal_compaction(self._unsaved_changes is not None)
+        self._unsaved_changes = []
         self._save_timer_id = None
         return False
 
+    def _schedule_journal_compaction(self, journaled):
+        """Restarts the countdown to writing journaled edits into the file.
+
+        Without it, edits would only reach the history file (and deleted
+        entries only leave it) once the journal fills up or the app quits.
+        A save that was not journaled rewrote the file, so it stops the
+        countdown.
+        """
+        if self._compact_timer_id:
+            GLib.source_remove(self._compact_timer_id)
+            self._compact_timer_id = None
+        if journaled and SAVE_JOURNAL_COMPACT_S > 0:
+            self._compact_timer_id = GLib.timeout_add_seconds(
+                SAVE_JOURNAL_COMPACT_S, self._trigger_compaction
+            )
+
+    def _trigger_compaction(self):
+        """Writes journaled edits into the history file."""
+        self._compact_timer_id = None
+        if self._history_loaded and not self._history_partial:
+            self.data_manager.compact_journal(self.items)
+        return False
+
+    def flush_history(self):
+        """Writes every pending edit to the history file and waits for it.
+
+        Called on shutdown. Journaled edits are written into the history file
+        as well, so clipse sees them once we are gone.
+        """
+        save_pending = self._save_timer_id is not None
+        if save_pending:
+            GLib.source_remove(self._save_timer_id)
+            self._save_timer_id = None
+        self._schedule_journal_compaction(False)
+        if self._history_loaded and not self._history_partial:
+            if save_pending:
+                # A full save also empties the journal
+                self._unsaved_changes = []
+                self.data_manager.save_history(self.items)
+            else:
+                self.data_manager.compact_journal(self.items)
+        if not self.data_manager.flush_saves(timeout=_FLUSH_TIMEOUT_S):
+            log.warning("Timed out waiting for the history file to be saved.")
+
     def _handle_save_error(self, error_message):
         """Callback for DataManager save errors."""
         self.flash_status(error_message)
@@ -5,140 +5,153 @@ import logging
 from gi.repository import Gtk
 
 from ..constants import PROTECT_PINNED_ITEMS
+from ..data_manager import item_id
+from ..history_journal import delete_record, pin_record
 from ..ui_components import animate_pin_shake
 
 log = logging.getLogger(__name__)
 
 
+def _position_of(items, item, hint):
+    """Position of *item* (by identity) in *items*, or -1.
+
+    The search starts at *hint*, where the item was when it was last
+    searched, and works outward, so it only costs as much as the list has
+    shifted since.
+    """
+    for distance in range(max(hint + 1, len(items) - hint)):
+        for position in (hint - distance, hint + distance):
+            if 0 <= position < len(items) and items[position] is item:
+                return position
+    return -1
+
+
 class ItemOpsMixin:
 
-    def update_row_pin_status(self, original_index):
+    def update_row_pin_status(self, row):
         """Updates the visual state of a row when its pin status changes."""
-        is_pinned = self.items[original_index].get("pinned", False)
-        for row in self.list_box.get_children():
-            if hasattr(row, "item_index") and row.item_index == original_index:
-                row.item_pinned = is_pinned
-                try:
-                    widget = row.get_child()
-                    if isinstance(widget, Gtk.Box):
-                        hbox = widget.get_children()[0]
-                        if isinstance(hbox, Gtk.Box):
-                            # Animate the rotation wiggle effect
-                            animate_pin_shake(hbox, is_pinned)
-                except (AttributeError, IndexError, TypeError) as e:
-                    log.warning(
-                        f"Could not update pin icon for row {original_index}: {e}"
-                    )
-
-                context = row.get_style_context()
-                if is_pinned:
-                    context.add_class("pinned-row")
-                else:
-                    context.remove_class("pinned-row")
-                break
+        item = self.items_by_id.get(row.item_id)
+        if item is None:
+            return
+        is_pinned = item.get("pinned", False)
+        row.item_pinned = is_pinned
+        try:
+            widget = row.get_child()
+            if isinstance(widget, Gtk.Box):
+                hbox = widget.get_children()[0]
+                if isinstance(hbox, Gtk.Box):
+                    # Animate the rotation wiggle effect
+                    animate_pin_shake(hbox, is_pinned)
+        except (AttributeError, IndexError, TypeError) as e:
+            log.warning(f"Could not update pin icon for row {row.item_id}: {e}")
+
+        context = row.get_style_context()
+        if is_pinned:
+            context.add_class("pinned-row")
+        else:
+            context.remove_class("pinned-row")
+
+    def _history_editable(self):
+        """Whether items may be edited; not while only a preview is loaded.
+
+        The full load replaces the preview's items, so edits made to them
+        would be lost from the list.
+        """
+        if self._history_partial:
+            self.flash_status("History is still loading")
+            return False
+        return True
 
     def toggle_pin_selected(self):
         """Toggles the pin status of the currently selected item."""
+        if not self._history_editable():
+            return
         selected_row = self.list_box.get_selected_row()
-        if selected_row and hasattr(selected_row, "item_index"):
-            original_index = selected_row.item_index
-            if 0 <= original_index < len(self.items):
-                item = self.items[original_index]
+        if selected_row and hasattr(selected_row, "item_id"):
+            item = self.items_by_id.get(selected_row.item_id)
+            if item is not None:
                 new_pin_state = not item.get("pinned", False)
                 item["pinned"] = new_pin_state
-                self.update_row_pin_status(original_index)
-                self.schedule_save_history()
+                self.update_row_pin_status(selected_row)
+                self.schedule_save_history([pin_record(item)])
                 self.flash_status("Item pinned" if new_pin_state else "Item unpinned")
                 if self.show_only_pinned and not new_pin_state:
                     self._remove_row_from_view(selected_row)
             else:
-                log.error(f"Invalid original_index {original_index} for toggle pin.")
+                log.error(f"Unknown item {selected_row.item_id} for toggle pin.")
                 self.flash_status("Error: Item index invalid.")
         else:
             log.warning("Toggle pin called with no valid row selected.")
 
     def remove_selected_item(self):
         """Removes the currently selected item from history and view."""
+        if not self._history_editable():
+            return
         selected_row = self.list_box.get_selected_row()
-        if selected_row and hasattr(selected_row, "item_index"):
-            original_index_to_remove = selected_row.item_index
-            if 0 <= original_index_to_remove < len(self.items):
-                item = self.items[original_index_to_remove]
+        if selected_row and hasattr(selected_row, "item_id"):
+            item = self.items_by_id.get(selected_row.item_id)
+            if item is not None:
 
                 # Check if the item is pinned and protection is enabled
                 if PROTECT_PINNED_ITEMS and item.get("pinned", False):
                     self.flash_status("Cannot delete pinned item: protection enabled")
                     return
 
-                item_value_preview = str(
-                    self.items[original_index_to_remove].get("value", "")
-                )[:30]
-                log.info(f"Removing item at original index {original_index_to_remove}")
-
-                del self.items[original_index_to_remove]
-                self.schedule_save_history()
+                item_value_preview = str(item.get("value", ""))[:30]
+                log.info(f"Removing item {selected_row.item_id}")
+
+                hint = self._filtered_entry(selected_row).get("original_index", 0)
+                del self.items_by_id[selected_row.item_id]
+                self.selected_ids.discard(selected_row.item_id)
+                position = _position_of(self.items, item, hint)
+                if position != -1:
+                    del self.items[position]
+                self._sync_search_index()
+                self.schedule_save_history([delete_record(item)])
                 removed_filtered_index = self._remove_row_from_view(selected_row)
 
-                # Update original indices for subsequent items/rows
-                for fi in self.filtered_items:
-                    if fi["original_index"] > original_index_to_remove:
-                        fi["original_index"] -= 1
-                current_rows = self.list_box.get_children()
-                for i in range(removed_filtered_index, len(current_rows)):
-                    row = current_rows[i]
-                    if (
-                        hasattr(row, "item_index")
-                        and row.item_index > original_index_to_remove
-                    ):
-                        row.item_index -= 1
-
                 self.flash_status(f"Item removed: '{item_value_preview}...'.")
                 self.update_status_label()
                 self._select_nearby_row(
                     removed_filtered_index
                 )  # Reselect after removal
             else:
-                log.error(
-                    f"Invalid original_index {original_index_to_remove} for remove."
-                )
+                log.error(f"Unknown item {selected_row.item_id} for remove.")
                 self.flash_status("Error: Item index invalid for removal.")
         else:
             log.warning("Remove item called with no valid row selected.")
 
+    def _filtered_entry(self, row):
+        """The `filtered_items` entry *row* shows, or an empty dict."""
+        index = getattr(row, "filtered_index", -1)
+        if 0 <= index < len(self.filtered_items):
+            entry = self.filtered_items[index]
+            if item_id(entry["item"]) == getattr(row, "item_id", None):
+                return entry
+        return {}
+
     def _remove_row_from_view(self, row_to_remove):
-        """Helper to remove a row from the ListBox and update filtered list."""
-        removed_filtered_index = -1
-        original_index_removed = getattr(row_to_remove, "item_index", -1)
-        children = self.list_box.get_children()
-        try:
-            removed_filtered_index = children.index(row_to_remove)
-        except ValueError:
-            log.warning(
-                f"Row with original index {original_index_removed} not found in list_box children."
-            )
-            for idx, child in enumerate(children):  # Fallback find
-                if getattr(child, "item_index", -1) == original_index_removed:
-                    removed_filtered_index = idx
-                    row_to_remove = child
-                    break
-            if removed_filtered_index == -1:
-                return -1
-
-        self.list_box.remove(row_to_remove)
-        self.filtered_items = [
-            fi
-            for fi in self.filtered_items
-            if fi["original_index"] != original_index_removed
-        ]
+        """Helper to drop a row's item from the filtered list and the view.
+
+        Only the row's own entry is removed, so lazily ranked results stay
+        unranked past it. Returns the filtered index the row had, or -1.
+        """
+        if not self._filtered_entry(row_to_remove):
+            log.warning(f"Row for {row_to_remove.item_id} is out of date; refreshing.")
+            self.update_filtered_items()
+            return -1
+        removed_filtered_index = row_to_remove.filtered_index
+        del self.filtered_items[removed_filtered_index]
+        self.populate_list_view()
         return removed_filtered_index
 
     def _select_nearby_row(self, index_before_removal):
         """Selects a row near the index of a previously removed row."""
         if index_before_removal != -1:
-            new_count = len(self.list_box.get_children())
+            new_count = len(self.filtered_items)
             if new_count > 0:
                 select_idx = min(index_before_removal, new_count - 1)
-                new_row = self.list_box.get_row_at_index(select_idx)
+                new_row = self._row_for_index(select_idx)
                 if new_row:
                     self.list_box.select_row(new_row)
                     new_row.grab_focus()
@@ -149,27 +162,30 @@ class ItemOpsMixin:
 
     def delete_selected_items(self):
         """Deletes all selected items with confirmation."""
-        if not self.selected_indices:
+        if not self._history_editable():
+            return
+        if not self.selected_ids:
             self.flash_status("No items selected for deletion")
             return
 
         # Count pinned vs non-pinned selected items
         pinned_count = 0
         non_pinned_count = 0
-        indices_to_delete = []
-
-        for idx in self.selected_indices:
-            if 0 <= idx < len(self.items):
-                item = self.items[idx]
-                if item.get("pinned", False):
-                    pinned_count += 1
-                    if not PROTECT_PINNED_ITEMS:
-                        indices_to_delete.append(idx)
-                else:
-                    non_pinned_count += 1
-                    indices_to_delete.append(idx)
+        ids_to_delete = []
+
+        for selected_id in self.selected_ids:
+            item = self.items_by_id.get(selected_id)
+            if item is None:
+                continue
+            if item.get("pinned", False):
+                pinned_count += 1
+                if not PROTECT_PINNED_ITEMS:
+                    ids_to_delete.append(selected_id)
+            else:
+                non_pinned_count += 1
+                ids_to_delete.append(selected_id)
 
-        if not indices_to_delete:
+        if not ids_to_delete:
             if PROTECT_PINNED_ITEMS and pinned_count > 0:
                 self.flash_status(
                     f"Cannot delete: all {pinned_count} selected items are pinned (protection enabled)"
@@ -179,7 +195,7 @@ class ItemOpsMixin:
             return
 
         # Build confirmation message
-        total_to_delete = len(indices_to_delete)
+        total_to_delete = len(ids_to_delete)
         protected_count = pinned_count if PROTECT_PINNED_ITEMS else 0
 
         message = f"Delete {total_to_delete} selected item{'s' if total_to_delete != 1 else ''}?"
@@ -204,20 +220,18 @@ class ItemOpsMixin:
         dialog.destroy()
 
         if response == Gtk.ResponseType.OK:
-            # Sort indices in descending order to delete from end to beginning
-            indices_to_delete.sort(reverse=True)
-
-            for idx in indices_to_delete:
-                if 0 <= idx < len(self.items):
-                    del self.items[idx]
+            deleted = [self.items_by_id.pop(key) for key in ids_to_delete]
+            deleted_ids = {id(item) for item in deleted}
+            self.items = [item for item in self.items if id(item) not in deleted_ids]
+            self._sync_search_index()
 
             # Exit selection mode and clear selections
             self.selection_mode = False
-            self.selected_indices.clear()
+            self.selected_ids.clear()
             self.main_box.get_style_context().remove_class("selection-mode")
 
             # Save and refresh
-            self.schedule_save_history()
+            self.schedule_save_history([delete_record(item) for item in deleted])
             self.update_filtered_items()
 
             self.flash_status(
@@ -227,6 +241,8 @@ class ItemOpsMixin:
 
     def clear_all_items(self):
         """Clears all non-pinned items with confirmation."""
+        if not self._history_editable():
+            return
         if not self.items:
             self.flash_status("No items to clear")
             return
@@ -273,15 +289,18 @@ class ItemOpsMixin:
         if response == Gtk.ResponseType.OK:
             if PROTECT_PINNED_ITEMS:
                 # Keep only pinned items
-                self.items = [item for item in self.items if item.get("pinned", False)]
+                self._set_items(
+                    [item for item in self.items if item.get("pinned", False)]
+                )
             else:
                 # Delete everything
-                self.items = []
+                self._set_items([])
+            self._sync_search_index()
 
             # Exit selection mode if active
             if self.selection_mode:
                 self.selection_mode = False
-                self.selected_indices.clear()
+                self.selected_ids.clear()
                 self.main_box.get_style_context().remove_class("selection-mode")
 
             # Save and refresh
@@ -109,8 +109,8 @@ class KeyboardMixin:
             row.grab_focus()
             adj = self.scrolled_window.get_vadjustment()
             if adj:
-                alloc = row.get_allocation()
-                adj.set_value(min(alloc.y, adj.get_upper() - adj.get_page_size()))
+                row_y = self._row_content_y(row)
+                adj.set_value(min(row_y, adj.get_upper() - adj.get_page_size()))
             return True
 
         return False
@@ -243,7 +243,7 @@ class KeyboardMixin:
 
     def _handle_delete_selected(self):
         """Ctrl+X / Shift+Delete: delete selected items in selection mode."""
-        if self.selection_mode and self.selected_indices:
+        if self.selection_mode and self.selected_ids:
             self.delete_selected_items()
             return True
         return False
@@ -321,13 +321,13 @@ class KeyboardMixin:
 
     def on_row_activated(self, row, with_paste_simulation=False):
         """Handles double-click or Enter on a list row."""
-        log.debug(f"Row activated: original_index={getattr(row, 'item_index', 'N/A')}")
+        log.debug(f"Row activated: item_id={getattr(row, 'item_id', 'N/A')}")
         self.copy_selected_item_to_clipboard(with_paste_simulation)
 
     def _on_row_single_click(self, row):
         """Handles single-click on a list row - copies and pastes."""
         log.debug(
-            f"Row single-clicked: original_index={getattr(row, 'item_index', 'N/A')}"
+            f"Row single-clicked: item_id={getattr(row, 'item_id', 'N/A')}"
         )
         self.list_box.select_row(row)
         self.copy_selected_item_to_clipboard(with_paste_simulation=True)
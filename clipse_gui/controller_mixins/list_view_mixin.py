@@ -1,84 +1,333 @@
 """List view population, row creation, status label, and flash messages."""
 
 import logging
+import time
 from functools import partial
 
 from gi.repository import GLib, Gtk
 
-from ..constants import HIGHLIGHT_SEARCH, INITIAL_LOAD_COUNT
-from ..ui_components import create_list_row_widget
+from ..constants import HIGHLIGHT_SEARCH, INITIAL_LOAD_COUNT, ROW_OVERSCAN
+from ..data_manager import item_id
 
 log = logging.getLogger(__name__)
 
+# Row heights assumed until rows have been laid out and measured
+_ROW_HEIGHT_GUESS = 56
+_COMPACT_ROW_HEIGHT_GUESS = 32
+
 
 class ListViewMixin:
 
     def populate_list_view(self):
-        """Clears and populates the list view with the initial batch of filtered items."""
+        """Brings the list view in line with `filtered_items`, reusing rows."""
         if not self.list_box:
             return
 
-        if self.vadj and self._vadjustment_handler_id:
-            try:
-                self.vadj.disconnect(self._vadjustment_handler_id)
-            except TypeError:
-                pass
-            self._vadjustment_handler_id = None
+        list_filter = (self.search_term, self.show_only_pinned)
+        anchor = (0, 0)
+        if list_filter == self._list_view_filter:
+            anchor = self._find_anchor(self._first_visible_row())
+        self._list_view_filter = list_filter
+        first = anchor[0]
+        log.debug(f"Populating rows for {len(self.filtered_items)} items from {first}.")
+        self._show_row_window(*self._row_range_around(first), anchor)
 
-        self.list_box.freeze_child_notify()
-        for child in self.list_box.get_children():
-            self.list_box.remove(child)
-        self.list_box.thaw_child_notify()
+    def _first_visible_row(self):
+        """(filtered index, offset) of the row at the top of the view.
 
-        self._loading_more = False
-        load_count = min(INITIAL_LOAD_COUNT or 30, len(self.filtered_items))
-        log.debug(f"Populating initial {load_count} rows.")
-        if load_count > 0:
-            self._create_rows_range(0, load_count)
-            self.list_box.show_all()
+        The offset is how far the view starts below the top of that row.
+        Positions in the spacers are mapped through the estimated row height.
+        """
+        _start, end = self._row_window
+        height = self._estimated_row_height()
+        value = self.vadj.get_value() if self.vadj else 0
+        rows = self.list_box.get_children()
+        list_top = self.list_box.get_allocation().y
+        if rows and value >= list_top:
+            for row in rows:
+                allocation = row.get_allocation()
+                row_top = list_top + allocation.y
+                if value < row_top + allocation.height:
+                    return row.filtered_index, max(0, value - row_top)
+            below = value - (list_top + self.list_box.get_allocation().height)
+            return end + int(below // height), below % height
+        return int(value // height), value % height
 
-        if self.vadj and not self._vadjustment_handler_id:
-            self._vadjustment_handler_id = self.vadj.connect(
-                "value-changed", self.on_vadjustment_changed
-            )
+    def _find_anchor(self, anchor):
+        """Follows the item at *anchor* to its place in the new `filtered_items`."""
+        index, offset = anchor
+        start, _end = self._row_window
+        rows = self.list_box.get_children()
+        if not start <= index < start + len(rows):
+            return min(index, max(len(self.filtered_items) - 1, 0)), offset
+        anchor_id = rows[index - start].item_id
+        # Entries added or removed above it shift it by a little
+        for candidate in range(index - ROW_OVERSCAN, index + ROW_OVERSCAN + 1):
+            if 0 <= candidate < len(self.filtered_items) and (
+                item_id(self.filtered_items[candidate]["item"]) == anchor_id
+            ):
+                return candidate, offset
+        return min(index, max(len(self.filtered_items) - 1, 0)), 0
 
-    def _create_rows_range(self, start_idx, end_idx):
-        """Creates and adds rows for a given range of filtered items."""
-        end_idx = min(end_idx, len(self.filtered_items))
-        log.debug(f"Creating rows from filtered index {start_idx} to {end_idx - 1}")
+    def _measure_row_height(self):
+        """Updates the average row height from the rows laid out now."""
+        rows = self.list_box.get_children()
+        list_height = self.list_box.get_allocation().height
+        if rows and list_height > len(rows):
+            self._row_height = list_height / len(rows)
 
-        self.list_box.freeze_child_notify()
-        for i in range(start_idx, end_idx):
-            if i < len(self.filtered_items):
-                item_info = self.filtered_items[i]
-                item_info["filtered_index"] = i
-                row = create_list_row_widget(
-                    item_info,
-                    self.image_handler,
-                    self._update_row_image_widget,
-                    self.compact_mode,
-                    self.hover_to_select,
-                    self._on_row_single_click,
-                    self.search_term,
-                    HIGHLIGHT_SEARCH,
+    def _estimated_row_height(self):
+        if self._row_height:
+            return self._row_height
+        return _COMPACT_ROW_HEIGHT_GUESS if self.compact_mode else _ROW_HEIGHT_GUESS
+
+    def _visible_row_count(self):
+        """How many rows fit in the view, with a partial row at each edge."""
+        page_size = self.vadj.get_page_size() if self.vadj else 0
+        if page_size > 0:
+            return int(page_size // self._estimated_row_height()) + 2
+        return INITIAL_LOAD_COUNT or 30
+
+    def _row_range_around(self, first):
+        """The filtered range to build rows for when *first* is at the top."""
+        count = len(self.filtered_items)
+        start = max(0, min(first, count - 1) - ROW_OVERSCAN)
+        return start, min(count, first + self._visible_row_count() + ROW_OVERSCAN)
+
+    def _update_row_window(self):
+        """Moves the row window along when the view gets close to its edge."""
+        if self._updating_rows or not self.list_box:
+            return False
+        count = len(self.filtered_items)
+        first, offset = self._first_visible_row()
+        first = min(first, max(count - 1, 0))
+        wanted_start, wanted_end = self._row_range_around(first)
+        # Compared with the rows being built, which may not all exist yet
+        start, end = self._row_target
+        # Some slack, so that every pixel scrolled does not move the window
+        slack = ROW_OVERSCAN // 2
+        if start <= max(0, wanted_start + slack) and end >= min(
+            count, wanted_end - slack
+        ):
+            return False
+        self._show_row_window(wanted_start, wanted_end, (first, offset))
+        return False
+
+    def _show_row_window(self, start, end, anchor=None):
+        """Builds rows for `filtered_items[start:end]`, a frame budget at a time."""
+        first = anchor[0] if anchor else start
+        self._row_target = (start, end)
+        self._row_view = (first, first + self._visible_row_count())
+        self._scroll_anchor = anchor
+        self.row_scheduler.start(self._build_row_slice)
+
+    def _build_row_slice(self, budget):
+        """Builds the next rows of the row window that fit in *budget* seconds.
+
+        Returns True once the whole window is built.
+        """
+        started = time.perf_counter()
+        if self._scroll_anchor is None:
+            # Rows added above the view since the last layout must not push it
+            self._scroll_anchor = self._first_visible_row()
+        rows = self.list_box.get_children()
+        view_start, view_end = self._row_view
+        allowance = self.row_scheduler.rows_within(
+            budget, default=view_end - view_start
+        )
+        start, end = self._grow_row_range(
+            {getattr(row, "item_id", None) for row in rows}, allowance
+        )
+        height = self._estimated_row_height()
+
+        self._updating_rows = True
+        try:
+            self._row_window = (start, start)
+            created = self._update_rows(rows, self.filtered_items[start:end], start)
+            self._row_window = (start, end)
+            if self.top_spacer is not None:
+                self.top_spacer.set_size_request(-1, int(start * height))
+                self.bottom_spacer.set_size_request(
+                    -1, int((len(self.filtered_items) - end) * height)
                 )
-                if row:
-                    row.item_index = item_info["original_index"]
-                    file_path = item_info["item"].get("filePath")
-                    row.is_image = bool(file_path and isinstance(file_path, str))
-                    row.item_value = item_info["item"].get("value")
-                    row.item_pinned = item_info["item"].get("pinned", False)
-
-                    # Apply selection styling if this item is selected
-                    if row.item_index in self.selected_indices:
-                        context = row.get_style_context()
-                        context.add_class("selected-row")
-
-                    self.list_box.add(row)
+        finally:
+            self._updating_rows = False
+        self.row_scheduler.record(created, time.perf_counter() - started)
+        log.debug(f"Row window {start}..{end} of {len(self.filtered_items)}")
+        return (start, end) == self._row_target
+
+    def _grow_row_range(self, built_ids, allowance):
+        """The part of `_row_target` to have rows for after this slice.
+
+        Grows a range from the top of the view, taking the row closest to
+        the view next. Rows of items in *built_ids* already exist and are
+        free; at most *allowance* rows have to be created.
+        """
+        target_start, target_end = self._row_target
+        view_start, view_end = self._row_view
+
+        def distance(index):
+            if index < view_start:
+                return view_start - index
+            return max(0, index - view_end + 1)
+
+        start = end = min(max(view_start, target_start), target_end)
+        while start > target_start or end < target_end:
+            below = distance(end) if end < target_end else None
+            above = distance(start - 1) if start > target_start else None
+            take_below = above is None or (below is not None and below <= above)
+            index = end if take_below else start - 1
+            if item_id(self.filtered_items[index]["item"]) not in built_ids:
+                if allowance <= 0:
+                    break
+                allowance -= 1
+            if take_below:
+                end += 1
             else:
-                log.warning(f"Attempted to create row for out-of-bounds index {i}")
+                start -= 1
+        return start, end
+
+    def _on_rows_laid_out(self):
+        """Measures the rows and scrolls the anchored one back into place."""
+        self._measure_row_height()
+        if self._scroll_anchor is not None:
+            self._restore_scroll_anchor()
+
+    def _restore_scroll_anchor(self):
+        """Scrolls the anchored row back into place after a layout."""
+        if self._scroll_anchor is None or not self.vadj:
+            return
+        index, offset = self._scroll_anchor
+        self._scroll_anchor = None
+        start, _end = self._row_window
+        rows = self.list_box.get_children()
+        if not start <= index < start + len(rows):
+            return
+        row_top = self.list_box.get_allocation().y + rows[index - start].get_allocation().y
+        self._updating_rows = True
+        try:
+            self.vadj.set_value(row_top + offset)
+        finally:
+            self._updating_rows = False
+
+    def _row_for_index(self, filtered_index):
+        """The row built for *filtered_index*, or None."""
+        start, _end = self._row_window
+        rows = self.list_box.get_children()
+        if start <= filtered_index < start + len(rows):
+            return rows[filtered_index - start]
+        return None
+
+    def _row_content_y(self, row):
+        """Top of *row* in the coordinates of the scrolled content."""
+        return self.list_box.get_allocation().y + row.get_allocation().y
+
+    def _row_render_state(self):
+        """Settings a row's widgets depend on, besides its item."""
+        search_term = self.search_term if HIGHLIGHT_SEARCH else ""
+        return (search_term, self.compact_mode, self.hover_to_select)
+
+    def _update_rows(self, rows, wanted, first_index=0):
+        """Turns *rows* into rows for *wanted*; returns how many were created."""
+        selected_row = self.list_box.get_selected_row()
+        if selected_row is not None:
+            selected_id = getattr(selected_row, "item_id", None)
+        else:
+            selected_id = self._offscreen_selection
+        render_state = self._row_render_state()
+        wanted_ids = [item_id(item_info["item"]) for item_info in wanted]
+        wanted_items = dict(zip(wanted_ids, (info["item"] for info in wanted)))
+
+        self.list_box.freeze_child_notify()
+        reusable = {}
+        current = []
+        for row in rows:
+            row_id = getattr(row, "item_id", None)
+            item = wanted_items.get(row_id)
+            if (
+                item is not None
+                and row_id not in reusable
+                and row.render_state == render_state
+                and row.item_pinned == item.get("pinned", False)
+            ):
+                reusable[row_id] = row
+                current.append(row)
+            else:
+                self.list_box.remove(row)
+                self.row_pool.release(row)
+
+        created = 0
+        position = 0
+        for filtered_index, (row_id, item_info) in enumerate(
+            zip(wanted_ids, wanted), first_index
+        ):
+            item_info["filtered_index"] = filtered_index
+            row = reusable.pop(row_id, None)
+            if row is None:
+                row = self._create_row(item_info)
+                if row:
+                    self.list_box.insert(row, position)
+                    row.show_all()
+                    current.insert(position, row)
+                    created += 1
+                    position += 1
+                continue
+            if current[position] is not row:
+                self.list_box.remove(row)
+                self.list_box.insert(row, position)
+                current.remove(row)
+                current.insert(position, row)
+            self._update_row_position(row, item_info)
+            position += 1
         self.list_box.thaw_child_notify()
 
+        self._offscreen_selection = None
+        if selected_id is not None:
+            for row in current:
+                if row.item_id == selected_id:
+                    if self.list_box.get_selected_row() is not row:
+                        self.list_box.select_row(row)
+                    break
+            else:
+                self._offscreen_selection = selected_id
+        log.debug(f"Row update: {created} created, {len(current) - created} reused")
+        return created
+
+    def _update_row_position(self, row, item_info):
+        """Points a reused row at its item's current indices."""
+        row.filtered_index = item_info["filtered_index"]
+        context = row.get_style_context()
+        if row.item_id in self.selected_ids:
+            context.add_class("selected-row")
+        else:
+            context.remove_class("selected-row")
+
+    def _create_row(self, item_info):
+        """Creates the row for one filtered item, or None.
+
+        Rows released by `_update_rows` are bound to the item when one of
+        the right kind is free.
+        """
+        row = self.row_pool.acquire(
+            item_info,
+            self.compact_mode,
+            self.hover_to_select,
+            self.search_term,
+            HIGHLIGHT_SEARCH,
+        )
+        if row:
+            row.render_state = self._row_render_state()
+            file_path = item_info["item"].get("filePath")
+            row.is_image = bool(file_path and isinstance(file_path, str))
+            row.item_value = item_info["item"].get("value")
+            row.item_pinned = item_info["item"].get("pinned", False)
+
+            # Apply selection styling if this item is selected
+            if row.item_id in self.selected_ids:
+                context = row.get_style_context()
+                context.add_class("selected-row")
+        return row
+
     def _update_row_image_widget(
         self, image_container, placeholder, pixbuf, error_message
     ):
@@ -113,8 +362,8 @@ class ListViewMixin:
         status_parts = []
 
         # Show selection count if in selection mode
-        if self.selection_mode and self.selected_indices:
-            selected_count = len(self.selected_indices)
+        if self.selection_mode and self.selected_ids:
+            selected_count = len(self.selected_ids)
             status_parts.append(
                 f"{selected_count} item{'s' if selected_count != 1 else ''} selected"
             )
@@ -26,25 +26,22 @@ class PreviewMixin:
         if not selected_row:
             return
 
-        original_index = getattr(selected_row, "item_index", -1)
+        item_id = getattr(selected_row, "item_id", None)
         file_path_attr = getattr(selected_row, "file_path", None)
         is_image = file_path_attr is not None and file_path_attr != "null"
 
-        if original_index == -1:
-            log.error("Preview called on row with invalid item_index.")
+        if item_id is None:
+            log.error("Preview called on row with invalid item_id.")
             self.flash_status("Error: Invalid selected item data.")
             return
 
         try:
-            if not (0 <= original_index < len(self.items)):
-                log.error(
-                    f"Item with original index {original_index} no longer exists for preview."
-                )
+            item = self.items_by_id.get(item_id)
+            if item is None:
+                log.error(f"Item {item_id} no longer exists for preview.")
                 self.flash_status("Error: Selected item no longer exists.")
                 return
 
-            item = self.items[original_index]
-
             show_preview_window(
                 self.window,
                 item,
@@ -4,7 +4,13 @@ import logging
 
 from gi.repository import GLib
 
-from ..constants import SEARCH_DEBOUNCE_MS
+from ..constants import (
+    FUZZY_MATCHER,
+    HIGHLIGHT_SEARCH,
+    INITIAL_LOAD_COUNT,
+    SEARCH_DEBOUNCE_MS,
+    SEARCH_PROCESS_MIN_ITEMS,
+)
 from ..utils import fuzzy_search
 
 log = logging.getLogger(__name__)
@@ -12,26 +18,91 @@ log = logging.getLogger(__name__)
 
 class SearchMixin:
 
-    def update_filtered_items(self):
-        """Filters master list based on search and pin status, then updates UI."""
+    def _search_index_for(self, items):
+        """Picks the worker-process pool for big histories, else the local index."""
+        if self.search_pool is not None and len(items) >= SEARCH_PROCESS_MIN_ITEMS:
+            return self.search_pool
+        return self.search_index
 
-        self.filtered_items = fuzzy_search(
-            items=self.items,
-            search_term=self.search_term,
+    def _sync_search_index(self):
+        """Notes that `self.items` changed; the next search syncs the index.
+
+        Syncing happens on the search worker, so starting the worker
+        processes and sending them a large history never stalls the UI.
+        """
+        self._items_version += 1
+
+    def _sync_search_backends(self, items, version):
+        """Brings the search backend for *items* in line; runs on the worker."""
+        if version == self._synced_version:
+            return
+        active = self._search_index_for(items)
+        active.sync(items)
+        # The backend not in use would only go stale while holding memory
+        for backend in (self.search_index, self.search_pool):
+            if backend is not None and backend is not active:
+                backend.clear()
+        self._synced_version = version
+
+    def _run_fuzzy_search(self, items, search_term, show_only_pinned, cancelled=None):
+        # Only the first page is ranked here; rows beyond it are ranked as
+        # the row window reaches them.
+        return fuzzy_search(
+            items=items,
+            search_term=search_term,
             value_key="value",
             path_key="filePath",
             pinned_key="pinned",
-            show_only_pinned=self.show_only_pinned,
+            show_only_pinned=show_only_pinned,
+            search_index=self._search_index_for(items),
+            cancelled=cancelled,
+            top_k=INITIAL_LOAD_COUNT or 30,
+            fuzzy_matcher=FUZZY_MATCHER,
+            with_spans=HIGHLIGHT_SEARCH,
         )
+
+    def update_filtered_items(self, on_applied=None):
+        """Filters master list based on search and pin status, then updates UI.
+
+        The search runs on the search worker, replacing any still running,
+        after syncing the search index with the current items; *on_applied*
+        is called once its results are shown.
+        """
+        items = list(self.items)
+        version = self._items_version
+        search_term = self.search_term
+        show_only_pinned = self.show_only_pinned
+
+        def search(cancelled):
+            self._sync_search_backends(items, version)
+            return self._run_fuzzy_search(
+                items, search_term, show_only_pinned, cancelled
+            )
+
+        def apply(filtered_items):
+            if version != self._items_version:
+                # The items changed meanwhile (a delete edits them in place
+                # without a new search); these results may show gone items
+                self.update_filtered_items(on_applied)
+                return
+            self._apply_filtered_items(filtered_items)
+            if on_applied is not None:
+                on_applied()
+
+        self.search_worker.submit(search, apply)
+
+    def _apply_filtered_items(self, filtered_items):
+        self.filtered_items = filtered_items
         self.populate_list_view()
         self.update_status_label()
-        GLib.idle_add(self.check_load_more)
 
     def on_search_changed(self, entry):
         """Handles changes in the search entry, debounced."""
         new_search_term = entry.get_text()
         if new_search_term != self.search_term:
             self.search_term = new_search_term
+            # Whatever is still running is for an outdated term
+            self.search_worker.cancel()
             if self._search_timer_id:
                 GLib.source_remove(self._search_timer_id)
             self._search_timer_id = GLib.timeout_add(
@@ -39,7 +110,7 @@ class SearchMixin:
             )
 
     def _trigger_filter_update(self):
-        """Updates filtering after search debounce timeout."""
+        """Starts a background search after the search debounce timeout."""
         log.debug(f"Triggering filter update for search: '{self.search_term}'")
         self.update_filtered_items()
         self._search_timer_id = None
@@ -51,9 +122,9 @@ class SearchMixin:
         if is_active != self.show_only_pinned:
             self.show_only_pinned = is_active
             log.debug(f"Pin filter toggled: {'ON' if self.show_only_pinned else 'OFF'}")
-            self.update_filtered_items()
-            if len(self.list_box.get_children()) > 0:
-                GLib.idle_add(self._focus_first_item)
+            self.update_filtered_items(
+                on_applied=lambda: GLib.idle_add(self._focus_first_item)
+            )
 
     def on_search_focus_out(self, entry, event):
         """Handles when search entry loses focus."""
@@ -2,6 +2,8 @@
 
 import logging
 
+from ..data_manager import item_id
+
 log = logging.getLogger(__name__)
 
 
@@ -36,45 +38,44 @@ class SelectionMixin:
             return
 
         selected_row = self.list_box.get_selected_row()
-        if not selected_row or not hasattr(selected_row, "item_index"):
+        if not selected_row or not hasattr(selected_row, "item_id"):
             return
 
-        original_index = selected_row.item_index
+        item_id = selected_row.item_id
         context = selected_row.get_style_context()
 
-        if original_index in self.selected_indices:
+        if item_id in self.selected_ids:
             # Deselect
-            self.selected_indices.remove(original_index)
+            self.selected_ids.remove(item_id)
             context.remove_class("selected-row")
             log.info(
-                f"Deselected item at index {original_index}, classes: {context.list_classes()}"
+                f"Deselected item {item_id}, classes: {context.list_classes()}"
             )
         else:
             # Select
-            self.selected_indices.add(original_index)
+            self.selected_ids.add(item_id)
             context.add_class("selected-row")
             log.info(
-                f"Selected item at index {original_index}, classes: {context.list_classes()}"
+                f"Selected item {item_id}, classes: {context.list_classes()}"
             )
 
         self.update_status_label()
 
     def select_all_items(self):
-        """Selects all currently visible items."""
+        """Selects all items the current search and filter show."""
         if not self.selection_mode:
             # Auto-enter selection mode if not already in it
             self.toggle_selection_mode()
 
-        self.selected_indices.clear()
+        self.selected_ids = {item_id(info["item"]) for info in self.filtered_items}
 
+        # Rows outside the row window are styled when they are built
         for row in self.list_box.get_children():
-            if hasattr(row, "item_index"):
-                original_index = row.item_index
-                self.selected_indices.add(original_index)
+            if hasattr(row, "item_id"):
                 context = row.get_style_context()
                 context.add_class("selected-row")
 
-        count = len(self.selected_indices)
+        count = len(self.selected_ids)
         log.info(f"Selected all {count} visible items")
         self.flash_status(f"Selected {count} items")
         self.update_status_label()
@@ -82,12 +83,12 @@ class SelectionMixin:
     def deselect_all_items(self):
         """Clears all selections."""
         for row in self.list_box.get_children():
-            if hasattr(row, "item_index"):
+            if hasattr(row, "item_id"):
                 context = row.get_style_context()
                 context.remove_class("selected-row")
 
-        count = len(self.selected_indices)
-        self.selected_indices.clear()
+        count = len(self.selected_ids)
+        self.selected_ids.clear()
         log.info(f"Deselected all items (was {count})")
         if count > 0:
             self.flash_status("All items deselected")
@@ -1,111 +1,626 @@
+import hashlib
 import json
 import os
+import re
 import threading
+from collections import namedtuple
 from pathlib import Path
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 import logging
 
-from .constants import HISTORY_FILE_PATH
+from .constants import (
+    COMPACT_HISTORY_JSON,
+    HISTORY_DEBOUNCE_MS,
+    HISTORY_FILE_PATH,
+    HISTORY_JOURNAL_PATH,
+    HISTORY_SNAPSHOT,
+    HISTORY_SNAPSHOT_PATH,
+    SAVE_JOURNAL_MAX_ENTRIES,
+    SEARCH_MAX_CHARS,
+)
+from .history_journal import HistoryJournal
+from .history_snapshot import load_snapshot, snapshot_key, write_snapshot
+from .search_index import SearchFieldCache
 
 log = logging.getLogger(__name__)
 
+# Characters of the history file read per step by the streaming parser
+_READ_BLOCK = 1 << 20
+# Items per chunk handed out by `DataManager.iter_history_chunks`
+_CHUNK_SIZE = 5000
+# Characters hashed per step when checking a reload against the last read
+_HASH_BLOCK = 1 << 16
+
+_ARRAY_START = re.compile(r'\s*\{\s*"clipboardHistory"\s*:\s*\[')
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def _validate_item(item):
+    """Checks and normalizes one loaded entry in place; False if unusable."""
+    if not (isinstance(item, dict) and "value" in item and "recorded" in item):
+        return False
+    item["pinned"] = bool(item.get("pinned", False))
+    if item.get("filePath") and not isinstance(item.get("filePath"), str):
+        item["filePath"] = None
+    return True
+
+
+def _iter_history_entries(f):
+    """Yields the entries of the "clipboardHistory" array from a text file.
+
+    Entries are decoded one at a time from a sliding buffer, so memory and
+    time to the first entry do not depend on the file size. Files that do
+    not start with the clipse layout are decoded in one go instead.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(_READ_BLOCK)
+    match = _ARRAY_START.match(buf)
+    if match is None:
+        buf += f.read()
+        yield from json.loads(buf).get("clipboardHistory", [])
+        return
+
+    pos = match.end()
+    while True:
+        pos = _SEPARATORS.match(buf, pos).end()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("Unterminated history array", buf, pos)
+            item, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Probably an entry cut off by the end of the buffer. Read at
+            # least as much again as is pending so a huge entry is not
+            # re-decoded over and over.
+            more = f.read(max(_READ_BLOCK, len(buf) - pos))
+            if not more:
+                raise
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        yield item
+        if pos > _READ_BLOCK:
+            buf = buf[pos:]
+            pos = 0
+
+
+def _scan_entries(text, pos, closed=True):
+    """Yields (entry, end offset) for the values of a JSON array body in *text*.
+
+    Scanning starts at *pos*, just inside the array, and stops at its closing
+    "]". With *closed* False, running out of text also ends the scan instead
+    of raising `json.JSONDecodeError`.
+    """
+    decoder = json.JSONDecoder()
+    while True:
+        pos = _SEPARATORS.match(text, pos).end()
+        if pos >= len(text):
+            if closed:
+                raise json.JSONDecodeError("Unterminated history array", text, pos)
+            return
+        if text[pos] == "]":
+            return
+        item, pos = decoder.raw_decode(text, pos)
+        yield item, pos
+
+
+def _hash_text(hasher, text, start, end):
+    """Feeds text[start:end] to *hasher* in blocks, so it is never copied whole."""
+    for offset in range(start, end, _HASH_BLOCK):
+        hasher.update(text[offset : min(offset + _HASH_BLOCK, end)].encode("utf-8"))
+
+
+def _text_digest(text, start, end):
+    hasher = hashlib.blake2b(digest_size=16)
+    _hash_text(hasher, text, start, end)
+    return hasher.digest()
+
+
+def _file_signature(path):
+    """(inode, size, mtime_ns) of *path*, which a rename keeps; None if missing.
+
+    Raises OSError for other errors.
+    """
+    try:
+        stat_res = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat_res.st_ino, stat_res.st_size, stat_res.st_mtime_ns)
+
+
+def history_key(item):
+    """Identity of a history entry, shared by every copy loaded from the file."""
+    return (item.get("recorded"), item.get("value"), item.get("filePath"))
+
+
+def key_id(key):
+    """The `item_id` of the entry with the given `history_key`."""
+    recorded, value, file_path = key
+    return (recorded, hash((value, file_path)))
+
+
+def item_id(item):
+    """Stable ID of a history item: its timestamp plus a hash of its content.
+
+    Every copy of an entry loaded from the file gets the same ID, so IDs
+    survive reloads. They only live in memory (string hashes differ between
+    runs) and are never written to the history file.
+    """
+    return key_id(history_key(item))
+
+
+def index_items(items):
+    """Returns the {item_id: item} map for *items*."""
+    return {item_id(item): item for item in items}
+
+
+HistoryDiff = namedtuple("HistoryDiff", "added removed pinned")
+HistoryDiff.__doc__ = """Changes to the history file since it was last read.
+
+added: new items, newest first. removed: `history_key`s of entries that are
+gone. pinned: {history_key: pinned} for entries whose pin state flipped.
+"""
+
+
+def apply_history_diff(items, items_by_id, diff):
+    """Returns *items* (sorted newest first) with *diff* applied.
+
+    Entries are looked up through *items_by_id*, which is updated to match;
+    pin flips are applied to the existing dicts in place.
+    """
+    if diff.removed:
+        gone = set()
+        for key in diff.removed:
+            item = items_by_id.pop(key_id(key), None)
+            if item is not None:
+                gone.add(id(item))
+        if gone:
+            items = [item for item in items if id(item) not in gone]
+    for key, pinned in diff.pinned.items():
+        item = items_by_id.get(key_id(key))
+        if item is not None:
+            item["pinned"] = pinned
+    if diff.added:
+        for item in diff.added:
+            items_by_id[item_id(item)] = item
+        added = sorted(diff.added, key=lambda x: x.get("recorded", ""), reverse=True)
+        if not items or added[-1].get("recorded", "") >= items[0].get("recorded", ""):
+            items = added + items
+        else:
+            items = sorted(
+                added + items, key=lambda x: x.get("recorded", ""), reverse=True
+            )
+    return items
+
+
+class _HistoryTracker:
+    """Remembers the last history file read and works out what changed.
+
+    clipse rewrites the whole file for every copy, but usually only puts new
+    entries in front and perhaps drops the oldest ones. When the new text is
+    the previous text with that shape, only the new head is parsed; any other
+    change is parsed in full and compared entry by entry.
+
+    The previous text itself is not kept. To recognize it inside the new
+    text, only its opening and closing parts are, along with a digest of its
+    first entry and of each run of entries the fast path may keep.
+    """
+
+    # Oldest entries that may be dropped on the fast path
+    MAX_DROPPED = 16
+
+    def __init__(self):
+        self._opening = ""  # text up to and including the array's "["
+        self._closing = ""  # text after the last array entry
+        self._first_digest = None  # digest of the first entry's text
+        self._digests = None  # {kept: digest of the first kept entries}
+        self._start = 0  # offset just inside the history array
+        self._offsets = []  # end offset of every array entry, in file order
+        self._keys = []  # history_key per entry, None for invalid ones
+        self._pinned = {}  # history_key -> pinned
+
+    def reset(self, items):
+        """Starts over from *items* loaded elsewhere; the next change is parsed in full."""
+        self.reset_pinned({history_key(item): item["pinned"] for item in items})
+
+    def reset_pinned(self, pinned):
+        """Like `reset`, from the {history_key: pinned} map of the file's entries."""
+        self._digests = None
+        self._offsets = []
+        self._keys = []
+        self._pinned = pinned
+
+    def forget(self):
+        """Returns a diff removing everything known, as if the file were empty."""
+        diff = HistoryDiff([], list(self._pinned), {})
+        self.reset([])
+        return diff
+
+    def update(self, text):
+        """Returns the `HistoryDiff` from the previous text to *text*.
+
+        Raises `json.JSONDecodeError` (and keeps the previous state) when
+        *text* is not a valid history file.
+        """
+        diff = self._update_prepended(text)
+        if diff is None:
+            diff = self._update_full(text)
+        return diff
+
+    def _update_prepended(self, text):
+        """Fast path: new entries in front and/or old ones dropped at the end."""
+        if not self._digests:
+            return None
+        start = self._start
+        if not (text.startswith(self._opening) and text.endswith(self._closing)):
+            return None
+        body_end = len(text) - len(self._closing)
+
+        first_length = self._offsets[0] - start
+        for kept in sorted(self._digests, reverse=True):
+            tail_length = self._offsets[kept - 1] - start
+            head_end = body_end - tail_length
+            # The first entry is checked on its own first, so a wrong guess
+            # at the number of dropped entries rarely hashes the whole tail
+            if (
+                head_end >= start
+                and _text_digest(text, head_end, head_end + first_length)
+                == self._first_digest
+                and _text_digest(text, head_end, body_end) == self._digests[kept]
+            ):
+                head = text[start:head_end]
+                break
+        else:
+            return None
+
+        head_items, head_keys, head_offsets = [], [], []
+        if head.strip():
+            try:
+                for item, end in _scan_entries(head, 0, closed=False):
+                    head_items.append(item)
+                    head_offsets.append(start + end)
+            except json.JSONDecodeError:
+                return None
+            if head[head_offsets[-1] - start :].strip() != ",":
+                return None
+
+        added = []
+        for item in head_items:
+            if _validate_item(item):
+                key = history_key(item)
+                added.append(item)
+                head_keys.append(key)
+                self._pinned[key] = item["pinned"]
+            else:
+                log.warning(f"Skipping invalid item during reload: {item}")
+                head_keys.append(None)
+        removed = [key for key in self._keys[kept:] if key is not None]
+        for key in removed:
+            self._pinned.pop(key, None)
+
+        shift = len(head)
+        self._offsets = head_offsets + [end + shift for end in self._offsets[:kept]]
+        self._keys = head_keys + self._keys[:kept]
+        self._remember(text)
+        log.debug(
+            f"History reload fast path: {len(added)} added, {len(removed)} removed"
+        )
+        return HistoryDiff(added, removed, {})
+
+    def _update_full(self, text):
+        match = _ARRAY_START.match(text)
+        if match is None:
+            entries = json.loads(text).get("clipboardHistory", [])
+            offsets = []
+            start = 0
+        else:
+            start = match.end()
+            entries, offsets = [], []
+            for item, end in _scan_entries(text, start):
+                entries.append(item)
+                offsets.append(end)
+
+        keys = []
+        pinned = {}
+        added = []
+        flipped = {}
+        for item in entries:
+            if not _validate_item(item):
+                log.warning(f"Skipping invalid item during reload: {item}")
+                keys.append(None)
+                continue
+            key = history_key(item)
+            keys.append(key)
+            pinned[key] = item["pinned"]
+            previous = self._pinned.get(key)
+            if previous is None:
+                added.append(item)
+            elif previous != item["pinned"]:
+                flipped[key] = item["pinned"]
+        removed = [key for key in self._pinned if key not in pinned]
+
+        self._start = start
+        self._offsets = offsets
+        self._keys = keys
+        self._pinned = pinned
+        self._remember(text)
+        return HistoryDiff(added, removed, flipped)
+
+    def _remember(self, text):
+        """Keeps what the fast path needs to recognize *text* in the next one."""
+        offsets = self._offsets
+        if not offsets:
+            # Unexpected layout (or no entries): the next change is parsed in full
+            self._digests = None
+            return
+        start = self._start
+        self._opening = text[:start]
+        self._closing = text[offsets[-1] :]
+        self._first_digest = _text_digest(text, start, offsets[0])
+        first_kept = max(1, len(offsets) - self.MAX_DROPPED)
+        hasher = hashlib.blake2b(digest_size=16)
+        _hash_text(hasher, text, start, offsets[first_kept - 1])
+        digests = {first_kept: hasher.digest()}
+        for kept in range(first_kept + 1, len(offsets) + 1):
+            _hash_text(hasher, text, offsets[kept - 2], offsets[kept - 1])
+            digests[kept] = hasher.digest()
+        self._digests = digests
+
 
 class DataManager:
-    """Handles loading and saving clipboard history data."""
+    """Handles loading and saving clipboard history data.
+
+    Results from background threads reach the main loop through *dispatch*,
+    called as ``dispatch(callback, *args)``.
+    """
 
-    def __init__(self, update_callback=None):
+    def __init__(self, update_callback=None, dispatch=GLib.idle_add):
+        self._dispatch = dispatch
         self.file_path = HISTORY_FILE_PATH
+        self.snapshot_path = HISTORY_SNAPSHOT_PATH if HISTORY_SNAPSHOT else None
+        self.journal = (
+            HistoryJournal(HISTORY_JOURNAL_PATH) if SAVE_JOURNAL_MAX_ENTRIES > 0 else None
+        )
+        self.journal_max_entries = SAVE_JOURNAL_MAX_ENTRIES
+        self.compact_json = COMPACT_HISTORY_JSON
         self._save_lock = threading.Lock()
+        self._save_cond = threading.Condition()
+        self._pending_save = None  # (items, callback_on_error, changes)
+        self._saving = False
+        self._writer = None
         self.update_callback = update_callback
-        self._last_mtime = None
-        self._last_size = None
+        self._last_signature = None  # history file as the watcher last saw it
+        # Last history file we wrote: (generation, signature, pinned by key)
+        self._own_write = None
+        self._write_generation = 0
+        self._own_write_lock = threading.Lock()
+        self._tracker = _HistoryTracker()
+        self._history_monitor = None
+        self._watch_timer_id = None
+        self.search_fields = SearchFieldCache(max_chars=SEARCH_MAX_CHARS)
         log.debug(f"DataManager initialized with history file: {self.file_path}")
 
     def load_history(self):
-        """Loads history from the JSON file."""
+        """Loads history from the snapshot if still valid, else the JSON file."""
+        items = self.load_snapshot()
+        if items is not None:
+            return items
+
+        key = self.snapshot_key()
         items = []
-        if os.path.exists(self.file_path):
-            try:
-                current_size = os.path.getsize(self.file_path)
-                if current_size == 0:
-                    log.warning(
-                        f"History file {self.file_path} is empty. Starting fresh."
-                    )
-                    return []
-
-                with open(self.file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    loaded_items = data.get("clipboardHistory", [])
-                    valid_items = []
-                    for item in loaded_items:
-                        if (
-                            isinstance(item, dict)
-                            and "value" in item
-                            and "recorded" in item
-                        ):
-                            item["pinned"] = bool(item.get("pinned", False))
-                            if item.get("filePath") and not isinstance(
-                                item.get("filePath"), str
-                            ):
-                                item["filePath"] = None
-                            valid_items.append(item)
-                        else:
-                            log.warning(f"Skipping invalid item during load: {item}")
-                    items = valid_items
-                log.debug(f"Loaded {len(items)} items from {self.file_path}")
-            except json.JSONDecodeError as e:
-                log.error(f"Failed to decode JSON from {self.file_path}: {e}")
-            except FileNotFoundError:
-                log.error(
-                    f"History file not found during load (race condition?): {self.file_path}"
-                )
-            except Exception as e:
-                log.error(f"Error loading history file {self.file_path}: {e}")
-        else:
-            log.info(f"History file not found: {self.file_path}. Starting fresh.")
+        try:
+            for chunk in self.iter_history_chunks():
+                items.extend(chunk)
+        except json.JSONDecodeError as e:
+            log.error(f"Failed to decode JSON from {self.file_path}: {e}")
+            items = []
+            key = None
+        except FileNotFoundError:
+            log.error(
+                f"History file not found during load (race condition?): {self.file_path}"
+            )
+            key = None
+        except Exception as e:
+            log.error(f"Error loading history file {self.file_path}: {e}")
+            items = []
+            key = None
+        return self.finish_load(items, key)
 
+    def finish_load(self, items, key=None):
+        """Sorts freshly loaded items newest first and prepares them for search.
+
+        When *key* is given (see `snapshot_key`, taken before the file was
+        read), the file's items are also stored as the history snapshot.
+        Edits from the save journal are applied last.
+        """
         try:
             items.sort(key=lambda x: x.get("recorded", ""), reverse=True)
         except Exception as e:
             log.error(f"Error sorting history items: {e}")
 
+        if key is not None and self.snapshot_path:
+            write_snapshot(self.snapshot_path, key, items)
+
+        items = self.replay_journal(items)
+        # Normalize for search here, off the main loop
+        self.search_fields.prime(items)
         return items
 
-    def save_history(self, items, callback_on_error=None):
-        """Saves history to the JSON file in a background thread."""
+    def snapshot_key(self):
+        """Key identifying the history file as it is now; None if missing."""
+        return snapshot_key(self.file_path)
+
+    def load_snapshot(self):
+        """Returns the snapshotted items if the history file is unchanged, else None."""
+        if not self.snapshot_path:
+            return None
+        items = load_snapshot(self.snapshot_path, self.snapshot_key())
+        if items is None:
+            return None
+        log.debug(f"Loaded {len(items)} items from snapshot {self.snapshot_path}")
+        items = self.replay_journal(items)
+        self.search_fields.prime(items)
+        return items
+
+    def replay_journal(self, items):
+        """Applies the save journal's edits to items read from the history file."""
+        if self.journal is None:
+            return items
+        return self.journal.apply(items)
+
+    def iter_history_chunks(self, first_chunk_size=None, chunk_size=_CHUNK_SIZE):
+        """Yields validated history items in file order, a list at a time.
+
+        The file is parsed incrementally, so the first *first_chunk_size*
+        items (default *chunk_size*) are available long before a large file
+        has been read to the end. Raises `json.JSONDecodeError` for a
+        malformed file, possibly after some chunks were already yielded.
+        Nothing is yielded for a missing or empty file.
+        """
+        if not os.path.exists(self.file_path):
+            log.info(f"History file not found: {self.file_path}. Starting fresh.")
+            return
+        if os.path.getsize(self.file_path) == 0:
+            log.warning(f"History file {self.file_path} is empty. Starting fresh.")
+            return
+
+        chunk = []
+        limit = first_chunk_size or chunk_size
+        count = 0
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for item in _iter_history_entries(f):
+                if not _validate_item(item):
+                    log.warning(f"Skipping invalid item during load: {item}")
+                    continue
+                chunk.append(item)
+                if len(chunk) >= limit:
+                    count += len(chunk)
+                    yield chunk
+                    chunk = []
+                    limit = chunk_size
+        if chunk:
+            count += len(chunk)
+            yield chunk
+        log.debug(f"Loaded {count} items from {self.file_path}")
+
+    def save_history(self, items, callback_on_error=None, changes=None):
+        """Queues saving *items* on the background writer thread.
+
+        *changes* are journal records (see `pin_record` and `delete_record`)
+        covering every edit since the last save. While the journal has room
+        for them, only they are appended to it; otherwise, or without
+        *changes*, the whole history file is rewritten and the journal
+        emptied.
+
+        Only the latest queued save is written: one that is still waiting
+        when the next comes in is replaced by it, with the journal records of
+        both. Use `flush_saves` to wait for the write.
+        """
         items_copy = list(items)
-        thread = threading.Thread(
-            target=self._save_thread_target,
-            args=(items_copy, callback_on_error),
-            daemon=True,
-        )
-        thread.start()
+        with self._save_cond:
+            if self._pending_save is not None:
+                pending_changes = self._pending_save[2]
+                if changes is None or pending_changes is None:
+                    changes = None
+                else:
+                    changes = pending_changes + changes
+                log.debug("Replacing a queued history save with a newer one.")
+            self._pending_save = (items_copy, callback_on_error, changes)
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="history-writer", daemon=True
+                )
+                self._writer.start()
+            self._save_cond.notify_all()
+
+    def flush_saves(self, timeout=None):
+        """Waits until queued saves are written; False if *timeout* ran out."""
+        with self._save_cond:
+            return self._save_cond.wait_for(
+                lambda: self._pending_save is None and not self._saving, timeout
+            )
+
+    def compact_journal(self, items):
+        """Queues a full save of *items* if journaled edits are not in the file."""
+        if self.journal is None:
+            return
+        with self._save_cond:
+            journaled = len(self.journal) or self._pending_save is not None
+        if journaled:
+            log.debug("Compacting journaled edits into the history file.")
+            self.save_history(items)
+
+    def _writer_loop(self):
+        """Writes queued saves, one at a time, for the life of the process."""
+        while True:
+            with self._save_cond:
+                self._save_cond.wait_for(lambda: self._pending_save is not None)
+                items, callback_on_error, changes = self._pending_save
+                self._pending_save = None
+                self._saving = True
+            try:
+                self._write_history(items, callback_on_error, changes)
+            finally:
+                with self._save_cond:
+                    self._saving = False
+                    self._save_cond.notify_all()
+
+    def _append_to_journal(self, changes):
+        """Journals *changes*; False if they need a full save instead."""
+        if self.journal is None:
+            return False
+        if len(self.journal) + len(changes) > self.journal_max_entries:
+            return False
+        try:
+            self.journal.append(changes)
+        except OSError as e:
+            log.error(f"Error writing history journal {self.journal.path}: {e}")
+            return False
+        log.debug(f"Journaled {len(changes)} history edits.")
+        return True
 
-    def _save_thread_target(self, items_to_save, callback_on_error):
-        """Actual saving logic executed in a separate thread."""
+    def _write_history(self, items_to_save, callback_on_error, changes=None):
+        """Writes one save (see `save_history`); runs on the writer thread."""
         with self._save_lock:
+            if changes and self._append_to_journal(changes):
+                return
             temp_path = None
             try:
                 Path(self.file_path).parent.mkdir(parents=True, exist_ok=True)
 
                 temp_path = f"{self.file_path}.temp"
                 with open(temp_path, "w", encoding="utf-8") as f:
-                    json.dump(
-                        {"clipboardHistory": items_to_save},
-                        f,
-                        indent=2,
-                        ensure_ascii=False,
-                    )
+                    history = {"clipboardHistory": items_to_save}
+                    if self.compact_json:
+                        # Only one-shot, unindented encoding uses the C encoder
+                        f.write(
+                            json.dumps(history, ensure_ascii=False, separators=(",", ":"))
+                        )
+                    else:
+                        json.dump(history, f, indent=2, ensure_ascii=False)
                     f.flush()
                     os.fsync(f.fileno())
 
+                self._register_own_write(temp_path, items_to_save)
+                # Taken before the rename, as clipse may replace the file
+                # again right after it; a rename keeps inode, size and mtime
+                key = snapshot_key(self.file_path, os.stat(temp_path))
                 os.replace(temp_path, self.file_path)
-                try:
-                    stat_res = os.stat(self.file_path)
-                    self._last_mtime = stat_res.st_mtime
-                    self._last_size = stat_res.st_size
-                except OSError:
-                    pass
+                if self.journal is not None:
+                    # Only now that the file holds the edits
+                    self.journal.clear()
+                if self.snapshot_path:
+                    # What the next load of this file would produce
+                    write_snapshot(
+                        self.snapshot_path,
+                        key,
+                        sorted(
+                            items_to_save,
+                            key=lambda x: x.get("recorded", ""),
+                            reverse=True,
+                        ),
+                    )
             except Exception as e:
                 log.error(f"Error saving history to {self.file_path}: {e}")
                 if temp_path and os.path.exists(temp_path):
@@ -116,70 +631,166 @@ class DataManager:
                             f"Failed to remove temporary save file {temp_path}: {rm_e}"
                         )
                 if callback_on_error:
-                    GLib.idle_add(callback_on_error, f"Error saving: {e}")
+                    self._dispatch(callback_on_error, f"Error saving: {e}")
+
+    def _register_own_write(self, temp_path, items):
+        """Records the file about to replace the history file as our own.
 
-    def _start_history_watcher(self, callback, interval_ms=300):
-        """Starts a periodic file watcher to sync clipboard history."""
+        The watcher skips the history file while it is this exact version
+        (the signature survives the rename), so our saves are not read back.
+        """
+        pinned = {history_key(item): item.get("pinned", False) for item in items}
+        signature = _file_signature(temp_path)
+        with self._own_write_lock:
+            self._write_generation += 1
+            self._own_write = (self._write_generation, signature, pinned)
+
+    def _take_own_write(self, signature):
+        """Returns our last write if the history file is that version, else None."""
+        with self._own_write_lock:
+            own_write = self._own_write
+            if own_write is None or own_write[1] != signature:
+                return None
+            self._own_write = None
+            return own_write
+
+    def read_history_changes(self):
+        """Returns a `HistoryDiff` of the history file against the last read.
+
+        Returns None when the file cannot be parsed right now (for instance
+        while it is being rewritten); the next change is compared against the
+        last good read.
+        """
         try:
-            if os.path.exists(self.file_path):
-                stat_res = os.stat(self.file_path)
-                self._last_mtime = stat_res.st_mtime
-                self._last_size = stat_res.st_size
-            else:
-                self._last_mtime = None
-                self._last_size = None
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            diff = self._tracker.update(text)
+        except json.JSONDecodeError as e:
+            log.warning(f"Ignoring unreadable history file {self.file_path}: {e}")
+            return None
+        if self.journal is not None:
+            diff = self._journal_filter(diff)
+        # history_key() matches the content keys of the search field cache
+        self.search_fields.forget(diff.removed)
+        return diff
+
+    def _journal_filter(self, diff):
+        """Keeps journaled edits from being undone by a history file *diff*.
+
+        The file does not have those edits yet, so it can still list deleted
+        entries and old pin states.
+        """
+        added = self.journal.apply(diff.added)
+        pinned = {
+            key: pinned
+            for key, pinned in diff.pinned.items()
+            if self.journal.lookup(
+                {"recorded": key[0], "value": key[1], "filePath": key[2]}
+            )
+            is None
+        }
+        return HistoryDiff(added, diff.removed, pinned)
+
+    def _start_history_watcher(self, callback, known_items=None, interval_ms=300):
+        """Watches the history file and reports changes to *callback*.
+
+        *callback* receives a `HistoryDiff` against *known_items*, the items
+        the caller loaded, each time the file changes. The clipse directory
+        is monitored with `Gio.FileMonitor`, so files replaced through a
+        rename are noticed too, and a burst of events leads to one check.
+        When the directory cannot be monitored, the file is polled every
+        *interval_ms* instead.
+        """
+        self._tracker.reset(known_items or [])
+        try:
+            self._last_signature = _file_signature(self.file_path)
         except OSError as e:
             log.error(
                 f"Error getting initial state for history watcher {self.file_path}: {e}"
             )
-            self._last_mtime = None
-            self._last_size = None
+            self._last_signature = None
 
-        def check_for_changes():
-            try:
-                if not os.path.exists(self.file_path):
-                    if self._last_mtime is not None or self._last_size is not None:
-                        log.warning(f"History file {self.file_path} disappeared.")
-                        self._last_mtime = None
-                        self._last_size = None
-                        GLib.idle_add(callback, [])
-                    return True
-
-                stat_res = os.stat(self.file_path)
-                current_mtime = stat_res.st_mtime
-                current_size = stat_res.st_size
-
-                changed = False
-                if self._last_mtime is None or self._last_size is None:
-                    changed = True
-                elif (
-                    current_mtime != self._last_mtime or current_size != self._last_size
-                ):
-                    changed = True
-
-                if changed:
-                    log.debug(
-                        f"History file change detected ({self.file_path}). Reloading..."
-                    )
-                    self._last_mtime = current_mtime
-                    self._last_size = current_size
-                    loaded_items = self.load_history()
-                    GLib.idle_add(callback, loaded_items)
-
-            except FileNotFoundError:
-                if self._last_mtime is not None or self._last_size is not None:
-                    log.warning(
-                        f"History file {self.file_path} not found during check."
-                    )
-                    self._last_mtime = None
-                    self._last_size = None
-                    GLib.idle_add(callback, [])
-            except Exception as e:
-                log.error(f"Error while watching history file {self.file_path}: {e}")
+        if self._monitor_history_file(callback):
+            return
 
+        def poll():
+            self._check_history_file(callback)
             return True
 
         log.debug(
             f"Starting history watcher for {self.file_path} every {interval_ms}ms"
         )
-        GLib.timeout_add(interval_ms, check_for_changes)
+        GLib.timeout_add(interval_ms, poll)
+
+    def _monitor_history_file(self, callback):
+        """Monitors the history file's directory; False if that is not possible."""
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        name = os.path.basename(self.file_path)
+        try:
+            monitor = Gio.File.new_for_path(directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error as e:
+            log.warning(
+                f"Cannot monitor {directory} ({e.message}); polling the history file."
+            )
+            return False
+        monitor.set_rate_limit(HISTORY_DEBOUNCE_MS)
+
+        def on_changed(_monitor, file, other_file, _event_type):
+            # Renames report the new name as other_file
+            names = (file.get_basename(), other_file and other_file.get_basename())
+            if name not in names:
+                return
+            if self._watch_timer_id:
+                GLib.source_remove(self._watch_timer_id)
+            self._watch_timer_id = GLib.timeout_add(
+                max(HISTORY_DEBOUNCE_MS, 1), on_settled
+            )
+
+        def on_settled():
+            self._watch_timer_id = None
+            self._check_history_file(callback)
+            return False
+
+        monitor.connect("changed", on_changed)
+        # The monitor stops when garbage collected
+        self._history_monitor = monitor
+        log.debug(f"Monitoring {directory} for changes to {name}")
+        return True
+
+    def _check_history_file(self, callback):
+        """Reads the history file again if it is a new version.
+
+        Versions are told apart by inode, size and mtime. The version our
+        own last save wrote is skipped: the items are already up to date,
+        and the tracker just adopts what was written.
+        """
+        try:
+            signature = _file_signature(self.file_path)
+            if signature == self._last_signature:
+                return
+            self._last_signature = signature
+            if signature is None:
+                log.warning(f"History file {self.file_path} disappeared.")
+                self._dispatch(callback, self._tracker.forget())
+                return
+
+            own_write = self._take_own_write(signature)
+            if own_write is not None:
+                generation, _signature, pinned = own_write
+                log.debug(f"Skipping our own history save (generation {generation}).")
+                self._tracker.reset_pinned(pinned)
+                return
+
+            log.debug(f"History file change detected ({self.file_path}). Reloading...")
+            diff = self.read_history_changes()
+            if diff is not None and any(diff):
+                self._dispatch(callback, diff)
+        except FileNotFoundError:
+            if self._last_signature is not None:
+                log.warning(f"History file {self.file_path} not found during check.")
+                self._last_signature = None
+                self._dispatch(callback, self._tracker.forget())
+        except Exception as e:
+            log.error(f"Error while watching history file {self.file_path}: {e}")
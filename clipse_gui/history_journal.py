@@ -0,0 +1,156 @@
+"""Append-only journal of small history edits, kept between full saves.
+
+Rewriting the whole clipse history file for every pin toggle or delete costs
+I/O proportional to the size of the history. Those edits are appended to a
+small journal instead, one JSON record per line, and the history file is
+only rewritten ("compacted") when the journal is full, when an edit cannot
+be journaled, or on shutdown. The history file itself always stays in the
+format clipse reads; the journal is replayed over it whenever it is loaded.
+
+Records name entries by their `recorded` timestamp and a digest of their
+content, and set a final state ("pin", "unpin" or "delete"). Replaying a
+record twice therefore changes nothing, which keeps compaction crash safe:
+the new history file atomically replaces the old one before the journal is
+removed, and a crash in between only replays edits the file already has.
+Appends are fsynced, and a torn last line from a crash mid-append is
+ignored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+_OPS = ("pin", "unpin", "delete")
+
+
+def content_digest(item):
+    """Digest of an item's value and file path that is stable across runs."""
+    content = json.dumps([item.get("value"), item.get("filePath")], ensure_ascii=False)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def pin_record(item):
+    """Journal record setting the pin state *item* has now."""
+    return _record("pin" if item.get("pinned", False) else "unpin", item)
+
+
+def delete_record(item):
+    """Journal record deleting *item*."""
+    return _record("delete", item)
+
+
+def _record(op, item):
+    return {"op": op, "recorded": item.get("recorded"), "digest": content_digest(item)}
+
+
+class HistoryJournal:
+    """The journal file at *path* and the edits it holds.
+
+    The file is read on first use; `load` reads it again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._loaded = False
+        self._ops = {}  # recorded -> {digest: op}
+        self._count = 0  # records in the file, including superseded ones
+        self._torn = False  # the file ends in a partly written record
+
+    def __len__(self):
+        self._ensure_loaded()
+        return self._count
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def load(self):
+        """Reads the journal file, replacing the edits held in memory."""
+        self._loaded = True
+        self._ops = {}
+        self._count = 0
+        self._torn = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except FileNotFoundError:
+            return
+        except (OSError, UnicodeDecodeError) as e:
+            log.error(f"Error reading history journal {self.path}: {e}")
+            return
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                self._add(record)
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                # Only the last line can be torn by a crash while appending
+                if number < len(lines):
+                    log.warning(f"Skipping bad record on line {number} of {self.path}")
+        # Complete records end in a newline
+        self._torn = bool(lines[-1])
+        log.debug(f"Loaded {self._count} records from history journal {self.path}")
+
+    def _add(self, record):
+        op = record["op"]
+        if op not in _OPS:
+            raise ValueError(op)
+        self._ops.setdefault(record["recorded"], {})[str(record["digest"])] = op
+        self._count += 1
+
+    def append(self, records):
+        """Durably appends *records* to the journal; raises OSError on failure."""
+        self._ensure_loaded()
+        data = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+        if self._torn:
+            data = "\n" + data
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._torn = False
+        for record in records:
+            self._add(record)
+
+    def clear(self):
+        """Removes the journal, once its edits are in the history file."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._loaded = True
+        self._ops = {}
+        self._count = 0
+        self._torn = False
+
+    def lookup(self, item):
+        """The journaled op for *item*, or None if the journal has none."""
+        self._ensure_loaded()
+        ops = self._ops.get(item.get("recorded"))
+        if not ops:
+            return None
+        return ops.get(content_digest(item))
+
+    def apply(self, items):
+        """Returns *items* without deleted entries; pin states are set in place."""
+        self._ensure_loaded()
+        if not self._ops:
+            return items
+        result = []
+        for item in items:
+            op = self.lookup(item)
+            if op == "delete":
+                continue
+            if op is not None:
+                item["pinned"] = op == "pin"
+            result.append(item)
+        return result
@@ -0,0 +1,108 @@
+"""Binary snapshot of the parsed history, for fast startup.
+
+Parsing a large clipse JSON file dominates startup time, yet the file is
+usually unchanged since the last run. A snapshot stores the validated, sorted
+item list in `marshal` format next to a key made of the history file's path,
+inode, size and modification time (plus the Python version, since the
+`marshal` format is version specific). As long as the key still matches, the
+snapshot is loaded instead of the JSON file.
+
+File layout: `_MAGIC`, a little-endian uint32 header length, the marshalled
+key, then the marshalled item list.
+"""
+
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+log = logging.getLogger(__name__)
+
+_MAGIC = b"CLGSNAP1"
+_HEADER_LENGTH = struct.Struct("<I")
+_PAYLOAD_START = len(_MAGIC) + _HEADER_LENGTH.size
+
+
+def snapshot_key(history_path, stat_res=None):
+    """Identifies the current contents of *history_path*; None if missing.
+
+    *stat_res*, if given, is used instead of statting *history_path*: that of
+    a file about to be renamed over it gives the key the rename will leave.
+    """
+    if stat_res is None:
+        try:
+            stat_res = os.stat(history_path)
+        except OSError:
+            return None
+    return (
+        os.path.abspath(history_path),
+        stat_res.st_ino,
+        stat_res.st_size,
+        stat_res.st_mtime_ns,
+        tuple(sys.version_info[:2]),
+    )
+
+
+def load_snapshot(snapshot_path, key):
+    """Returns the items stored for *key*, or None if there is no valid snapshot.
+
+    The file is memory-mapped, so only the header is read before the key is
+    checked and the items are decoded straight from the mapping.
+    """
+    if key is None:
+        return None
+    try:
+        with (
+            open(snapshot_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            if mapped[: len(_MAGIC)] != _MAGIC:
+                return None
+            (header_length,) = _HEADER_LENGTH.unpack_from(mapped, len(_MAGIC))
+            header_end = _PAYLOAD_START + header_length
+            with memoryview(mapped) as view:
+                if marshal.loads(view[_PAYLOAD_START:header_end]) != key:
+                    return None
+                items = marshal.loads(view[header_end:])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError, struct.error) as e:
+        log.warning(f"Ignoring unreadable history snapshot {snapshot_path}: {e}")
+        return None
+    if not isinstance(items, list):
+        return None
+    return items
+
+
+def write_snapshot(snapshot_path, key, items):
+    """Atomically replaces the snapshot with *items* stored under *key*."""
+    if key is None:
+        return
+    temp_path = None
+    try:
+        header = marshal.dumps(key)
+        payload = marshal.dumps(items)
+        directory = os.path.dirname(snapshot_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            prefix=".history_snapshot.", suffix=".temp", dir=directory
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            f.write(payload)
+        os.replace(temp_path, snapshot_path)
+        temp_path = None
+        log.debug(f"Wrote history snapshot of {len(items)} items to {snapshot_path}")
+    except (OSError, ValueError) as e:
+        log.error(f"Error writing history snapshot {snapshot_path}: {e}")
+    finally:
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
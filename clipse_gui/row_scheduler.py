@@ -0,0 +1,97 @@
+"""Spreads list row construction over frames, within a time budget per frame."""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# Smoothing of the measured cost of building one row
+_COST_SMOOTHING = 0.2
+
+
+class RowBuildScheduler:
+    """Runs a row building step once per frame until it reports it is done.
+
+    Steps run from a tick callback on *widget*, so they follow its frame
+    clock: one step per frame, each given *budget_ms* to work with. The
+    scheduler also keeps an average of what building one row costs, so
+    steps can tell how many rows fit in their budget.
+
+    Frames the clock skips between two steps are counted; `skipped` holds
+    the count for the current or last build, `total_skipped` for all of
+    them.
+    """
+
+    def __init__(self, widget, budget_ms=8):
+        self.widget = widget
+        self.budget = budget_ms / 1000
+        self._step = None
+        self._tick_id = None
+        self._last_frame = None
+        self._row_cost = None  # seconds per row built
+        self.frames = 0
+        self.skipped = 0
+        self.total_skipped = 0
+
+    @property
+    def busy(self):
+        """True while a build has steps left to run."""
+        return self._step is not None
+
+    def start(self, step):
+        """Runs *step* now, then once per frame until it returns True.
+
+        *step* is called with the time in seconds it may take. A build that
+        is still running is replaced.
+        """
+        self._step = step
+        self._last_frame = None
+        self.frames = 0
+        self.skipped = 0
+        if self._run():
+            return
+        if self._tick_id is None:
+            self._tick_id = self.widget.add_tick_callback(self._on_tick)
+
+    def cancel(self):
+        """Drops the build that is running, if any."""
+        self._step = None
+        if self._tick_id is not None:
+            self.widget.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+
+    def rows_within(self, seconds, default):
+        """How many rows can be built in *seconds*; *default* until measured."""
+        if self._row_cost is None:
+            return default
+        return max(1, int(seconds / self._row_cost))
+
+    def record(self, rows, seconds):
+        """Adds a measurement: building *rows* rows took *seconds*."""
+        if rows <= 0:
+            return
+        cost = seconds / rows
+        if self._row_cost is None:
+            self._row_cost = cost
+        else:
+            self._row_cost += _COST_SMOOTHING * (cost - self._row_cost)
+
+    def _on_tick(self, widget, frame_clock):
+        frame = frame_clock.get_frame_counter()
+        if self._last_frame is not None and frame > self._last_frame + 1:
+            self.skipped += frame - self._last_frame - 1
+        self._last_frame = frame
+        if self._step is None or self._run():
+            self._tick_id = None
+            return False  # GLib.SOURCE_REMOVE
+        return True
+
+    def _run(self):
+        self.frames += 1
+        if not self._step(self.budget):
+            return False
+        self._step = None
+        self.total_skipped += self.skipped
+        log.debug(
+            f"Rows built over {self.frames} frames, {self.skipped} frames skipped"
+        )
+        return True
@@ -0,0 +1,509 @@
+"""In-memory inverted index over clipboard history used by `fuzzy_search`.
+
+Search tokens never contain whitespace, so a token can only ever match an item
+through one of the whitespace-separated words of its `value` or `filePath`.
+The index therefore keeps one posting list (word -> item ids) per distinct
+word: a token is scored once against the vocabulary and the per-word scores are
+then spread to items through the postings, which yields exactly the same
+`match_quality` as scanning every item.
+
+Substring lookups go through a second, trigram-level index over the same
+vocabulary, so a token of three or more characters is only compared with
+words that contain every one of its trigrams.
+
+Recent queries are cached. When a new query extends a cached one (typing
+"con" -> "conf"), only the cached matches are re-scored, plus the few items
+reachable solely through a similarity match on the extended token, since
+those are the only matches that can appear as a query grows.
+
+The lowercased word set of each item is computed once, normally in the
+history loader thread, and kept in a `SearchFieldCache` keyed by content so
+that neither reloads nor the main loop have to redo it.
+
+When NumPy is installed, the character-set similarity fallback is scored for
+the whole vocabulary at once by `similarity.BitmaskScorer`, with the same
+results as calling `_calculate_similarity` word by word. With the
+"edit_distance" matcher, typo matches come from a `typo_index.TypoIndex`
+over the vocabulary instead.
+"""
+
+import logging
+from collections import OrderedDict, namedtuple
+
+from .similarity import HAS_NUMPY, BitmaskScorer
+from .typo_index import TypoIndex
+from .utils import (
+    FUZZY_MATCHERS,
+    SearchCancelled,
+    _calculate_similarity,
+    _edit_distance_score,
+    _max_edit_distance,
+)
+
+log = logging.getLogger(__name__)
+
+# Vocabulary words scored, or postings and candidates walked, between two
+# cancellation checks
+_CANCEL_CHECK_INTERVAL = 4096
+
+
+# The set of lowercased words of an item's value and path. Scoring only ever
+# asks whether a word is present, so neither the lowercased text nor an
+# ordered word list is kept.
+SearchFields = namedtuple("SearchFields", ["words"])
+
+
+def _lowered(value, max_chars):
+    if not value or not isinstance(value, str):
+        return ""
+    if max_chars and len(value) > max_chars:
+        value = value[:max_chars]
+    return value.lower()
+
+
+def build_search_fields(item, value_key="value", path_key="filePath", max_chars=None):
+    """Normalizes an item for searching, keeping at most *max_chars* per field."""
+    text = _lowered(item.get(value_key), max_chars)
+    path = _lowered(item.get(path_key), max_chars)
+    words = frozenset(text.split()).union(path.split())
+    return SearchFields(words)
+
+
+def _trigrams(text):
+    """Returns the set of overlapping three-character slices of *text*."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _content_key(item, value_key="value", path_key="filePath"):
+    """Identity of an item's searchable content, stable across reloads."""
+    return (item.get("recorded"), item.get(value_key), item.get(path_key))
+
+
+def diff_items(tracked, items, value_key="value", path_key="filePath"):
+    """Compares *items* with the {id(item): item} map of what is tracked.
+
+    Returns (positions, added, adopted, removed): the position of every item
+    by id, the items that are new, (old id, item) pairs for fresh dicts
+    carrying the content of a tracked item that left (as after a reload),
+    and the ids of tracked items that are gone.
+    """
+    positions = {}
+    fresh = []
+    for position, item in enumerate(items):
+        item_id = id(item)
+        positions[item_id] = position
+        if tracked.get(item_id) is not item:
+            fresh.append(item)
+
+    stale_by_content = {}
+    for item_id, item in tracked.items():
+        if item_id not in positions:
+            key = _content_key(item, value_key, path_key)
+            stale_by_content.setdefault(key, []).append(item_id)
+
+    added = []
+    adopted = []
+    for item in fresh:
+        old_ids = stale_by_content.get(_content_key(item, value_key, path_key))
+        if old_ids:
+            adopted.append((old_ids.pop(), item))
+        else:
+            added.append(item)
+
+    removed = [item_id for old_ids in stale_by_content.values() for item_id in old_ids]
+    return positions, added, adopted, removed
+
+
+class SearchFieldCache:
+    """Content-keyed store of `SearchFields`, shared by the loader and the index.
+
+    `prime()` is meant to run on the thread that loads the history so the
+    main loop only ever finds ready-made entries. Lookups of unknown items
+    compute and store them on the spot.
+    """
+
+    def __init__(self, value_key="value", path_key="filePath", max_chars=None):
+        self.value_key = value_key
+        self.path_key = path_key
+        self.max_chars = max_chars or None
+        self._fields = {}  # content key -> SearchFields
+
+    def __len__(self):
+        return len(self._fields)
+
+    def _build(self, item):
+        return build_search_fields(item, self.value_key, self.path_key, self.max_chars)
+
+    def get(self, item):
+        """Returns the search fields for *item*, computing them if needed."""
+        key = _content_key(item, self.value_key, self.path_key)
+        fields = self._fields.get(key)
+        if fields is None:
+            fields = self._build(item)
+            self._fields[key] = fields
+        return fields
+
+    def prime(self, items):
+        """Precomputes fields for *items* and forgets every other entry."""
+        known = self._fields
+        primed = {}
+        for item in items:
+            key = _content_key(item, self.value_key, self.path_key)
+            primed[key] = primed.get(key) or known.get(key) or self._build(item)
+        # Swapped in one step so lookups from other threads never see a
+        # half-built mapping.
+        self._fields = primed
+
+    def forget(self, keys):
+        """Drops the entries stored under the given content keys."""
+        for key in keys:
+            self._fields.pop(key, None)
+
+    def clear(self):
+        self._fields = {}
+
+
+class SearchIndex:
+    """Word -> posting list index kept in sync with the controller's item list.
+
+    Items are tracked by object identity. `sync()` is cheap for unchanged
+    items, and items that come back as fresh dicts after a reload are matched
+    by content so their words are not re-tokenized. Up to *cache_size* recent
+    queries (and their per-token word scores) are kept until the next change.
+    Pass ``use_numpy=False`` to score similarity in pure Python even when
+    NumPy is available. *fuzzy_matcher* is one of `utils.FUZZY_MATCHERS`.
+    """
+
+    def __init__(
+        self,
+        value_key="value",
+        path_key="filePath",
+        cache_size=32,
+        field_cache=None,
+        use_numpy=HAS_NUMPY,
+        fuzzy_matcher="charset",
+    ):
+        if fuzzy_matcher not in FUZZY_MATCHERS:
+            raise ValueError(f"Unknown fuzzy matcher: {fuzzy_matcher!r}")
+        self.value_key = value_key
+        self.path_key = path_key
+        self.cache_size = max(0, cache_size)
+        if field_cache is None:
+            field_cache = SearchFieldCache(value_key, path_key)
+        self.field_cache = field_cache
+        self._items = {}  # item id -> item dict
+        self._words = {}  # item id -> frozenset of words
+        self._positions = {}  # item id -> position in the last synced list
+        self._postings = {}  # word -> set of item ids
+        self._trigram_words = {}  # trigram -> set of words containing it
+        self._token_cache = OrderedDict()  # token -> {word: score}
+        self._result_cache = OrderedDict()  # tuple of tokens -> {item id: score}
+        self.fuzzy_matcher = fuzzy_matcher
+        self._use_numpy = use_numpy and HAS_NUMPY
+        self._scorer = None  # BitmaskScorer for "charset" with NumPy
+        self._typos = None  # TypoIndex for "edit_distance"
+        self._reset_fuzzy_lookup()
+
+    def __len__(self):
+        return len(self._items)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def sync(self, items):
+        """Brings the index in line with *items*, tokenizing only new entries."""
+        positions, added, adopted, removed = diff_items(
+            self._items, items, self.value_key, self.path_key
+        )
+        for old_id, item in adopted:
+            self._rekey(old_id, item)
+        for item in added:
+            self._add(item)
+        for item_id in removed:
+            self._remove(item_id)
+
+        self._positions = positions
+        if added or adopted or removed:
+            self._token_cache.clear()
+            self._result_cache.clear()
+            log.debug(
+                f"Search index synced: {len(added)} added, "
+                f"{len(adopted)} re-used, {len(removed)} removed "
+                f"({len(self._items)} items, {len(self._postings)} words)"
+            )
+
+    def clear(self):
+        """Drops every indexed item."""
+        self._items.clear()
+        self._words.clear()
+        self._positions.clear()
+        self._postings.clear()
+        self._trigram_words.clear()
+        self._reset_fuzzy_lookup()
+        self._token_cache.clear()
+        self._result_cache.clear()
+
+    def _add(self, item):
+        item_id = id(item)
+        words = self.field_cache.get(item).words
+        self._items[item_id] = item
+        self._words[item_id] = words
+        for word in words:
+            posting = self._postings.get(word)
+            if posting is None:
+                self._postings[word] = {item_id}
+                self._add_word(word)
+            else:
+                posting.add(item_id)
+
+    def _remove(self, item_id):
+        self._items.pop(item_id, None)
+        for word in self._words.pop(item_id, ()):
+            posting = self._postings.get(word)
+            if posting is not None:
+                posting.discard(item_id)
+                if not posting:
+                    del self._postings[word]
+                    self._remove_word(word)
+
+    def _reset_fuzzy_lookup(self):
+        if self.fuzzy_matcher == "edit_distance":
+            self._typos = TypoIndex()
+        elif self._use_numpy:
+            self._scorer = BitmaskScorer()
+
+    def _add_word(self, word):
+        if self._typos is not None and len(word) > 2:
+            self._typos.add(word)
+        elif self._scorer is not None:
+            self._scorer.add(word)
+        for trigram in _trigrams(word):
+            words = self._trigram_words.get(trigram)
+            if words is None:
+                self._trigram_words[trigram] = {word}
+            else:
+                words.add(word)
+
+    def _remove_word(self, word):
+        if self._typos is not None:
+            self._typos.remove(word)
+        elif self._scorer is not None:
+            self._scorer.remove(word)
+        for trigram in _trigrams(word):
+            words = self._trigram_words.get(trigram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._trigram_words[trigram]
+
+    def _rekey(self, old_id, item):
+        """Moves an indexed entry over to a new dict carrying the same content."""
+        new_id = id(item)
+        words = self._words.pop(old_id)
+        del self._items[old_id]
+        self._items[new_id] = item
+        self._words[new_id] = words
+        for word in words:
+            posting = self._postings[word]
+            posting.discard(old_id)
+            posting.add(new_id)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def position(self, item_id):
+        """Position of an indexed item in the list passed to the last `sync()`."""
+        return self._positions[item_id]
+
+    def item(self, item_id):
+        return self._items[item_id]
+
+    def _words_containing(self, token):
+        """Returns the indexed words that contain *token* as a substring."""
+        if len(token) < 3:
+            return [word for word in self._postings if token in word]
+
+        postings = []
+        for trigram in _trigrams(token):
+            words = self._trigram_words.get(trigram)
+            if not words:
+                return []
+            postings.append(words)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return [word for word in candidates if token in word]
+
+    def _score_token(self, token, cancelled=None):
+        """Scores *token* against every indexed word, mirroring `fuzzy_search`."""
+        scores = dict.fromkeys(self._words_containing(token), 100)
+
+        # Words of 3+ chars that are a proper prefix of the token
+        for end in range(3, len(token)):
+            prefix = token[:end]
+            if prefix in self._postings and prefix not in scores:
+                scores[prefix] = 60
+
+        if self._typos is not None:
+            max_distance = _max_edit_distance(token)
+            if max_distance:
+                for word, distance in self._typos.find(token, max_distance, cancelled):
+                    if word not in scores:
+                        scores[word] = _edit_distance_score(distance)
+            return scores
+
+        if self._scorer is not None:
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+            for word, similarity in self._scorer.similarities(token, 0.7):
+                if word not in scores:
+                    scores[word] = int(similarity * 50)
+            return scores
+
+        for checked, word in enumerate(self._postings):
+            if (
+                cancelled is not None
+                and checked % _CANCEL_CHECK_INTERVAL == 0
+                and cancelled()
+            ):
+                raise SearchCancelled()
+            if len(word) > 2 and word not in scores:
+                similarity = _calculate_similarity(word, token)
+                if similarity > 0.7:
+                    scores[word] = int(similarity * 50)
+        return scores
+
+    def _cache_get(self, cache, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, cache, key, value):
+        if not self.cache_size:
+            return
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _token_scores(self, token, cancelled=None):
+        scores = self._cache_get(self._token_cache, token)
+        if scores is None:
+            scores = self._score_token(token, cancelled)
+            self._cache_put(self._token_cache, token, scores)
+        return scores
+
+    def _narrowing_base(self, tokens):
+        """Finds the smallest cached result this query can only narrow down.
+
+        A cached query qualifies when each of its tokens is a prefix of the
+        token at the same position here. Returns (results, extended token
+        positions), or (None, None) when nothing qualifies.
+        """
+        best, best_extended = None, None
+        for cached_tokens, results in self._result_cache.items():
+            if len(cached_tokens) > len(tokens):
+                continue
+            extended = []
+            for position, cached_token in enumerate(cached_tokens):
+                token = tokens[position]
+                if token == cached_token:
+                    continue
+                if not token.startswith(cached_token):
+                    break
+                extended.append(position)
+            else:
+                if best is None or len(results) < len(best):
+                    best, best_extended = results, extended
+        return best, best_extended
+
+    def _walk_postings(self, token_scores, cancelled=None):
+        totals = None
+        unchecked = 0  # postings walked since the last cancellation check
+        for scores in token_scores:
+            token_best = {}
+            for word, score in scores.items():
+                posting = self._postings[word]
+                unchecked += len(posting)
+                if unchecked >= _CANCEL_CHECK_INTERVAL:
+                    unchecked = 0
+                    if cancelled is not None and cancelled():
+                        raise SearchCancelled()
+                for item_id in posting:
+                    if totals is not None and item_id not in totals:
+                        continue
+                    if token_best.get(item_id, 0) < score:
+                        token_best[item_id] = score
+
+            if totals is None:
+                totals = token_best
+            else:
+                totals = {
+                    item_id: totals[item_id] + score
+                    for item_id, score in token_best.items()
+                }
+            if not totals:
+                return {}
+        return totals or {}
+
+    def _score_candidates(self, candidates, token_scores, cancelled=None):
+        totals = {}
+        for scored, item_id in enumerate(candidates):
+            if (
+                cancelled is not None
+                and scored % _CANCEL_CHECK_INTERVAL == 0
+                and cancelled()
+            ):
+                raise SearchCancelled()
+            words = self._words[item_id]
+            total = 0
+            for scores in token_scores:
+                if len(scores) < len(words):
+                    best = max(
+                        (score for word, score in scores.items() if word in words),
+                        default=0,
+                    )
+                else:
+                    best = max((scores.get(word, 0) for word in words), default=0)
+                if not best:
+                    break
+                total += best
+            else:
+                totals[item_id] = total
+        return totals
+
+    def search(self, tokens, cancelled=None):
+        """Returns {item id: match quality} for items matching every token.
+
+        The returned dict may be shared with the query cache; treat it as
+        read-only. Raises `SearchCancelled` when *cancelled* returns True
+        while the vocabulary is scored or the postings are walked; nothing
+        partial is cached.
+        """
+        if not tokens:
+            return {}
+        key = tuple(tokens)
+        cached = self._cache_get(self._result_cache, key)
+        if cached is not None:
+            return cached
+
+        token_scores = [self._token_scores(token, cancelled) for token in tokens]
+        walk_cost = sum(
+            len(self._postings[word]) for scores in token_scores for word in scores
+        )
+        base, extended = self._narrowing_base(key)
+        if base is not None and len(base) * len(tokens) < walk_cost:
+            # Exact and prefix hits on an extended token were also hits on
+            # its shorter form, so only similarity hits can be new matches.
+            candidates = set(base)
+            for position in extended:
+                for word, score in token_scores[position].items():
+                    if score < 60:
+                        candidates.update(self._postings[word])
+            totals = self._score_candidates(candidates, token_scores, cancelled)
+        else:
+            totals = self._walk_postings(token_scores, cancelled)
+
+        self._cache_put(self._result_cache, key, totals)
+        return totals
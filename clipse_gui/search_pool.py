@@ -0,0 +1,475 @@
+"""Search backend that scores shards of a large history in worker processes.
+
+`SearchPool` offers the same interface as `SearchIndex` (`sync`, `search`,
+`item`, `position`), so `fuzzy_search` can use either. Each worker process
+keeps a `SearchIndex` over its own shard. Items are sent to a worker once,
+when they first appear; later syncs only send the entries that were added or
+removed. A query is scored by every shard in parallel. For a ranked search
+(`search_ranked`) each shard only sends back its best matches and how many
+it found; `PoolMatches` merges them and asks a shard for its next batch once
+rows past what it sent are shown.
+
+Ties in match quality are broken by history order, as in `fuzzy_search`. The
+shards cannot see positions, so every item carries an order key that sorts
+like its position: new items get keys between their neighbours', and all
+keys are renumbered only when the known items change order.
+
+Workers are started with the "spawn" method so they never inherit the GTK
+main loop's threads. A spawned worker still re-imports the main module of the
+parent first, which for the app means `clipse_gui.cli` along with gi and the
+settings, before it runs `_shard_main`. Starting the workers and the first
+sync of a large history therefore take a while; the app does both on its
+search thread, never on the main loop.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from itertools import pairwise
+from multiprocessing.connection import wait
+
+from .search_index import SearchFieldCache, SearchIndex, diff_items
+from .utils import RankedMatches, SearchCancelled
+
+log = logging.getLogger(__name__)
+
+# Seconds between two cancellation checks while waiting for the shards
+_POLL_INTERVAL = 0.05
+
+
+def _shard_main(
+    conn, generation, value_key, path_key, cache_size, max_chars, fuzzy_matcher
+):
+    """Entry point of a worker process: serves one shard until told to stop."""
+    index = SearchIndex(
+        value_key,
+        path_key,
+        cache_size=cache_size,
+        field_cache=SearchFieldCache(value_key, path_key, max_chars),
+        fuzzy_matcher=fuzzy_matcher,
+    )
+    items = {}  # slot -> item
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        command = message[0]
+        if command == "update":
+            _, added, removed = message
+            for slot in removed:
+                items.pop(slot, None)
+            for slot, value, path, recorded, order in added:
+                items[slot] = {
+                    value_key: value,
+                    path_key: path,
+                    "recorded": recorded,
+                    "slot": slot,
+                    "order": order,
+                }
+            index.sync(list(items.values()))
+        elif command == "order":
+            for slot, order in message[1].items():
+                items[slot]["order"] = order
+        elif command == "search":
+            _, request, search_generation, tokens, limit, after = message
+            try:
+                matches = index.search(
+                    tokens,
+                    # Fetches of deeper results come without a generation
+                    cancelled=None
+                    if search_generation is None
+                    else lambda gen=search_generation: generation.value != gen,
+                )
+            except SearchCancelled:
+                conn.send((request, None))
+                continue
+            # Sort keys as `PoolMatches` merges them: best first, then history order
+            entries = []
+            for item_id, quality in matches.items():
+                item = index.item(item_id)
+                entries.append((-quality, item["order"], item["slot"]))
+            count = len(entries)
+            if after is not None:
+                entries = [entry for entry in entries if entry > after]
+            if limit is not None:
+                entries = heapq.nsmallest(limit, entries)
+            conn.send((request, (count, entries)))
+        elif command == "clear":
+            items.clear()
+            index.clear()
+        elif command == "stop":
+            return
+
+
+class PoolMatches(RankedMatches):
+    """Search results merged lazily from the best matches of each shard.
+
+    Each shard sent its first batch of matches in rank order along with how
+    many it has. A shard whose batch runs out is asked for the next one only
+    when its next match is needed to rank a row.
+    """
+
+    def __init__(self, pool, tokens, replies, batch_size, on_ranked=None):
+        super().__init__((), on_ranked=on_ranked)
+        self._pool = pool
+        self._tokens = tokens
+        self._batch_size = batch_size
+        self._epoch = pool._order_epoch
+        self._pending = []  # per shard: entries received but not merged yet
+        self._unsent = []  # per shard: matches it has not sent yet
+        self._after = []  # per shard: the last entry it sent
+        for shard, (count, entries) in enumerate(replies):
+            self._pending.append(deque(entries))
+            self._unsent.append(count - len(entries))
+            self._after.append(entries[-1] if entries else None)
+            self._push_next(shard)
+        self._size = sum(count for count, _ in replies)
+        self._rank_until(batch_size)
+
+    def _push_next(self, shard):
+        pending = self._pending[shard]
+        if pending:
+            heapq.heappush(self._heap, (pending.popleft(), shard, False))
+        elif self._unsent[shard] > 0:
+            # Sorts right after the shard's last entry, so the next batch
+            # is only fetched once nothing else can come before it
+            heapq.heappush(self._heap, (self._after[shard], shard, True))
+
+    def _fetch(self, shard):
+        entries = None
+        # A renumbering since the search makes the last entry meaningless
+        if self._pool._order_epoch == self._epoch:
+            entries = self._pool._fetch(
+                shard, self._tokens, self._batch_size, self._after[shard]
+            )
+        if not entries:
+            self._unsent[shard] = 0
+            return
+        self._pending[shard].extend(entries)
+        self._unsent[shard] -= len(entries)
+        self._after[shard] = entries[-1]
+
+    def _next_match(self):
+        pool = self._pool
+        while self._heap:
+            entry, shard, more = heapq.heappop(self._heap)
+            if more:
+                self._fetch(shard)
+                self._push_next(shard)
+                continue
+            self._push_next(shard)
+            negated_quality, _, slot = entry
+            item = pool._items.get(slot)
+            position = pool._positions.get(slot)
+            if item is None or position is None:
+                # Removed by a sync after the search
+                self._size -= 1
+                continue
+            return {
+                "original_index": position,
+                "item": item,
+                "match_quality": -negated_quality,
+            }
+        # The shards ran dry early, as after a renumbering
+        self._size = len(self._ranked)
+        return None
+
+
+class SearchPool:
+    """Drop-in `SearchIndex` replacement that searches in worker processes.
+
+    Every tracked item gets an integer slot that identifies it across
+    processes; slots are dealt to shards round-robin. Worker processes are
+    only started by the first `sync()`. Searches and syncs run on one
+    thread, but `PoolMatches` fetch deeper results from whichever thread
+    reads them, so every exchange with the shards holds a lock.
+    """
+
+    def __init__(
+        self,
+        processes,
+        value_key="value",
+        path_key="filePath",
+        cache_size=32,
+        max_chars=None,
+        fuzzy_matcher="charset",
+    ):
+        self.processes = max(1, processes)
+        self.value_key = value_key
+        self.path_key = path_key
+        self.cache_size = cache_size
+        self.max_chars = max_chars
+        self.fuzzy_matcher = fuzzy_matcher
+        self._context = multiprocessing.get_context("spawn")
+        self._generation = None  # shared counter, bumped to cancel searches
+        self._lock = threading.Lock()
+        self._shards = []  # (process, connection)
+        self._tracked = {}  # id(item) -> item
+        self._slots = {}  # id(item) -> slot
+        self._items = {}  # slot -> item
+        self._positions = {}  # slot -> position in the last synced list
+        self._orders = {}  # slot -> key that sorts like the position
+        self._order_epoch = 0  # bumped whenever order keys are reassigned
+        self._next_slot = 0
+        self._request = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    # ------------------------------------------------------------------
+    # Worker processes
+    # ------------------------------------------------------------------
+
+    def _start(self):
+        self._generation = self._context.Value("q", 0)
+        for number in range(self.processes):
+            parent_conn, child_conn = self._context.Pipe()
+            process = self._context.Process(
+                target=_shard_main,
+                args=(
+                    child_conn,
+                    self._generation,
+                    self.value_key,
+                    self.path_key,
+                    self.cache_size,
+                    self.max_chars,
+                    self.fuzzy_matcher,
+                ),
+                name=f"clipse-gui-search-{number}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._shards.append((process, parent_conn))
+        log.debug(f"Started {self.processes} search worker processes")
+
+    def stop(self):
+        """Stops the worker processes; the pool restarts them on the next sync."""
+        with self._lock:
+            for _, conn in self._shards:
+                try:
+                    conn.send(("stop",))
+                except OSError:
+                    pass
+            for process, conn in self._shards:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+                conn.close()
+            self._shards = []
+        self._forget()
+
+    def _forget(self):
+        self._tracked.clear()
+        self._slots.clear()
+        self._items.clear()
+        self._positions.clear()
+        self._orders.clear()
+        self._order_epoch += 1
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def sync(self, items):
+        """Brings the shards in line with *items*, sending only the changes."""
+        if not self._shards:
+            self._start()
+        positions, added, adopted, removed = diff_items(
+            self._tracked, items, self.value_key, self.path_key
+        )
+
+        # Reloaded dicts with known content keep their slot; the workers
+        # never hear about them.
+        for old_id, item in adopted:
+            slot = self._slots.pop(old_id)
+            del self._tracked[old_id]
+            self._tracked[id(item)] = item
+            self._slots[id(item)] = slot
+            self._items[slot] = item
+
+        shard_count = len(self._shards)
+        shard_removed = [[] for _ in self._shards]
+        for item_id in removed:
+            del self._tracked[item_id]
+            slot = self._slots.pop(item_id)
+            del self._items[slot]
+            del self._orders[slot]
+            shard_removed[slot % shard_count].append(slot)
+        added_slots = set()
+        for item in added:
+            slot = self._next_slot
+            self._next_slot += 1
+            self._tracked[id(item)] = item
+            self._slots[id(item)] = slot
+            self._items[slot] = item
+            added_slots.add(slot)
+
+        slots = [self._slots[id(item)] for item in items]
+        renumbered = not self._place(slots, added_slots)
+        if renumbered:
+            self._orders = {slot: position for position, slot in enumerate(slots)}
+            self._order_epoch += 1
+
+        shard_added = [[] for _ in self._shards]
+        for item in added:
+            slot = self._slots[id(item)]
+            shard_added[slot % shard_count].append(
+                (
+                    slot,
+                    item.get(self.value_key),
+                    item.get(self.path_key),
+                    item.get("recorded"),
+                    self._orders[slot],
+                )
+            )
+        shard_orders = [{} for _ in self._shards]
+        if renumbered:
+            for slot, order in self._orders.items():
+                if slot not in added_slots:
+                    shard_orders[slot % shard_count][slot] = order
+
+        with self._lock:
+            for (_, conn), shard_add, shard_remove, orders in zip(
+                self._shards, shard_added, shard_removed, shard_orders
+            ):
+                if shard_add or shard_remove:
+                    conn.send(("update", shard_add, shard_remove))
+                if orders:
+                    conn.send(("order", orders))
+
+        self._positions = {
+            self._slots[item_id]: position for item_id, position in positions.items()
+        }
+        if added or removed or renumbered:
+            log.debug(
+                f"Search pool synced: {len(added)} added, {len(adopted)} re-used, "
+                f"{len(removed)} removed ({len(self._items)} items"
+                f"{', order renumbered' if renumbered else ''})"
+            )
+
+    def _place(self, slots, added_slots):
+        """Gives the added slots order keys between those of their neighbours.
+
+        Returns False when the known slots are out of key order, or a gap is
+        too narrow for the slots added in it, so every key must be renumbered.
+        """
+        orders = self._orders
+        previous = None
+        run = []
+        for slot in slots:
+            if slot in added_slots:
+                run.append(slot)
+                continue
+            order = orders[slot]
+            if previous is not None and order <= previous:
+                return False
+            if run:
+                if not self._fill(run, previous, order):
+                    return False
+                run = []
+            previous = order
+        return not run or self._fill(run, previous, None)
+
+    def _fill(self, run, low, high):
+        if low is None:
+            low = (0 if high is None else high) - len(run) - 1
+        step = 1 if high is None else (high - low) / (len(run) + 1)
+        keys = [low + step * (number + 1) for number in range(len(run))]
+        bounds = [low, *keys] + ([] if high is None else [high])
+        if any(a >= b for a, b in pairwise(bounds)):
+            return False
+        self._orders.update(zip(run, keys))
+        return True
+
+    def clear(self):
+        """Drops every tracked item but keeps the workers running."""
+        with self._lock:
+            for _, conn in self._shards:
+                conn.send(("clear",))
+        self._forget()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def position(self, slot):
+        """Position of a tracked item in the list passed to the last `sync()`."""
+        return self._positions[slot]
+
+    def item(self, slot):
+        return self._items[slot]
+
+    def search(self, tokens, cancelled=None):
+        """Returns {slot: match quality} for items matching every token.
+
+        Raises `SearchCancelled` when *cancelled* returns True before every
+        shard has answered; the shards then abandon the query as well.
+        """
+        return {
+            slot: -negated_quality
+            for _, entries in self._query(tokens, None, cancelled)
+            for negated_quality, _, slot in entries
+        }
+
+    def search_ranked(self, tokens, limit, cancelled=None, on_ranked=None):
+        """Returns `PoolMatches` for *tokens* with the best *limit* ranked.
+
+        Each shard only sends its best *limit* matches and its match count;
+        cancelling works as for `search`.
+        """
+        replies = self._query(tokens, limit, cancelled)
+        return PoolMatches(self, list(tokens), replies, limit, on_ranked)
+
+    def _query(self, tokens, limit, cancelled):
+        """Asks every shard for its first *limit* matches (all with None).
+
+        Returns a (match count, entries) reply per shard, in shard order.
+        """
+        if not tokens or not self._shards:
+            return []
+        with self._lock:
+            self._request += 1
+            request = self._request
+            with self._generation.get_lock():
+                self._generation.value += 1
+                search_generation = self._generation.value
+            for _, conn in self._shards:
+                conn.send(
+                    ("search", request, search_generation, list(tokens), limit, None)
+                )
+
+            replies = {}
+            waiting = {conn for _, conn in self._shards}
+            while waiting:
+                if cancelled is not None and cancelled():
+                    with self._generation.get_lock():
+                        self._generation.value += 1
+                    raise SearchCancelled()
+                for conn in wait(list(waiting), timeout=_POLL_INTERVAL):
+                    reply_request, reply = conn.recv()
+                    # Replies to abandoned queries are still in the pipe; skip them
+                    if reply_request != request:
+                        continue
+                    if reply is None:
+                        raise SearchCancelled()
+                    replies[conn] = reply
+                    waiting.discard(conn)
+            return [replies[conn] for _, conn in self._shards]
+
+    def _fetch(self, shard, tokens, limit, after):
+        """Returns the next *limit* entries of *shard* that rank after *after*."""
+        with self._lock:
+            if shard >= len(self._shards):
+                return []
+            conn = self._shards[shard][1]
+            self._request += 1
+            request = self._request
+            conn.send(("search", request, None, tokens, limit, after))
+            while True:
+                reply_request, reply = conn.recv()
+                if reply_request == request:
+                    return reply[1]
@@ -0,0 +1,95 @@
+"""Background thread that runs searches off the GTK main loop."""
+
+import logging
+import threading
+from functools import partial
+
+from gi.repository import GLib
+
+from .utils import SearchCancelled
+
+log = logging.getLogger(__name__)
+
+
+class SearchWorker:
+    """Runs one search at a time on a long-lived daemon thread.
+
+    Only the most recent request matters: submitting a new search (or calling
+    `cancel()`) makes every earlier one stale. A stale search that has not
+    started yet is dropped, one that is running is asked to stop through the
+    `cancelled` callback it receives, and a result that still slips through is
+    discarded on the main loop instead of being delivered.
+
+    The search index is only ever used from the worker thread (syncs run
+    there too, as part of a search), so it needs no lock.
+    """
+
+    def __init__(self, dispatch=GLib.idle_add):
+        self._dispatch = dispatch
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._pending = None  # (generation, search, on_done)
+        self._thread = None
+        self._stopped = False
+
+    def submit(self, search, on_done):
+        """Queues `search(cancelled)` and cancels anything submitted before.
+
+        *on_done* is called on the main loop with the search's return value,
+        unless another search was submitted or cancelled in the meantime.
+        """
+        with self._condition:
+            if self._stopped:
+                return
+            self._generation += 1
+            self._pending = (self._generation, search, on_done)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="clipse-gui-search", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self):
+        """Makes the pending and running searches stale."""
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+
+    def stop(self):
+        """Cancels everything and lets the worker thread exit."""
+        with self._condition:
+            self._stopped = True
+            self._generation += 1
+            self._pending = None
+            self._condition.notify()
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                generation, search, on_done = self._pending
+                self._pending = None
+
+            if self._is_stale(generation):
+                continue
+            try:
+                result = search(partial(self._is_stale, generation))
+            except SearchCancelled:
+                log.debug(f"Search {generation} cancelled")
+                continue
+            except Exception as e:
+                log.error(f"Error in background search: {e}")
+                continue
+            self._dispatch(self._deliver, generation, on_done, result)
+
+    def _deliver(self, generation, on_done, result):
+        if not self._is_stale(generation):
+            on_done(result)
+        return False
@@ -0,0 +1,133 @@
+"""Vectorized `_calculate_similarity` over a whole vocabulary, using NumPy.
+
+Each word is stored as a character-presence bitmask (one bit per distinct
+character seen so far, spread over as many uint64 columns as needed) plus its
+length. Scoring a token against every word is then a handful of array
+operations: popcounts of AND/OR give the intersection and union sizes of the
+character sets, and the score is combined in exactly the same float64 order
+as `_calculate_similarity`, so both give bit-identical results.
+
+NumPy is optional; `HAS_NUMPY` tells whether `BitmaskScorer` can be used.
+"""
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+_INITIAL_ROWS = 1024
+
+if HAS_NUMPY:
+    _POPCOUNT8 = np.array([i.bit_count() for i in range(256)], dtype=np.int64)
+
+
+def _popcount_rows(masks):
+    """Number of set bits in each row of a 2-D uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).sum(axis=1, dtype=np.int64)
+    per_byte = _POPCOUNT8[masks.view(np.uint8)]
+    return per_byte.reshape(masks.shape[0], -1).sum(axis=1)
+
+
+class BitmaskScorer:
+    """Character-set similarity of one token against many words at once.
+
+    Only words longer than two characters are kept, since `fuzzy_search`
+    never compares shorter ones. Rows of removed words are recycled.
+    """
+
+    def __init__(self):
+        self._bits = {}  # character -> bit number
+        self._rows = {}  # word -> row
+        self._words = [None] * _INITIAL_ROWS  # row -> word
+        self._free = list(range(_INITIAL_ROWS - 1, -1, -1))
+        self._masks = np.zeros((_INITIAL_ROWS, 1), dtype=np.uint64)
+        self._lengths = np.zeros(_INITIAL_ROWS, dtype=np.int64)  # 0 = free row
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, word):
+        return word in self._rows
+
+    def add(self, word):
+        if len(word) <= 2 or word in self._rows:
+            return
+        if not self._free:
+            self._grow_rows()
+        row = self._free.pop()
+        self._masks[row] = self._mask(word, grow=True)
+        self._lengths[row] = len(word)
+        self._words[row] = word
+        self._rows[word] = row
+
+    def remove(self, word):
+        row = self._rows.pop(word, None)
+        if row is None:
+            return
+        self._masks[row] = 0
+        self._lengths[row] = 0
+        self._words[row] = None
+        self._free.append(row)
+
+    def _grow_rows(self):
+        rows = len(self._words)
+        self._masks = np.vstack([self._masks, np.zeros_like(self._masks)])
+        self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+        self._words.extend([None] * rows)
+        self._free.extend(range(2 * rows - 1, rows - 1, -1))
+
+    def _mask(self, text, grow=False):
+        """Returns (mask row, count of characters without a bit) for *text*."""
+        bits = 0
+        unknown = 0
+        for char in set(text):
+            bit = self._bits.get(char)
+            if bit is None:
+                if not grow:
+                    unknown += 1
+                    continue
+                bit = len(self._bits)
+                self._bits[char] = bit
+            bits |= 1 << bit
+
+        columns = (len(self._bits) + 63) // 64
+        if columns > self._masks.shape[1]:
+            extra = columns - self._masks.shape[1]
+            self._masks = np.hstack(
+                [self._masks, np.zeros((len(self._masks), extra), dtype=np.uint64)]
+            )
+        mask = np.array(
+            [(bits >> (64 * column)) & 0xFFFFFFFFFFFFFFFF for column in range(columns)],
+            dtype=np.uint64,
+        )
+        if len(mask) < self._masks.shape[1]:
+            mask = np.append(
+                mask, np.zeros(self._masks.shape[1] - len(mask), np.uint64)
+            )
+        return mask if grow else (mask, unknown)
+
+    def similarities(self, token, threshold):
+        """Yields (word, similarity) for every word scoring above *threshold*."""
+        if not self._rows:
+            return
+        token_mask, unknown = self._mask(token)
+        intersection = _popcount_rows(self._masks & token_mask)
+        union = _popcount_rows(self._masks | token_mask) + unknown
+
+        lengths = self._lengths
+        token_length = len(token)
+        active = lengths > 0
+        # Free rows have length 0; keep them out of the divisions below
+        union = np.where(active, union, 1)
+        longest = np.where(active, np.maximum(lengths, token_length), 1)
+
+        basic_score = intersection / union
+        len_ratio = np.minimum(lengths, token_length) / longest
+        similarity = (basic_score * 0.7) + (len_ratio * 0.3)
+
+        for row in np.flatnonzero(active & (similarity > threshold)):
+            yield self._words[row], float(similarity[row])
@@ -0,0 +1,136 @@
+"""Sorted vocabulary that can be searched for words within a few typos.
+
+Finding every word within edit distance *k* of a token is done by walking the
+vocabulary in sorted order as if it were a trie: words that share a prefix
+share the Levenshtein DP rows computed for that prefix, and as soon as every
+cell of a row exceeds *k* no word with that prefix can match, so the whole
+block of words carrying it is skipped with a bisect. This is the DP
+simulation of a Levenshtein automaton; only the few prefixes that stay within
+*k* edits of the token are ever looked at, while the index itself is just a
+sorted list of the words.
+"""
+
+from bisect import bisect_left
+
+from .utils import SearchCancelled
+
+_MAX_CODE_POINT = 0x10FFFF
+
+
+def _prefix_end(prefix):
+    """Smallest string that sorts after every string starting with *prefix*."""
+    last = ord(prefix[-1])
+    if last == _MAX_CODE_POINT:
+        return None
+    return prefix[:-1] + chr(last + 1)
+
+
+def _common_prefix_length(str1, str2):
+    length = min(len(str1), len(str2))
+    for i in range(length):
+        if str1[i] != str2[i]:
+            return i
+    return length
+
+
+class TypoIndex:
+    """Set of words that can be queried for neighbours by edit distance.
+
+    Additions and removals are applied to the sorted list in one pass before
+    the next lookup, so syncing a large batch of words stays cheap.
+    """
+
+    def __init__(self, words=()):
+        self._members = set(words)
+        self._words = sorted(self._members)
+        self._added = []  # members not yet merged into _words
+        self._removed = set()  # entries of _words or _added to drop
+
+    def __len__(self):
+        return len(self._members)
+
+    def __contains__(self, word):
+        return word in self._members
+
+    def add(self, word):
+        if word in self._members:
+            return
+        self._members.add(word)
+        if word in self._removed:
+            # Still listed from before its removal
+            self._removed.discard(word)
+        else:
+            self._added.append(word)
+
+    def remove(self, word):
+        if word in self._members:
+            self._members.discard(word)
+            self._removed.add(word)
+
+    def _refresh(self):
+        if self._removed:
+            removed = self._removed
+            self._words = [word for word in self._words if word not in removed]
+            self._added = [word for word in self._added if word not in removed]
+            self._removed = set()
+        if self._added:
+            # Appending a batch to the sorted list lets sort() merge two runs
+            self._words.extend(self._added)
+            self._words.sort()
+            self._added = []
+
+    def find(self, token, max_distance, cancelled=None):
+        """Returns [(word, distance)] for words within *max_distance* of *token*.
+
+        *cancelled* is polled now and then; see `SearchIndex.search`.
+        """
+        self._refresh()
+        words = self._words
+        matches = []
+        # rows[i] is the DP row of `token` against `prefix[:i]`
+        rows = [list(range(len(token) + 1))]
+        prefix = ""
+        index = 0
+        steps = 0
+        while index < len(words):
+            word = words[index]
+            depth = _common_prefix_length(prefix, word)
+            del rows[depth + 1 :]
+
+            dead = False
+            while depth < len(word):
+                previous = rows[-1]
+                char = word[depth]
+                row = [previous[0] + 1]
+                for j, token_char in enumerate(token, 1):
+                    row.append(
+                        min(
+                            previous[j] + 1,
+                            row[j - 1] + 1,
+                            previous[j - 1] + (token_char != char),
+                        )
+                    )
+                rows.append(row)
+                depth += 1
+                if min(row) > max_distance:
+                    dead = True
+                    break
+
+            steps += 1
+            if cancelled is not None and steps % 1024 == 0 and cancelled():
+                raise SearchCancelled()
+
+            if dead:
+                # Nothing that starts with this prefix can come back in range
+                prefix = word[:depth]
+                end = _prefix_end(prefix)
+                index = (
+                    bisect_left(words, end, index + 1) if end is not None else index + 1
+                )
+                continue
+
+            if rows[-1][-1] <= max_distance:
+                matches.append((word, rows[-1][-1]))
+            prefix = word
+            index += 1
+        return matches
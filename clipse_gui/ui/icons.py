@@ -1,8 +1,9 @@
 """Pin icon creation and shake animation."""
 
 import logging
+from functools import lru_cache
 
-from gi.repository import GdkPixbuf, GLib, Gtk
+from gi.repository import Gdk, GdkPixbuf, GLib, Gtk
 
 log = logging.getLogger(__name__)
 
@@ -15,25 +16,55 @@ PIN_SVG_BASE = """<?xml version="1.0" encoding="UTF-8"?>
     </g>
 </svg>
 """
+PIN_ICON_SIZE = 18
 
 
-def create_pin_icon(is_pinned, angle=25):
-    """Creates a pin icon from SVG data with color based on pinned state."""
+@lru_cache(maxsize=64)
+def pin_pixbuf(is_pinned, angle=25, scale=1):
+    """The pin icon rendered at *scale* device pixels per pixel.
+
+    Rendered once per (pinned, angle, scale); rows and the shake animation
+    share the result. GdkPixbuf.Pixbuf is immutable, so sharing is safe.
+    """
+    # Replace currentColor with actual color
+    color = "#ffcc00" if is_pinned else "rgba(255,255,255,0.25)"
+    svg_data = PIN_SVG_BASE.replace("currentColor", color).replace(
+        "{angle}", str(angle)
+    )
+
+    # Load SVG into pixbuf
+    loader = GdkPixbuf.PixbufLoader.new_with_type("svg")
+    loader.set_size(PIN_ICON_SIZE * scale, PIN_ICON_SIZE * scale)
+    loader.write(svg_data.encode("utf-8"))
+    loader.close()
+    return loader.get_pixbuf()
+
+
+def _screen_scale():
+    """Scale factor of the main monitor, 1 when there is none."""
+    display = Gdk.Display.get_default()
+    if display is None:
+        return 1
+    monitor = display.get_primary_monitor() or display.get_monitor(0)
+    return monitor.get_scale_factor() if monitor else 1
+
+
+def create_pin_icon(is_pinned, angle=25, scale=None):
+    """Creates a pin icon from SVG data with color based on pinned state.
+
+    *scale* defaults to the scale factor of the screen.
+    """
     try:
-        # Replace currentColor with actual color
-        color = "#ffcc00" if is_pinned else "rgba(255,255,255,0.25)"
-        svg_data = PIN_SVG_BASE.replace("currentColor", color).replace(
-            "{angle}", str(angle)
-        )
-
-        # Load SVG into pixbuf
-        loader = GdkPixbuf.PixbufLoader.new_with_type("svg")
-        loader.write(svg_data.encode("utf-8"))
-        loader.close()
-        pixbuf = loader.get_pixbuf()
+        if scale is None:
+            scale = _screen_scale()
+        pixbuf = pin_pixbuf(is_pinned, angle, scale)
 
         # Create image from pixbuf
-        image = Gtk.Image.new_from_pixbuf(pixbuf)
+        if scale == 1:
+            image = Gtk.Image.new_from_pixbuf(pixbuf)
+        else:
+            surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+            image = Gtk.Image.new_from_surface(surface)
         image.get_style_context().add_class("pin-icon")
         if is_pinned:
             image.get_style_context().add_class("pinned")
@@ -49,7 +80,12 @@ def create_pin_icon(is_pinned, angle=25):
 
 
 def animate_pin_shake(container, is_pinned):
-    """Animates a gentle rotation wiggle effect by recreating the icon at different angles."""
+    """Animates a gentle rotation wiggle effect by recreating the icon at different angles.
+
+    A wiggle stops early when another starts on *container* or
+    `stop_pin_shake` is called on it.
+    """
+    token = container.pin_wiggle = object()
     # Gentle rotation sequence: base angle ± small rotations
     base_angle = 25
     rotation_sequence = [
@@ -61,6 +97,8 @@ def animate_pin_shake(container, is_pinned):
     ]
 
     def apply_wiggle(index):
+        if getattr(container, "pin_wiggle", None) is not token:
+            return False
         if index < len(rotation_sequence):
             # Remove old icon
             children = container.get_children()
@@ -77,6 +115,18 @@ def animate_pin_shake(container, is_pinned):
             container.pack_end(new_icon, False, False, 0)
 
             GLib.timeout_add(70, apply_wiggle, index + 1)
+        else:
+            container.pin_wiggle = None
         return False
 
     apply_wiggle(0)
+
+
+def stop_pin_shake(container):
+    """Stops the wiggle running on *container*; True if one was running.
+
+    The icon is left at whatever angle the wiggle had reached.
+    """
+    running = getattr(container, "pin_wiggle", None) is not None
+    container.pin_wiggle = None
+    return running
@@ -1,6 +1,15 @@
-"""List row widget creation for clipboard items (text, image, URL, SVG, data URI)."""
+"""List row widget creation for clipboard items (text, image, URL, SVG, data URI).
+
+A row is built in two steps: `_build_row` creates the widget tree for a row
+kind, and `bind_list_row` fills it in for one item. `RowPool` keeps rows that
+left the list so they can be bound to other items of the same kind instead
+of building a new tree. What a row shows for an item (content type, preview
+texts, parsed timestamp) is worked out once per item by `row_display`.
+"""
 
 import os
+from collections import namedtuple
+from functools import lru_cache
 
 from gi.repository import Gdk, Gtk, Pango
 
@@ -9,10 +18,94 @@ from ..constants import (
     LIST_ITEM_IMAGE_WIDTH,
     PREVIEW_RICH_CONTENT,
 )
-from ..utils import format_date
+from ..data_manager import item_id
+from ..utils import format_datetime, parse_date
 from .detection import _is_data_uri, _is_image_url, _is_svg_content, _is_url
-from .icons import create_pin_icon
-from .text import highlight_search_term
+from .icons import create_pin_icon, stop_pin_shake
+from .text import highlight_search_term, highlight_spans
+
+# Free rows kept per pool key; a little more than a screenful plus overscan
+_POOL_SIZE = 64
+
+# Items whose display model is kept; rows only ever show a few of them
+_DISPLAY_CACHE_SIZE = 4096
+
+# What a row shows for an item. `content` is "image", "image_url", "svg",
+# "data_uri", "url" or "text"; `labels` holds the label text for the normal
+# and the compact layout; `timestamp` is the parsed `recorded` time, or
+# None when it does not parse.
+RowDisplay = namedtuple(
+    "RowDisplay", ["kind", "content", "source", "labels", "recorded", "timestamp"]
+)
+
+
+def row_kind(item):
+    """The kind of row that shows *item*: "image", "thumbnail", "url" or "text".
+
+    Rows of one kind have the same widgets; "thumbnail" covers image URLs,
+    data URIs and inline SVG when rich content previews are on.
+    """
+    return row_display(item).kind
+
+
+def row_display(item):
+    """The `RowDisplay` for *item*, computed once per value, path and time."""
+    return _row_display(item.get("value", ""), item.get("filePath"), item.get("recorded", ""))
+
+
+@lru_cache(maxsize=_DISPLAY_CACHE_SIZE)
+def _row_display(text_value, file_path, recorded):
+    # Detect special content types for text items
+    if file_path not in [None, "null", ""]:
+        content = "image"
+    elif _is_image_url(text_value):
+        content = "image_url"
+    elif _is_svg_content(text_value):
+        content = "svg"
+    elif _is_data_uri(text_value):
+        content = "data_uri"
+    elif _is_url(text_value):
+        content = "url"
+    else:
+        content = "text"
+
+    if content == "image":
+        kind = "image"
+        name = os.path.basename(text_value or "Image")
+        labels = (name, name)
+    elif content in ("image_url", "svg", "data_uri") and PREVIEW_RICH_CONTENT:
+        kind = "thumbnail"
+        badge = {"image_url": "[image url]", "svg": "[svg]", "data_uri": "[base64]"}
+        labels = (badge[content], badge[content])
+    elif content == "url":
+        kind = "url"
+        labels = (_url_label(text_value, 80), _url_label(text_value, 50))
+    else:
+        kind = "text"
+        lines = text_value.splitlines()
+        labels = (_text_label(lines, 3, 150), _text_label(lines, 1, 80))
+
+    timestamp = parse_date(recorded) if recorded else None
+    source = text_value.strip() if kind != "text" else None
+    return RowDisplay(kind, content, source, labels, recorded, timestamp)
+
+
+def _url_label(text_value, max_chars):
+    display_url = text_value.strip()
+    if len(display_url) > max_chars:
+        display_url = display_url[:max_chars - 1] + "…"
+    return display_url
+
+
+def _text_label(lines, max_lines, cutoff):
+    # Limit to 1 line in compact mode, 3 lines otherwise
+    display_text = "\n".join(lines[:max_lines])
+    if len(lines) > max_lines or len(display_text) > cutoff:
+        last_space = display_text[:cutoff].rfind(" ")
+        if last_space > cutoff * 0.8:
+            cutoff = last_space
+        display_text = display_text[:cutoff] + "..."
+    return display_text
 
 
 def create_list_row_widget(
@@ -26,41 +119,34 @@ def create_list_row_widget(
     highlight_search=False,
 ):
     """Creates a Gtk.ListBoxRow widget for a clipboard item."""
-    original_index = item_info["original_index"]
-    item = item_info["item"]
-    filtered_index = item_info["filtered_index"]
-    row = Gtk.ListBoxRow()
-    row.item_index = original_index
-    row.filtered_index = filtered_index
-    row.item_value = item.get("value", "")
-    row.item_pinned = item.get("pinned", False)
-    row.file_path = item.get("filePath", "")
-    row.is_image = item.get("filePath") not in [None, "null", ""]
+    kind = row_display(item_info["item"]).kind
+    row = _build_row(kind, compact_mode, hover_to_select, single_click_callback)
+    bind_list_row(
+        row,
+        item_info,
+        image_handler,
+        update_image_callback,
+        search_term,
+        highlight_search,
+    )
+    return row
 
-    # Detect special content types for text items
-    text_value = item.get("value", "")
-    row.is_url_image = False
-    row.is_svg_content = False
-    row.is_data_uri = False
-    row.is_url = False
-    row.image_url = None
-    row.website_url = None
-    if not row.is_image:
-        if _is_image_url(text_value):
-            row.is_url_image = True
-            row.image_url = text_value.strip()
-        elif _is_svg_content(text_value):
-            row.is_svg_content = True
-        elif _is_data_uri(text_value):
-            row.is_data_uri = True
-        elif _is_url(text_value):
-            row.is_url = True
-            row.website_url = text_value.strip()
 
-    style_context = row.get_style_context()
-    if row.item_pinned:
-        style_context.add_class("pinned-row")
-    style_context.add_class("list-row")
+def _thumbnail_size(is_compact):
+    scale = 0.3 if is_compact else 0.8
+    return int(LIST_ITEM_IMAGE_WIDTH * scale), int(LIST_ITEM_IMAGE_HEIGHT * scale)
+
+
+def _build_row(kind, compact_mode, hover_to_select, single_click_callback):
+    """Creates the widget tree of a *kind* row, not yet bound to an item."""
+    row = Gtk.ListBoxRow()
+    row.row_kind = kind
+    row.pool_key = (kind, compact_mode, hover_to_select)
+    row.compact_mode = compact_mode
+    row.item_id = None
+    row.item_pinned = False
+    row.bind_token = None
+    row.get_style_context().add_class("list-row")
 
     # Use the passed compact mode parameter
     is_compact = compact_mode
@@ -87,8 +173,7 @@ def create_list_row_widget(
     hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
     content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=1)
 
-    if row.is_image:
-        image_path = item.get("filePath")
+    if kind == "image":
         image_container = Gtk.Frame()
         # Adjust image size based on compact mode
         if is_compact:
@@ -106,108 +191,47 @@ def create_list_row_widget(
         image_container.add(placeholder)
         content_box.pack_start(image_container, False, False, 0)
 
-        # Request image loading via the handler
-        image_handler.load_image_async(
-            image_path,
-            image_container,
-            placeholder,
-            LIST_ITEM_IMAGE_WIDTH,
-            LIST_ITEM_IMAGE_HEIGHT,
-            update_image_callback,
-        )
-
-        title_label = Gtk.Label(label=os.path.basename(item.get("value", "Image")))
+        title_label = Gtk.Label()
         title_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
         title_label.set_max_width_chars(20)  # Reduced from 25
         title_label.set_halign(Gtk.Align.START)
         content_box.pack_start(title_label, False, False, 0)
-    elif (row.is_url_image or row.is_data_uri) and PREVIEW_RICH_CONTENT:
-        # Remote image URL or base64 data URI — show thumbnail
-        thumb_w = int(LIST_ITEM_IMAGE_WIDTH * (0.3 if is_compact else 0.8))
-        thumb_h = int(LIST_ITEM_IMAGE_HEIGHT * (0.3 if is_compact else 0.8))
+        row.image_container = image_container
+        row.placeholder = placeholder
+        row.content_label = title_label
+    elif kind == "thumbnail":
+        # Remote image URL, base64 data URI or inline SVG — show thumbnail
         image_container = Gtk.Frame()
         image_container.set_shadow_type(Gtk.ShadowType.NONE)
-        image_container.set_size_request(thumb_w, thumb_h)
+        image_container.set_size_request(*_thumbnail_size(is_compact))
         placeholder = Gtk.Label(label="…")
         placeholder.set_halign(Gtk.Align.CENTER)
         placeholder.set_valign(Gtk.Align.CENTER)
         image_container.add(placeholder)
         content_box.pack_start(image_container, False, False, 0)
 
-        if row.is_data_uri:
-            image_handler.load_data_uri_async(
-                text_value.strip(), image_container, placeholder,
-                LIST_ITEM_IMAGE_WIDTH, LIST_ITEM_IMAGE_HEIGHT, update_image_callback,
-            )
-        else:
-            image_handler.load_remote_image_async(
-                row.image_url, image_container, placeholder,
-                LIST_ITEM_IMAGE_WIDTH, LIST_ITEM_IMAGE_HEIGHT, update_image_callback,
-            )
-
-        badge = Gtk.Label(label="[image url]" if row.is_url_image else "[base64]")
+        badge = Gtk.Label()
         badge.get_style_context().add_class("url-badge")
         badge.set_halign(Gtk.Align.START)
         content_box.pack_start(badge, False, False, 0)
-    elif row.is_svg_content and PREVIEW_RICH_CONTENT:
-        # Inline SVG — render as thumbnail
-        thumb_w = int(LIST_ITEM_IMAGE_WIDTH * (0.3 if is_compact else 0.8))
-        thumb_h = int(LIST_ITEM_IMAGE_HEIGHT * (0.3 if is_compact else 0.8))
-        image_container = Gtk.Frame()
-        image_container.set_shadow_type(Gtk.ShadowType.NONE)
-        image_container.set_size_request(thumb_w, thumb_h)
-        placeholder = Gtk.Label(label="…")
-        placeholder.set_halign(Gtk.Align.CENTER)
-        placeholder.set_valign(Gtk.Align.CENTER)
-        image_container.add(placeholder)
-        content_box.pack_start(image_container, False, False, 0)
-
-        image_handler.load_svg_async(
-            text_value.strip(), image_container, placeholder,
-            LIST_ITEM_IMAGE_WIDTH, LIST_ITEM_IMAGE_HEIGHT, update_image_callback,
-        )
-
-        badge = Gtk.Label(label="[svg]")
-        badge.get_style_context().add_class("url-badge")
-        badge.set_halign(Gtk.Align.START)
-        content_box.pack_start(badge, False, False, 0)
-    elif row.is_url:
+        row.image_container = image_container
+        row.placeholder = placeholder
+        row.content_label = badge
+    elif kind == "url":
         # Regular URL — link icon + URL text
         row_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
         icon = Gtk.Image.new_from_icon_name("external-link-symbolic", Gtk.IconSize.MENU)
         icon.get_style_context().add_class("url-link")
         row_box.pack_start(icon, False, False, 0)
-        max_chars = 50 if is_compact else 80
-        display_url = text_value.strip()
-        if len(display_url) > max_chars:
-            display_url = display_url[:max_chars - 1] + "…"
-        lbl = Gtk.Label(label=display_url)
+        lbl = Gtk.Label()
         lbl.set_xalign(0)
         lbl.set_ellipsize(Pango.EllipsizeMode.END)
         lbl.get_style_context().add_class("url-link")
         row_box.pack_start(lbl, True, True, 0)
         content_box.pack_start(row_box, False, False, 0)
+        row.content_label = lbl
     else:
-        # Limit to 1 line in compact mode, 3 lines otherwise
-        max_lines = 1 if is_compact else 3
-        display_text = "\n".join(text_value.splitlines()[:max_lines])
-        if len(text_value.splitlines()) > max_lines or len(display_text) > (
-            80 if is_compact else 150
-        ):
-            cutoff = 80 if is_compact else 150
-            last_space = display_text[:cutoff].rfind(" ")
-            if last_space > cutoff * 0.8:
-                cutoff = last_space
-            display_text = display_text[:cutoff] + "..."
-
         label = Gtk.Label()
-        # Apply search highlighting if enabled
-        if highlight_search and search_term:
-            marked_up = highlight_search_term(display_text, search_term)
-            label.set_markup(marked_up)
-        else:
-            label.set_text(display_text)
-
         label.set_line_wrap(True)
         label.set_line_wrap_mode(Pango.WrapMode.WORD)
         label.set_xalign(0)
@@ -223,26 +247,24 @@ def create_list_row_widget(
             label.set_size_request(-1, 30)
 
         content_box.pack_start(label, False, False, 0)
+        row.content_label = label
 
     # Ensure content box doesn't expand
     content_box.set_property("expand", False)
 
     hbox.pack_start(content_box, False, True, 0)
 
-    # Use custom SVG pin icon
-    pin_icon = create_pin_icon(row.item_pinned)
-    pin_icon.set_tooltip_text("Pinned" if row.item_pinned else "Not Pinned")
-    pin_icon.set_valign(Gtk.Align.START)  # Align to top
-    pin_icon.set_margin_top(2)  # Small margin from the very top
-    hbox.pack_end(pin_icon, False, False, 0)
+    # Use custom SVG pin icon; swapped by bind_list_row when the state differs
+    hbox.pack_end(_create_row_pin_icon(False), False, False, 0)
+    row.pin_box = hbox
 
     vbox.pack_start(hbox, False, False, 0)
 
-    timestamp = format_date(item.get("recorded", ""))
-    time_label = Gtk.Label(label=timestamp)
+    time_label = Gtk.Label()
     time_label.set_halign(Gtk.Align.START)
     time_label.get_style_context().add_class("timestamp")
     vbox.pack_start(time_label, False, False, 0)
+    row.time_label = time_label
 
     row.add(vbox)
 
@@ -285,3 +307,205 @@ def create_list_row_widget(
         row.connect("button-press-event", on_button_press)
 
     return row
+
+
+def _create_row_pin_icon(is_pinned):
+    pin_icon = create_pin_icon(is_pinned)
+    pin_icon.set_tooltip_text("Pinned" if is_pinned else "Not Pinned")
+    pin_icon.set_valign(Gtk.Align.START)  # Align to top
+    pin_icon.set_margin_top(2)  # Small margin from the very top
+    return pin_icon
+
+
+def bind_list_row(
+    row,
+    item_info,
+    image_handler,
+    update_image_callback,
+    search_term="",
+    highlight_search=False,
+):
+    """Points a row built by `_build_row` at the item in *item_info*.
+
+    The row must be of the item's `row_kind`. Images still loading for an
+    item the row showed before are dropped when they arrive.
+    """
+    item = item_info["item"]
+    display = row_display(item)
+    was_pinned = row.item_pinned
+    row.item_id = item_id(item)
+    row.filtered_index = item_info["filtered_index"]
+    row.item_value = item.get("value", "")
+    row.item_pinned = item.get("pinned", False)
+    row.file_path = item.get("filePath", "")
+    row.is_image = display.content == "image"
+
+    # Special content types of text items
+    row.is_url_image = display.content == "image_url"
+    row.is_svg_content = display.content == "svg"
+    row.is_data_uri = display.content == "data_uri"
+    row.is_url = display.content == "url"
+    row.image_url = display.source if row.is_url_image else None
+    row.website_url = display.source if row.is_url else None
+
+    style_context = row.get_style_context()
+    if row.item_pinned:
+        style_context.add_class("pinned-row")
+    else:
+        style_context.remove_class("pinned-row")
+
+    display_text = display.labels[1 if row.compact_mode else 0]
+    kind = row.row_kind
+    if kind in ("image", "thumbnail"):
+        token = row.bind_token = object()
+
+        def update_image(image_container, placeholder, pixbuf, error_message):
+            # The row may show another item by now
+            if row.bind_token is token:
+                update_image_callback(image_container, placeholder, pixbuf, error_message)
+            return False
+
+        image_container = row.image_container
+        placeholder = row.placeholder
+        current_child = image_container.get_child()
+        if current_child is not placeholder:
+            if current_child:
+                image_container.remove(current_child)
+            image_container.add(placeholder)
+            placeholder.show()
+        placeholder.set_label("[Loading image...]" if kind == "image" else "…")
+
+    if kind == "image":
+        # Request image loading via the handler
+        image_handler.load_image_async(
+            item.get("filePath"),
+            image_container,
+            placeholder,
+            LIST_ITEM_IMAGE_WIDTH,
+            LIST_ITEM_IMAGE_HEIGHT,
+            update_image,
+        )
+        row.content_label.set_label(display_text)
+    elif kind == "thumbnail":
+        if row.is_svg_content:
+            load = image_handler.load_svg_async
+        elif row.is_data_uri:
+            load = image_handler.load_data_uri_async
+        else:
+            load = image_handler.load_remote_image_async
+        load(
+            display.source, image_container, placeholder,
+            LIST_ITEM_IMAGE_WIDTH, LIST_ITEM_IMAGE_HEIGHT, update_image,
+        )
+        row.content_label.set_label(display_text)
+    elif kind == "url":
+        row.content_label.set_text(display_text)
+    else:
+        text_value = row.item_value
+        label = row.content_label
+        # Apply search highlighting if enabled
+        match_spans = item_info.get("match_spans")
+        shown_text = display_text
+        if shown_text.endswith("...") and not text_value.startswith(shown_text):
+            shown_text = shown_text[:-3]
+        if highlight_search and search_term and match_spans is not None and (
+            text_value.startswith(shown_text)
+        ):
+            # Spans index into the value, which the preview is a prefix of
+            label.set_markup(
+                highlight_spans(shown_text, match_spans) + display_text[len(shown_text):]
+            )
+        elif highlight_search and search_term:
+            label.set_markup(highlight_search_term(display_text, search_term))
+        else:
+            label.set_text(display_text)
+
+    # A wiggle started for the previous item must not reach this one, and
+    # may have left its icon at an angle
+    if row.item_pinned != was_pinned or stop_pin_shake(row.pin_box):
+        # The last child of the box is the pin icon (see animate_pin_shake)
+        row.pin_box.remove(row.pin_box.get_children()[-1])
+        pin_icon = _create_row_pin_icon(row.item_pinned)
+        row.pin_box.pack_end(pin_icon, False, False, 0)
+        pin_icon.show()
+
+    # Formatted on every bind, since it is relative to today
+    if display.timestamp is not None:
+        timestamp = format_datetime(display.timestamp)
+    else:
+        timestamp = display.recorded or "Unknown date"
+    row.time_label.set_label(timestamp)
+
+
+class RowPool:
+    """Rows taken out of the list, kept to show other items.
+
+    Rows are pooled by kind and by the layout settings that shape their
+    widgets (compact mode, hover to select). *single_click_callback* is
+    wired into every row the pool builds, so one pool serves one list.
+    """
+
+    def __init__(
+        self,
+        image_handler,
+        update_image_callback,
+        single_click_callback=None,
+        max_free=_POOL_SIZE,
+    ):
+        self.image_handler = image_handler
+        self.update_image_callback = update_image_callback
+        self.single_click_callback = single_click_callback
+        self.max_free = max_free
+        self._free = {}  # pool key -> [rows]
+        self.built = 0
+        self.rebound = 0
+
+    def acquire(
+        self,
+        item_info,
+        compact_mode=False,
+        hover_to_select=False,
+        search_term="",
+        highlight_search=False,
+    ):
+        """A row showing the item in *item_info*, reused when one is free."""
+        kind = row_display(item_info["item"]).kind
+        free = self._free.get((kind, compact_mode, hover_to_select))
+        if free:
+            row = free.pop()
+            self.rebound += 1
+        else:
+            row = _build_row(
+                kind, compact_mode, hover_to_select, self.single_click_callback
+            )
+            self.built += 1
+        bind_list_row(
+            row,
+            item_info,
+            self.image_handler,
+            self.update_image_callback,
+            search_term,
+            highlight_search,
+        )
+        return row
+
+    def release(self, row):
+        """Takes back a row that was removed from the list."""
+        key = getattr(row, "pool_key", None)
+        if key is None:
+            return
+        # Pending image loads and pin wiggles for its item are no longer wanted
+        row.bind_token = None
+        if stop_pin_shake(row.pin_box):
+            row.item_pinned = None  # the next bind replaces the icon
+        row.get_style_context().remove_class("selected-row")
+        free = self._free.setdefault(key, [])
+        if len(free) < self.max_free:
+            free.append(row)
+
+    def clear(self):
+        """Drops all free rows."""
+        self._free.clear()
+
+    def __len__(self):
+        return sum(len(free) for free in self._free.values())
@@ -43,6 +43,30 @@ def highlight_search_term(text, search_term):
     return "".join(result)
 
 
+def highlight_spans(text, spans):
+    """Highlight the given (start, end) ranges of text using Pango markup.
+
+    Ranges past the end of *text* (e.g. in a truncated preview) are clipped.
+    """
+    result = []
+    last_end = 0
+    for start, end in spans:
+        start, end = max(start, last_end), min(end, len(text))
+        if start >= end:
+            continue
+        if start > last_end:
+            result.append(escape_markup(text[last_end:start]))
+        result.append(
+            f'<span bgcolor="#ffcc00" fgcolor="#000000">{escape_markup(text[start:end])}</span>'
+        )
+        last_end = end
+
+    if last_end < len(text):
+        result.append(escape_markup(text[last_end:]))
+
+    return "".join(result)
+
+
 def _format_text_content(text_view):
     """Formats the text content in the TextView, with special handling for JSON."""
     buffer = text_view.get_buffer()
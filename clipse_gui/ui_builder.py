@@ -20,6 +20,8 @@ def build_main_window_content() -> dict:
              "compact_mode_button": Gtk.ToggleButton,
              "scrolled_window": Gtk.ScrolledWindow,
              "list_box": Gtk.ListBox,
+             "top_spacer": Gtk.Box,
+             "bottom_spacer": Gtk.Box,
              "status_label": Gtk.Label
          }
     """
@@ -73,7 +75,18 @@ def build_main_window_content() -> dict:
 
     list_box = Gtk.ListBox()
     list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-    viewport.add(list_box)
+
+    # Rows only exist around the visible part of the list; the spacers take
+    # up the height of the rest (see ListViewMixin).
+    list_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+    top_spacer = Gtk.Box()
+    bottom_spacer = Gtk.Box()
+    list_container.pack_start(top_spacer, False, False, 0)
+    list_container.pack_start(list_box, False, False, 0)
+    list_container.pack_start(bottom_spacer, False, False, 0)
+    # Keeps the focused row in view; the list box itself is not scrollable here
+    list_container.set_focus_vadjustment(scrolled_window.get_vadjustment())
+    viewport.add(list_container)
 
     # --- Status Bar ---
     status_bar_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -107,6 +120,8 @@ def build_main_window_content() -> dict:
         "compact_mode_button": compact_mode_button,
         "scrolled_window": scrolled_window,
         "list_box": list_box,
+        "top_spacer": top_spacer,
+        "bottom_spacer": bottom_spacer,
         "status_label": status_label,
         "selection_mode_banner": selection_mode_banner,
     }
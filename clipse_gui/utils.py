@@ -1,3 +1,6 @@
+import heapq
+import re
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 
 
@@ -5,37 +8,125 @@ def format_date(date_str):
     """Formats an ISO date string into a user-friendly relative format."""
     if not date_str:
         return "Unknown date"
+    dt = parse_date(date_str)
+    if dt is None:
+        return date_str  # Return original string if format fails
+    return format_datetime(dt)
+
+
+def parse_date(date_str):
+    """Parses an ISO date string, or returns None if it is not one."""
     try:
         # Parse ISO string, handling potential timezone info
-        dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-
-        # Get current time, making it offset-aware using the parsed dt's timezone
-        # Or using local timezone if dt is naive (though ISO usually implies offset)
-        if dt.tzinfo:
-            now = datetime.now(dt.tzinfo)
-        else:
-            # Fallback: Assume naive dt refers to local time
-            # This might be inaccurate if the source timestamp was UTC but lacks 'Z' or offset
-            now = datetime.now()
-            # Or assume UTC if naive:
-            # dt = dt.replace(tzinfo=timezone.utc)
-            # now = datetime.now(timezone.utc)
-
-        today = now.date()
-        yesterday = today - timedelta(days=1)
-        dt_date = dt.date()  # Compare dates only
-
-        if dt_date == today:
-            return f"Today at {dt.strftime('%H:%M')}"
-        elif dt_date == yesterday:
-            return f"Yesterday at {dt.strftime('%H:%M')}"
-        elif dt.year == now.year:
-            return dt.strftime("%b %d, %H:%M")  # e.g., Aug 15, 14:30
-        else:
-            return dt.strftime("%b %d, %Y, %H:%M")  # e.g., Aug 15, 2023, 14:30
+        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
     except Exception as e:
         print(f"Date formatting error for '{date_str}': {e}")
-        return date_str  # Return original string if format fails
+        return None
+
+
+def format_datetime(dt):
+    """Formats a parsed date relative to today, like `format_date`."""
+    # Get current time, making it offset-aware using the parsed dt's timezone
+    # Or using local timezone if dt is naive (though ISO usually implies offset)
+    if dt.tzinfo:
+        now = datetime.now(dt.tzinfo)
+    else:
+        # Fallback: Assume naive dt refers to local time
+        # This might be inaccurate if the source timestamp was UTC but lacks 'Z' or offset
+        now = datetime.now()
+        # Or assume UTC if naive:
+        # dt = dt.replace(tzinfo=timezone.utc)
+        # now = datetime.now(timezone.utc)
+
+    today = now.date()
+    yesterday = today - timedelta(days=1)
+    dt_date = dt.date()  # Compare dates only
+
+    if dt_date == today:
+        return f"Today at {dt.strftime('%H:%M')}"
+    elif dt_date == yesterday:
+        return f"Yesterday at {dt.strftime('%H:%M')}"
+    elif dt.year == now.year:
+        return dt.strftime("%b %d, %H:%M")  # e.g., Aug 15, 14:30
+    else:
+        return dt.strftime("%b %d, %Y, %H:%M")  # e.g., Aug 15, 2023, 14:30
+
+
+class SearchCancelled(Exception):
+    """Raised by `fuzzy_search` once its *cancelled* callback returns True."""
+
+
+# Items scanned by the linear search between two cancellation checks
+_CANCEL_CHECK_INTERVAL = 1024
+
+# How `fuzzy_search` scores tokens without an exact or prefix hit:
+# "charset" compares character sets (`_calculate_similarity`), while
+# "edit_distance" accepts words within one or two typos of the token.
+FUZZY_MATCHERS = ("charset", "edit_distance")
+
+# Prefix of a value that `fuzzy_search` locates match spans in; longer than
+# any row preview, so highlighting never scans whole multi-megabyte entries
+MATCH_SPAN_CHARS = 256
+
+
+class RankedMatches(Sequence):
+    """Search results ranked lazily, best match first.
+
+    Matches are kept in a heap and only popped into order as rows ask for
+    them, so showing the first page costs O(n + k log n) instead of a full
+    sort. The first *head_size* results are ranked up front. `len()` is
+    known without ranking anything, and deleting a match only ranks the
+    matches before it.
+    """
+
+    def __init__(self, matches, head_size=0, on_ranked=None):
+        # original_index is unique, so the dicts themselves are never compared
+        self._heap = [(-m["match_quality"], m["original_index"], m) for m in matches]
+        heapq.heapify(self._heap)
+        self._on_ranked = on_ranked  # called with each match as it is ranked
+        self._ranked = []
+        self._size = len(self._heap)
+        self._rank_until(head_size)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            _, stop, step = index.indices(self._size)
+            self._rank_until(stop if step > 0 else self._size)
+            return self._ranked[index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("match index out of range")
+        self._rank_until(index + 1)
+        return self._ranked[index]
+
+    def __delitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("match index out of range")
+        self._rank_until(index + 1)
+        del self._ranked[index]
+        self._size -= 1
+
+    def _rank_until(self, count):
+        ranked = self._ranked
+        while len(ranked) < count:
+            match = self._next_match()
+            if match is None:
+                break
+            if self._on_ranked is not None:
+                self._on_ranked(match)
+            ranked.append(match)
+
+    def _next_match(self):
+        """Removes and returns the best match not ranked yet, or None."""
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
 
 
 def fuzzy_search(
@@ -45,6 +136,11 @@ def fuzzy_search(
     path_key="filePath",
     pinned_key="pinned",
     show_only_pinned=False,
+    search_index=None,
+    cancelled=None,
+    top_k=None,
+    fuzzy_matcher="charset",
+    with_spans=False,
 ):
     """
     Performs a fuzzy search on a list of dictionary items.
@@ -56,6 +152,19 @@ def fuzzy_search(
         path_key (str): Dictionary key for secondary text to search (like file paths)
         pinned_key (str): Dictionary key for pinned status
         show_only_pinned (bool): Whether to show only pinned items
+        search_index (SearchIndex): Optional index synced with `items`; when given,
+            only items reachable through its posting lists are scored; with
+            *top_k*, one that has `search_ranked` (`SearchPool`) ranks them itself
+        cancelled (callable): Optional callback polled during long searches;
+            once it returns True the search stops by raising `SearchCancelled`
+        top_k (int): When given, return a `RankedMatches` with only the best
+            *top_k* matches ranked; the rest are ordered as they are accessed
+        fuzzy_matcher (str): One of `FUZZY_MATCHERS`; with a search index, the
+            index's own matcher is used instead
+        with_spans (bool): Also give each match a "match_spans" list of the
+            (start, end) ranges of its value that matched (see `match_spans`),
+            within its first `MATCH_SPAN_CHARS` characters; with *top_k*, they
+            are only computed once a match is ranked
 
     Returns:
         list: Filtered items as dicts with format {"original_index": index, "item": item, "match_quality": score}
@@ -63,16 +172,57 @@ def fuzzy_search(
     filtered_items = []
     search_term_lower = search_term.lower() if search_term else ""
 
+    add_spans = None
+    if search_term_lower and with_spans:
+        span_tokens = search_term_lower.split()
+        matcher = getattr(search_index, "fuzzy_matcher", fuzzy_matcher)
+
+        def add_spans(match):
+            value = match["item"].get(value_key) or ""
+            match["match_spans"] = match_spans(
+                value[:MATCH_SPAN_CHARS], span_tokens, matcher
+            )
+
     if not search_term_lower or (show_only_pinned and not search_term_lower):
         for index, item in enumerate(items):
             is_pinned = item.get(pinned_key, False)
             if show_only_pinned and not is_pinned:
                 continue
             filtered_items.append({"original_index": index, "item": item})
+    elif search_index is not None:
+        search_tokens = search_term_lower.split()
+        if (
+            top_k is not None
+            and not show_only_pinned
+            and hasattr(search_index, "search_ranked")
+        ):
+            # Backends that rank their own shards only send their best matches
+            return search_index.search_ranked(
+                search_tokens, top_k, cancelled=cancelled, on_ranked=add_spans
+            )
+        matches = search_index.search(search_tokens, cancelled=cancelled)
+        for item_id, match_quality in matches.items():
+            item = search_index.item(item_id)
+            if show_only_pinned and not item.get(pinned_key, False):
+                continue
+            filtered_items.append(
+                {
+                    "original_index": search_index.position(item_id),
+                    "item": item,
+                    "match_quality": match_quality,
+                }
+            )
     else:
         search_tokens = search_term_lower.split()
 
         for index, item in enumerate(items):
+            if (
+                cancelled is not None
+                and index % _CANCEL_CHECK_INTERVAL == 0
+                and cancelled()
+            ):
+                raise SearchCancelled()
+
             is_pinned = item.get(pinned_key, False)
             if show_only_pinned and not is_pinned:
                 continue
@@ -83,6 +233,7 @@ def fuzzy_search(
             # Simple token matching
             all_tokens_match = True
             match_quality = 0
+            item_words = None  # split once, on the first token that needs it
 
             for token in search_tokens:
                 # Perfect match gets highest score
@@ -91,11 +242,11 @@ def fuzzy_search(
                     continue
 
                 # Check for partial matches (beginning of words)
-                words_in_value = item_value.split()
-                words_in_path = file_path.split() if file_path else []
+                if item_words is None:
+                    item_words = item_value.split() + file_path.split()
 
                 partial_match = False
-                for word in words_in_value + words_in_path:
+                for word in item_words:
                     if word.startswith(token):
                         match_quality += 75
                         partial_match = True
@@ -106,10 +257,23 @@ def fuzzy_search(
                         break
 
                 # Check for close matches (levenshtein-like approach)
-                if not partial_match:
+                if not partial_match and fuzzy_matcher == "edit_distance":
+                    max_distance = _max_edit_distance(token)
+                    best_distance = min(
+                        (
+                            _levenshtein(word, token, max_distance)
+                            for word in item_words
+                            if len(word) > 2
+                        ),
+                        default=max_distance + 1,
+                    )
+                    if best_distance <= max_distance:
+                        match_quality += _edit_distance_score(best_distance)
+                        partial_match = True
+                elif not partial_match:
                     # Simple character-level similarity
                     best_similarity = 0
-                    for word in words_in_value + words_in_path:
+                    for word in item_words:
                         if len(word) > 2:  # Only consider meaningful words
                             # Calculate similarity by checking character overlap
                             similarity = _calculate_similarity(word, token)
@@ -133,12 +297,88 @@ def fuzzy_search(
                     }
                 )
 
-        # Sort results by match quality
-        filtered_items.sort(key=lambda x: x.get("match_quality", 0), reverse=True)
+    if search_term_lower:
+        if top_k is not None:
+            return RankedMatches(filtered_items, top_k, add_spans)
+        # Best first, then history order
+        filtered_items.sort(key=lambda x: (-x["match_quality"], x["original_index"]))
+        if add_spans is not None:
+            for match in filtered_items:
+                add_spans(match)
 
     return filtered_items
 
 
+def _lowered_in_place(text):
+    """Lowercases *text* without changing any character offsets."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters lowercase to several ("İ" -> "i̇"); keep those as-is
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+def match_spans(text, tokens, fuzzy_matcher="charset"):
+    """Returns the (start, end) ranges of *text* that made *tokens* match it.
+
+    Uses the same rules as `fuzzy_search` ranking, one token at a time: every
+    occurrence of a token that appears verbatim, else the words the token
+    starts with, else the closest words that passed the fuzzy threshold.
+    Ranges are sorted and merged.
+    """
+    lowered = _lowered_in_place(text)
+    words = None
+    spans = []
+    for token in tokens:
+        start = lowered.find(token)
+        if start != -1:
+            while start != -1:
+                spans.append((start, start + len(token)))
+                start = lowered.find(token, start + len(token))
+            continue
+
+        if words is None:
+            words = [
+                (m.start(), m.end(), m.group()) for m in re.finditer(r"\S+", lowered)
+            ]
+        prefixes = [
+            (start, end)
+            for start, end, word in words
+            if len(word) >= 3 and token.startswith(word)
+        ]
+        if prefixes:
+            spans.extend(prefixes)
+            continue
+
+        best, best_spans = None, []
+        for start, end, word in words:
+            if len(word) <= 2:
+                continue
+            if fuzzy_matcher == "edit_distance":
+                max_distance = _max_edit_distance(token)
+                score = -_levenshtein(word, token, max_distance)
+                if -score > max_distance:
+                    continue
+            else:
+                score = _calculate_similarity(word, token)
+                if score <= 0.7:
+                    continue
+            if best is None or score > best:
+                best, best_spans = score, [(start, end)]
+            elif score == best:
+                best_spans.append((start, end))
+        spans.extend(best_spans)
+
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
 def _calculate_similarity(str1, str2):
     """Calculate a simple character-based similarity between two strings."""
     set1, set2 = set(str1), set(str2)
@@ -153,3 +393,43 @@ def _calculate_similarity(str1, str2):
         else 0
     )
     return (basic_score * 0.7) + (len_ratio * 0.3)
+
+
+def _max_edit_distance(token):
+    """Typos tolerated in *token*: none under 4 chars, one up to 7, then two."""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def _edit_distance_score(distance):
+    """Match quality of a word *distance* edits away (1 -> 50, 2 -> 40)."""
+    return 60 - 10 * distance
+
+
+def _levenshtein(str1, str2, max_distance=None):
+    """Levenshtein distance between two strings.
+
+    With *max_distance*, gives up as soon as the distance is known to exceed
+    it and returns ``max_distance + 1``.
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    if max_distance is not None and len(str1) - len(str2) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(str2) + 1))
+    for i, char1 in enumerate(str1, 1):
+        current = [i]
+        for j, char2 in enumerate(str2, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char1 != char2),
+                )
+            )
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
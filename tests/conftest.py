@@ -48,7 +48,7 @@ class FakeController(KeyboardMixin):
 
         # ── State ─────────────────────────────────────────────────
         self.selection_mode = False
-        self.selected_indices = set()
+        self.selected_ids = set()
         self.zoom_level = 1.0
         self.compact_mode = False
 
@@ -70,6 +70,7 @@ class FakeController(KeyboardMixin):
         self.on_help_window_close = MagicMock()
         self.on_settings_window_close = MagicMock()
         self.restart_application = MagicMock()
+        self._row_content_y = MagicMock(side_effect=lambda row: row.get_allocation().y)
 
 
 def make_event(keyval, ctrl=False, shift=False):
@@ -0,0 +1,554 @@
+"""Tests for clipse_gui/data_manager.py — streaming history loading."""
+
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from clipse_gui import data_manager
+from clipse_gui.data_manager import (
+    DataManager,
+    HistoryDiff,
+    _HistoryTracker,
+    _iter_history_entries,
+    apply_history_diff,
+    history_key,
+    index_items,
+    item_id,
+)
+from clipse_gui.history_journal import HistoryJournal, delete_record, pin_record
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _entry(i, **extra):
+    return {
+        "value": f"item {i}",
+        "recorded": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}",
+        "filePath": "null",
+        "pinned": False,
+        **extra,
+    }
+
+
+def _history_json(entries, **dump_kwargs):
+    return json.dumps({"clipboardHistory": entries}, **dump_kwargs)
+
+
+def _call_now(callback, *args):
+    callback(*args)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    # Without a running main loop, results are delivered on the spot
+    dm = DataManager(dispatch=_call_now)
+    dm.file_path = str(tmp_path / "clipboard_history.json")
+    dm.snapshot_path = str(tmp_path / "history_snapshot.bin")
+    dm.journal = HistoryJournal(str(tmp_path / "history_journal.jsonl"))
+    return dm
+
+
+# ---------------------------------------------------------------------------
+# _iter_history_entries
+# ---------------------------------------------------------------------------
+
+class TestIterHistoryEntries:
+    @pytest.mark.parametrize("dump_kwargs", [{}, {"indent": 2}])
+    def test_yields_every_entry(self, dump_kwargs):
+        entries = [_entry(i) for i in range(50)]
+        text = _history_json(entries, **dump_kwargs)
+        assert list(_iter_history_entries(io.StringIO(text))) == entries
+
+    def test_entries_spanning_read_blocks(self, monkeypatch):
+        monkeypatch.setattr(data_manager, "_READ_BLOCK", 64)
+        entries = [_entry(i, value="x" * (i * 37)) for i in range(20)]
+        text = _history_json(entries, indent=2)
+        assert list(_iter_history_entries(io.StringIO(text))) == entries
+
+    def test_other_layouts_fall_back_to_full_decode(self):
+        text = json.dumps({"version": 2, "clipboardHistory": [_entry(1)]})
+        assert list(_iter_history_entries(io.StringIO(text))) == [_entry(1)]
+
+    def test_empty_history(self):
+        assert list(_iter_history_entries(io.StringIO('{"clipboardHistory": []}'))) == []
+
+    def test_truncated_file_raises(self, monkeypatch):
+        monkeypatch.setattr(data_manager, "_READ_BLOCK", 64)
+        text = _history_json([_entry(i) for i in range(5)])[:-40]
+        with pytest.raises(json.JSONDecodeError):
+            list(_iter_history_entries(io.StringIO(text)))
+
+
+# ---------------------------------------------------------------------------
+# DataManager loading
+# ---------------------------------------------------------------------------
+
+class TestLoadHistory:
+    def test_first_chunk_is_small(self, manager):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_history_json([_entry(i) for i in range(100)]))
+        chunks = list(manager.iter_history_chunks(first_chunk_size=10, chunk_size=40))
+        assert [len(chunk) for chunk in chunks] == [10, 40, 40, 10]
+
+    def test_invalid_entries_are_skipped_and_normalized(self, manager):
+        entries = [_entry(1, pinned=1, filePath=5), {"value": "no date"}, "junk"]
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_history_json(entries))
+        items = manager.load_history()
+        assert len(items) == 1
+        assert items[0]["pinned"] is True
+        assert items[0]["filePath"] is None
+
+    def test_load_sorts_newest_first(self, manager):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_history_json([_entry(i) for i in range(10)]))
+        items = manager.load_history()
+        assert [item["value"] for item in items[:2]] == ["item 9", "item 8"]
+
+    def test_malformed_file_loads_nothing(self, manager):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_history_json([_entry(i) for i in range(10)])[:-30])
+        assert manager.load_history() == []
+
+    def test_missing_and_empty_files(self, manager):
+        assert manager.load_history() == []
+        open(manager.file_path, "w").close()
+        assert manager.load_history() == []
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+class TestSnapshot:
+    def _write(self, manager, entries):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_history_json(entries))
+
+    def test_unchanged_file_loads_from_snapshot(self, manager, monkeypatch):
+        self._write(manager, [_entry(i) for i in range(10)])
+        expected = manager.load_history()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("unchanged history file was parsed again")
+
+        monkeypatch.setattr(manager, "iter_history_chunks", fail)
+        assert manager.load_history() == expected
+
+    def test_changed_file_is_parsed_again(self, manager):
+        self._write(manager, [_entry(i) for i in range(10)])
+        manager.load_history()
+        self._write(manager, [_entry(i) for i in range(12)])
+        assert len(manager.load_history()) == 12
+
+    def test_malformed_file_is_not_snapshotted(self, manager):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_history_json([_entry(1)])[:-5])
+        manager.load_history()
+        assert not os.path.exists(manager.snapshot_path)
+
+    def test_save_refreshes_snapshot(self, manager, monkeypatch):
+        self._write(manager, [_entry(1)])
+        manager.load_history()
+        saved = [_entry(i) for i in range(5)]
+        manager._write_history(saved, None)
+
+        monkeypatch.setattr(manager, "iter_history_chunks", lambda: pytest.fail("parsed"))
+        assert [item["value"] for item in manager.load_history()] == [
+            f"item {i}" for i in range(4, -1, -1)
+        ]
+
+    def test_file_replaced_after_save_is_parsed(self, manager, monkeypatch):
+        self._write(manager, [_entry(1)])
+        manager.load_history()
+        replace = os.replace
+
+        def replace_then_clipse_writes(src, dst):
+            replace(src, dst)
+            if dst == manager.file_path:
+                self._write(manager, [_entry(i) for i in range(7)])
+
+        monkeypatch.setattr(os, "replace", replace_then_clipse_writes)
+        manager._write_history([_entry(i) for i in range(5)], None)
+        monkeypatch.undo()
+        assert len(manager.load_history()) == 7
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_save_formats_load_back(self, manager, compact):
+        manager.compact_json = compact
+        saved = [_entry(i, value=f"line {i}\nnext") for i in range(3)]
+        manager._write_history(saved, None)
+        with open(manager.file_path, encoding="utf-8") as f:
+            text = f.read()
+        assert ("\n" in text) is not compact
+        manager.snapshot_path = None
+        assert sorted(manager.load_history(), key=lambda x: x["value"]) == saved
+
+    def test_disabled_snapshot(self, manager):
+        manager.snapshot_path = None
+        self._write(manager, [_entry(1)])
+        assert len(manager.load_history()) == 1
+        assert manager.load_snapshot() is None
+
+
+# ---------------------------------------------------------------------------
+# Incremental reload
+# ---------------------------------------------------------------------------
+
+def _newest_first(count, start=0):
+    return [_entry(i) for i in range(start + count - 1, start - 1, -1)]
+
+
+def _clipse_json(entries):
+    # Layout of the file clipse itself writes
+    return json.dumps({"clipboardHistory": entries}, indent=4)
+
+
+class TestHistoryTracker:
+    def _tracked(self, entries, dumps=_clipse_json):
+        tracker = _HistoryTracker()
+        tracker.update(dumps(entries))
+        return tracker
+
+    def test_first_read_adds_everything(self):
+        diff = _HistoryTracker().update(_clipse_json(_newest_first(3)))
+        assert [item["value"] for item in diff.added] == ["item 2", "item 1", "item 0"]
+        assert diff.removed == [] and diff.pinned == {}
+
+    def test_prepend_parses_only_the_head(self, monkeypatch):
+        old = _newest_first(50)
+        tracker = self._tracked(old)
+        monkeypatch.setattr(tracker, "_update_full", lambda text: pytest.fail("full parse"))
+        diff = tracker.update(_clipse_json([_entry(50)] + old))
+        assert diff == HistoryDiff([_entry(50)], [], {})
+
+    def test_prepend_with_dropped_tail(self, monkeypatch):
+        old = _newest_first(50)
+        tracker = self._tracked(old)
+        monkeypatch.setattr(tracker, "_update_full", lambda text: pytest.fail("full parse"))
+        diff = tracker.update(_clipse_json([_entry(51), _entry(50)] + old[:-2]))
+        assert [item["value"] for item in diff.added] == ["item 51", "item 50"]
+        assert diff.removed == [history_key(old[-2]), history_key(old[-1])]
+
+    def test_repeated_fast_path_updates(self):
+        entries = _newest_first(10)
+        tracker = self._tracked(entries)
+        for i in range(10, 20):
+            entries = [_entry(i)] + entries[:-1]
+            diff = tracker.update(_clipse_json(entries))
+            assert diff.added == [_entry(i)]
+            assert len(diff.removed) == 1
+        full = _HistoryTracker()
+        full.update(_clipse_json(entries))
+        assert tracker._keys == full._keys
+        assert tracker._offsets == full._offsets
+
+    def test_pin_flip_is_reported(self):
+        old = _newest_first(5)
+        tracker = self._tracked(old)
+        new = [dict(item) for item in old]
+        new[2]["pinned"] = True
+        diff = tracker.update(_clipse_json(new))
+        assert diff == HistoryDiff([], [], {history_key(new[2]): True})
+
+    def test_removal_in_the_middle(self):
+        old = _newest_first(5)
+        tracker = self._tracked(old)
+        diff = tracker.update(_clipse_json(old[:2] + old[3:]))
+        assert diff == HistoryDiff([], [history_key(old[2])], {})
+
+    def test_prepend_over_a_changed_tail_is_parsed_in_full(self):
+        old = _newest_first(5)
+        tracker = self._tracked(old)
+        new = [dict(item) for item in old]
+        new[2]["pinned"] = True
+        diff = tracker.update(_clipse_json([_entry(5)] + new))
+        assert diff == HistoryDiff([_entry(5)], [], {history_key(new[2]): True})
+
+    def test_file_text_is_not_kept(self):
+        text = _clipse_json(_newest_first(50))
+        tracker = _HistoryTracker()
+        tracker.update(text)
+        kept = [value for value in vars(tracker).values() if isinstance(value, str)]
+        assert sum(map(len, kept)) < 100
+
+    def test_reformatted_file_has_no_changes(self):
+        old = _newest_first(5)
+        tracker = self._tracked(old)
+        assert not any(tracker.update(_history_json(old, indent=2)))
+
+    def test_reset_compares_against_known_items(self):
+        old = _newest_first(5)
+        tracker = _HistoryTracker()
+        tracker.reset(old)
+        diff = tracker.update(_clipse_json([_entry(5)] + old))
+        assert diff == HistoryDiff([_entry(5)], [], {})
+
+    def test_unreadable_text_keeps_state(self):
+        old = _newest_first(5)
+        tracker = self._tracked(old)
+        with pytest.raises(json.JSONDecodeError):
+            tracker.update(_clipse_json([_entry(5)] + old)[:-20])
+        diff = tracker.update(_clipse_json([_entry(5)] + old))
+        assert diff == HistoryDiff([_entry(5)], [], {})
+
+    def test_forget_removes_everything(self):
+        old = _newest_first(3)
+        tracker = self._tracked(old)
+        assert sorted(tracker.forget().removed) == sorted(history_key(i) for i in old)
+        assert tracker.update(_clipse_json(old)).added == old
+
+
+class TestApplyHistoryDiff:
+    def _apply(self, items, diff):
+        items_by_id = index_items(items)
+        result = apply_history_diff(items, items_by_id, diff)
+        assert items_by_id == index_items(result)
+        return result
+
+    def test_prepends_new_items(self):
+        items = _newest_first(3)
+        result = self._apply(items, HistoryDiff([_entry(3)], [], {}))
+        assert [item["value"] for item in result] == ["item 3", "item 2", "item 1", "item 0"]
+        assert result[1] is items[0]
+
+    def test_older_additions_are_sorted_in(self):
+        items = [_entry(5), _entry(1)]
+        result = self._apply(items, HistoryDiff([_entry(3)], [], {}))
+        assert [item["value"] for item in result] == ["item 5", "item 3", "item 1"]
+
+    def test_removes_and_pins_in_place(self):
+        items = _newest_first(3)
+        kept = items[0]
+        diff = HistoryDiff([], [history_key(items[1])], {history_key(kept): True})
+        result = self._apply(items, diff)
+        assert result == [kept, items[2]]
+        assert kept["pinned"] is True
+
+
+class TestItemId:
+    def test_copies_share_an_id(self):
+        assert item_id(_entry(1)) == item_id(dict(_entry(1), pinned=True))
+
+    def test_content_and_time_both_count(self):
+        assert item_id(_entry(1)) != item_id(_entry(1, value="other"))
+        assert item_id(_entry(1)) != item_id(_entry(1, recorded="2025-01-01"))
+
+
+class TestReadHistoryChanges:
+    def test_diff_and_forgotten_search_fields(self, manager):
+        old = _newest_first(3)
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json(old))
+        items = manager.load_history()
+        manager._tracker.reset(items)
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json([_entry(3)] + old[:-1]))
+        diff = manager.read_history_changes()
+        assert diff == HistoryDiff([_entry(3)], [history_key(old[-1])], {})
+        assert len(manager.search_fields) == 2
+
+    def test_unreadable_file_reports_nothing(self, manager):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write('{"clipboardHistory": [')
+        assert manager.read_history_changes() is None
+
+
+class TestCheckHistoryFile:
+    def _watched(self, manager, entries):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json(entries))
+        manager._last_signature = data_manager._file_signature(manager.file_path)
+        manager._tracker.reset(manager.load_history())
+
+    def test_unchanged_file_is_not_read(self, manager, monkeypatch):
+        self._watched(manager, _newest_first(3))
+        monkeypatch.setattr(manager, "read_history_changes", lambda: pytest.fail("read"))
+        manager._check_history_file(lambda diff: pytest.fail("reported"))
+
+    def test_replaced_file_reports_diff(self, manager):
+        old = _newest_first(3)
+        self._watched(manager, old)
+        temp_path = manager.file_path + ".new"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json([_entry(3)] + old))
+        os.replace(temp_path, manager.file_path)
+        diffs = []
+        manager._check_history_file(diffs.append)
+        assert diffs == [HistoryDiff([_entry(3)], [], {})]
+
+    def test_deleted_file_removes_everything(self, manager):
+        old = _newest_first(2)
+        self._watched(manager, old)
+        os.remove(manager.file_path)
+        diffs = []
+        manager._check_history_file(diffs.append)
+        manager._check_history_file(diffs.append)
+        assert len(diffs) == 1
+        assert sorted(diffs[0].removed) == sorted(history_key(item) for item in old)
+
+    def test_own_save_is_skipped(self, manager, monkeypatch):
+        old = _newest_first(4)
+        self._watched(manager, old)
+        old[1]["pinned"] = True
+        manager._write_history(old[1:], None)
+        monkeypatch.setattr(manager, "read_history_changes", lambda: pytest.fail("read"))
+        manager._check_history_file(lambda diff: pytest.fail("reported"))
+        assert manager._tracker._pinned == {
+            history_key(item): item["pinned"] for item in old[1:]
+        }
+
+    def test_change_after_own_save_is_read(self, manager, monkeypatch):
+        old = _newest_first(3)
+        self._watched(manager, old)
+        manager._write_history(old[1:], None)
+        # Queued like idle callbacks, to check nothing is sent for our own save
+        queued = []
+        monkeypatch.setattr(manager, "_dispatch", lambda *call: queued.append(call))
+        diffs = []
+        manager._check_history_file(diffs.append)
+        assert queued == []
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json([_entry(5)] + old[1:]))
+        manager._check_history_file(diffs.append)
+        for callback, *args in queued:
+            callback(*args)
+        assert diffs == [HistoryDiff([_entry(5)], [], {})]
+
+
+# ---------------------------------------------------------------------------
+# Save journal
+# ---------------------------------------------------------------------------
+
+class TestSaveJournal:
+    def _saved(self, manager):
+        with open(manager.file_path, encoding="utf-8") as f:
+            return json.load(f)["clipboardHistory"]
+
+    def _start(self, manager, count=5):
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json(_newest_first(count)))
+        return manager.load_history()
+
+    def test_edits_are_journaled_not_written(self, manager):
+        items = self._start(manager)
+        before = os.stat(manager.file_path).st_mtime_ns
+        items[0]["pinned"] = True
+        changes = [pin_record(items[0]), delete_record(items[1])]
+        manager._write_history(items[1:], None, changes)
+        assert os.stat(manager.file_path).st_mtime_ns == before
+        assert len(manager.journal) == 2
+
+    def test_journal_is_replayed_on_load(self, manager):
+        items = self._start(manager)
+        items[2]["pinned"] = True
+        changes = [pin_record(items[2]), delete_record(items[0])]
+        manager._write_history(items[1:], None, changes)
+        for snapshot_path in (manager.snapshot_path, None):
+            manager.snapshot_path = snapshot_path
+            manager.journal = HistoryJournal(manager.journal.path)
+            loaded = manager.load_history()
+            values = [item["value"] for item in loaded]
+            assert values == ["item 3", "item 2", "item 1", "item 0"]
+            assert loaded[1]["pinned"] is True
+
+    def test_full_journal_compacts(self, manager):
+        items = self._start(manager)
+        manager.journal_max_entries = 1
+        manager._write_history(items[1:], None, [delete_record(items[0])])
+        manager._write_history(items[2:], None, [delete_record(items[1])])
+        assert len(self._saved(manager)) == 3
+        assert len(manager.journal) == 0
+        assert not os.path.exists(manager.journal.path)
+
+    def test_compact_journal(self, manager):
+        items = self._start(manager)
+        manager._write_history(items[1:], None, [delete_record(items[0])])
+        manager.compact_journal(items[1:])
+        assert manager.flush_saves(timeout=5)
+        assert [item["value"] for item in self._saved(manager)] == [
+            item["value"] for item in items[1:]
+        ]
+        assert len(manager.journal) == 0
+
+    def test_disabled_journal_writes_file(self, manager):
+        items = self._start(manager)
+        manager.journal = None
+        manager._write_history(items[1:], None, [delete_record(items[0])])
+        assert len(self._saved(manager)) == 4
+
+    def test_watcher_keeps_journaled_edits(self, manager):
+        items = self._start(manager)
+        manager._tracker.reset(items)
+        items[1]["pinned"] = True
+        changes = [pin_record(items[1]), delete_record(items[0])]
+        manager._write_history(items[1:], None, changes)
+        # clipse rewrites the file from its own state plus a new entry
+        stale = [_entry(9)] + _newest_first(5)
+        stale[3]["pinned"] = True
+        with open(manager.file_path, "w", encoding="utf-8") as f:
+            f.write(_clipse_json(stale))
+        diff = manager.read_history_changes()
+        assert [item["value"] for item in diff.added] == ["item 9"]
+        assert diff.pinned == {history_key(stale[3]): True}
+
+
+# ---------------------------------------------------------------------------
+# Save queue
+# ---------------------------------------------------------------------------
+
+class TestSaveQueue:
+    def _blocked_writer(self, manager, monkeypatch):
+        started, release, writes = threading.Event(), threading.Event(), []
+
+        def write(items, callback_on_error, changes=None):
+            writes.append((items, changes))
+            started.set()
+            release.wait(5)
+
+        monkeypatch.setattr(manager, "_write_history", write)
+        return started, release, writes
+
+    def test_superseded_saves_are_dropped(self, manager, monkeypatch):
+        started, release, writes = self._blocked_writer(manager, monkeypatch)
+        manager.save_history([_entry(0)], changes=["a"])
+        assert started.wait(5)
+        for i in range(1, 4):
+            manager.save_history([_entry(i)], changes=[str(i)])
+        release.set()
+        assert manager.flush_saves(timeout=5)
+        assert writes == [([_entry(0)], ["a"]), ([_entry(3)], ["1", "2", "3"])]
+
+    def test_full_save_absorbs_journal_records(self, manager, monkeypatch):
+        started, release, writes = self._blocked_writer(manager, monkeypatch)
+        manager.save_history([], changes=["a"])
+        assert started.wait(5)
+        manager.save_history([], changes=["b"])
+        manager.save_history([])
+        manager.save_history([], changes=["c"])
+        release.set()
+        assert manager.flush_saves(timeout=5)
+        assert writes[-1] == ([], None)
+
+    def test_flush_waits_for_the_write(self, manager):
+        manager.save_history([_entry(1)])
+        assert manager.flush_saves(timeout=5)
+        with open(manager.file_path, encoding="utf-8") as f:
+            assert json.load(f)["clipboardHistory"] == [_entry(1)]
+
+    def test_flush_without_saves(self, manager):
+        assert manager.flush_saves(timeout=0)
+
+    def test_compact_journal_saves_only_when_needed(self, manager):
+        manager.compact_journal([_entry(1)])
+        assert manager.flush_saves(timeout=5)
+        assert not os.path.exists(manager.file_path)
+        manager.journal.append([delete_record(_entry(2))])
+        manager.compact_journal([_entry(1)])
+        assert manager.flush_saves(timeout=5)
+        assert os.path.exists(manager.file_path)
+        assert len(manager.journal) == 0
@@ -0,0 +1,94 @@
+"""Tests for clipse_gui/history_journal.py — journal records, replay and recovery."""
+
+import json
+
+import pytest
+
+from clipse_gui.history_journal import (
+    HistoryJournal,
+    content_digest,
+    delete_record,
+    pin_record,
+)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _item(value, pinned=False, recorded="2024-01-01T00:00:00"):
+    return {"value": value, "recorded": recorded, "filePath": None, "pinned": pinned}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return HistoryJournal(str(tmp_path / "history_journal.jsonl"))
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+class TestRecords:
+    def test_digest_is_content_only(self):
+        assert content_digest(_item("a")) == content_digest(_item("a", pinned=True))
+        assert content_digest(_item("a")) != content_digest(_item("b"))
+
+    def test_pin_record_follows_item(self):
+        assert pin_record(_item("a", pinned=True))["op"] == "pin"
+        assert pin_record(_item("a"))["op"] == "unpin"
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class TestHistoryJournal:
+    def test_missing_file_is_empty(self, journal):
+        assert len(journal) == 0
+        items = [_item("a")]
+        assert journal.apply(items) is items
+
+    def test_apply_after_reload(self, journal):
+        kept, gone = _item("kept", pinned=True), _item("gone")
+        journal.append([pin_record(kept), delete_record(gone)])
+        reloaded = HistoryJournal(journal.path)
+        items = reloaded.apply([_item("kept"), _item("gone"), _item("other")])
+        assert [item["value"] for item in items] == ["kept", "other"]
+        assert items[0]["pinned"] is True
+        assert len(reloaded) == 2
+
+    def test_last_record_wins(self, journal):
+        item = _item("a", pinned=True)
+        journal.append([pin_record(item)])
+        item["pinned"] = False
+        journal.append([pin_record(item)])
+        assert HistoryJournal(journal.path).lookup(_item("a")) == "unpin"
+
+    def test_same_content_at_another_time_is_untouched(self, journal):
+        journal.append([delete_record(_item("a"))])
+        later = _item("a", recorded="2024-02-01T00:00:00")
+        assert journal.apply([later]) == [later]
+
+    def test_torn_last_line_is_ignored_and_repaired(self, journal):
+        journal.append([delete_record(_item("a"))])
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "delete", "rec')
+        reloaded = HistoryJournal(journal.path)
+        assert len(reloaded) == 1
+        reloaded.append([delete_record(_item("b"))])
+        with open(journal.path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert json.loads(lines[-1])["op"] == "delete"
+        assert len(HistoryJournal(journal.path)) == 2
+
+    def test_unknown_ops_are_skipped(self, journal):
+        with open(journal.path, "w", encoding="utf-8") as f:
+            f.write('{"op": "rename", "recorded": "x", "digest": "y"}\n')
+        assert len(journal) == 0
+
+    def test_clear_removes_file(self, journal, tmp_path):
+        journal.append([delete_record(_item("a"))])
+        journal.clear()
+        assert len(journal) == 0
+        assert not list(tmp_path.iterdir())
+        journal.clear()
@@ -0,0 +1,84 @@
+"""Tests for clipse_gui/history_snapshot.py — binary snapshot of parsed history."""
+
+import os
+
+import pytest
+
+from clipse_gui.history_snapshot import load_snapshot, snapshot_key, write_snapshot
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_ITEMS = [
+    {"value": "héllo\nworld", "recorded": "2024-01-02", "filePath": None, "pinned": True},
+    {"value": "img.png", "recorded": "2024-01-01", "filePath": "/tmp/img.png", "pinned": False},
+]
+
+
+@pytest.fixture
+def history(tmp_path):
+    path = tmp_path / "clipboard_history.json"
+    path.write_text('{"clipboardHistory": []}', encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    return str(tmp_path / "history_snapshot.bin")
+
+
+# ---------------------------------------------------------------------------
+# Round trip and invalidation
+# ---------------------------------------------------------------------------
+
+class TestSnapshot:
+    def test_round_trip(self, history, snapshot):
+        key = snapshot_key(history)
+        write_snapshot(snapshot, key, _ITEMS)
+        assert load_snapshot(snapshot, key) == _ITEMS
+
+    def test_missing_history_has_no_key(self, tmp_path):
+        assert snapshot_key(str(tmp_path / "missing.json")) is None
+
+    def test_missing_snapshot(self, history, snapshot):
+        assert load_snapshot(snapshot, snapshot_key(history)) is None
+
+    def test_modified_history_invalidates(self, history, snapshot):
+        write_snapshot(snapshot, snapshot_key(history), _ITEMS)
+        with open(history, "a", encoding="utf-8") as f:
+            f.write("\n")
+        assert load_snapshot(snapshot, snapshot_key(history)) is None
+
+    def test_touched_history_invalidates(self, history, snapshot):
+        key = snapshot_key(history)
+        write_snapshot(snapshot, key, _ITEMS)
+        stat_res = os.stat(history)
+        os.utime(history, ns=(stat_res.st_atime_ns, stat_res.st_mtime_ns + 1_000_000))
+        assert load_snapshot(snapshot, snapshot_key(history)) is None
+
+    def test_replaced_history_invalidates(self, history, snapshot, tmp_path):
+        write_snapshot(snapshot, snapshot_key(history), _ITEMS)
+        replacement = tmp_path / "new.json"
+        replacement.write_text('{"clipboardHistory": []}', encoding="utf-8")
+        stat_res = os.stat(history)
+        os.utime(replacement, ns=(stat_res.st_atime_ns, stat_res.st_mtime_ns))
+        os.replace(replacement, history)
+        assert load_snapshot(snapshot, snapshot_key(history)) is None
+
+    @pytest.mark.parametrize("content", [b"", b"junk", b"CLGSNAP1\xff\xff\xff\xff"])
+    def test_corrupt_snapshot_is_ignored(self, history, snapshot, content):
+        with open(snapshot, "wb") as f:
+            f.write(content)
+        assert load_snapshot(snapshot, snapshot_key(history)) is None
+
+    def test_truncated_payload_is_ignored(self, history, snapshot):
+        key = snapshot_key(history)
+        write_snapshot(snapshot, key, _ITEMS)
+        with open(snapshot, "r+b") as f:
+            f.truncate(os.path.getsize(snapshot) - 10)
+        assert load_snapshot(snapshot, key) is None
+
+    def test_write_leaves_no_temp_files(self, history, snapshot, tmp_path):
+        write_snapshot(snapshot, snapshot_key(history), _ITEMS)
+        assert sorted(os.listdir(tmp_path)) == ["clipboard_history.json", "history_snapshot.bin"]
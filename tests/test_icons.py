@@ -0,0 +1,99 @@
+"""Tests for clipse_gui/ui/icons.py — cached pin icon rendering."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from clipse_gui.ui import icons
+from clipse_gui.ui.icons import (
+    animate_pin_shake,
+    create_pin_icon,
+    pin_pixbuf,
+    stop_pin_shake,
+)
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """Stands in for the SVG loader and counts the renders."""
+    pixbuf_module = MagicMock()
+    new_with_type = pixbuf_module.PixbufLoader.new_with_type
+    new_with_type.side_effect = lambda kind: MagicMock()
+    monkeypatch.setattr(icons, "GdkPixbuf", pixbuf_module)
+    pin_pixbuf.cache_clear()
+    yield new_with_type
+    pin_pixbuf.cache_clear()
+
+
+class TestPinPixbuf:
+    def test_rendered_once_per_state(self, loader):
+        first = pin_pixbuf(True)
+        assert pin_pixbuf(True) is first
+        assert loader.call_count == 1
+
+    @pytest.mark.parametrize("other", [(False, 25, 1), (True, 33, 1), (True, 25, 2)])
+    def test_keyed_by_state_angle_and_scale(self, loader, other):
+        assert pin_pixbuf(*other) is not pin_pixbuf(True, 25, 1)
+        assert loader.call_count == 2
+
+    def test_rendered_at_scale(self, loader):
+        svg_loader = MagicMock()
+        loader.side_effect = None
+        loader.return_value = svg_loader
+        pin_pixbuf(True, 25, 2)
+        svg_loader.set_size.assert_called_once_with(36, 36)
+
+
+class TestCreatePinIcon:
+    def test_icons_share_one_render(self, loader):
+        for _ in range(5):
+            create_pin_icon(False, scale=1)
+        assert loader.call_count == 1
+
+    def test_shake_angles_render_once(self, loader):
+        for _ in range(3):
+            for angle in (33, 17, 30, 20, 25):
+                create_pin_icon(True, angle, scale=1)
+        assert loader.call_count == 5
+
+
+class TestAnimatePinShake:
+    @pytest.fixture
+    def steps(self, monkeypatch):
+        """Pending wiggle steps, run by hand instead of by a main loop."""
+        pending = []
+        monkeypatch.setattr(
+            icons.GLib, "timeout_add", lambda ms, step, *args: pending.append((step, args))
+        )
+        monkeypatch.setattr(icons, "create_pin_icon", lambda *args: MagicMock())
+        return pending
+
+    def _box(self):
+        box = MagicMock()
+        box.get_children.return_value = [MagicMock()]
+        return box
+
+    def test_runs_to_the_end(self, steps):
+        box = self._box()
+        animate_pin_shake(box, True)
+        while steps:
+            step, args = steps.pop()
+            step(*args)
+        assert box.pack_end.call_count == 5
+        assert not stop_pin_shake(box)
+
+    def test_stopped_wiggle_leaves_the_box_alone(self, steps):
+        box = self._box()
+        animate_pin_shake(box, True)
+        assert stop_pin_shake(box)
+        step, args = steps.pop()
+        step(*args)
+        assert box.pack_end.call_count == 1
+
+    def test_new_wiggle_replaces_the_running_one(self, steps):
+        box = self._box()
+        animate_pin_shake(box, True)
+        first_step, first_args = steps.pop(0)
+        animate_pin_shake(box, False)
+        first_step(*first_args)
+        assert box.pack_end.call_count == 2
@@ -66,7 +66,7 @@ class TestDispatchRouting:
 
     def test_ctrl_x_deletes_selected_in_selection_mode(self, ctrl):
         ctrl.selection_mode = True
-        ctrl.selected_indices = {0, 2}
+        ctrl.selected_ids = {("a", 0), ("c", 2)}
         result = ctrl.on_key_press(None, make_event(Gdk.KEY_x, ctrl=True))
         ctrl.delete_selected_items.assert_called_once()
         assert result is True
@@ -78,7 +78,7 @@ class TestDispatchRouting:
 
     def test_shift_delete_deletes_selected(self, ctrl):
         ctrl.selection_mode = True
-        ctrl.selected_indices = {1}
+        ctrl.selected_ids = {("b", 1)}
         result = ctrl.on_key_press(None, make_event(Gdk.KEY_Delete, shift=True))
         ctrl.delete_selected_items.assert_called_once()
         assert result is True
@@ -0,0 +1,233 @@
+"""Tests for clipse_gui/ui/list_row.py — display models, rebinding and the row pool."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from clipse_gui.data_manager import item_id
+from clipse_gui.ui import list_row
+from clipse_gui.ui.list_row import RowPool, bind_list_row, row_display, row_kind
+from clipse_gui.ui.text import highlight_spans
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _item(value, file_path="null", pinned=False):
+    return {
+        "value": value,
+        "recorded": "2024-01-01 12:00:00.000000000",
+        "filePath": file_path,
+        "pinned": pinned,
+    }
+
+
+def _info(item, filtered_index=0):
+    return {"item": item, "filtered_index": filtered_index}
+
+
+def _fake_build(kind, compact_mode, hover_to_select, single_click_callback):
+    row = MagicMock()
+    row.row_kind = kind
+    row.pool_key = (kind, compact_mode, hover_to_select)
+    row.compact_mode = compact_mode
+    row.item_pinned = False
+    row.bind_token = None
+    row.pin_box.pin_wiggle = None
+    return row
+
+
+@pytest.fixture(autouse=True)
+def _fresh_display_cache():
+    list_row._row_display.cache_clear()
+    yield
+    list_row._row_display.cache_clear()
+
+
+@pytest.fixture
+def rich(monkeypatch):
+    monkeypatch.setattr(list_row, "PREVIEW_RICH_CONTENT", True)
+
+
+@pytest.fixture
+def pool(monkeypatch, rich):
+    monkeypatch.setattr(list_row, "_build_row", _fake_build)
+    return RowPool(MagicMock(), MagicMock(), max_free=2)
+
+
+# ---------------------------------------------------------------------------
+# row_kind
+# ---------------------------------------------------------------------------
+
+
+class TestRowKind:
+    def test_file_path_is_image(self):
+        assert row_kind(_item("shot.png", "/tmp/shot.png")) == "image"
+
+    def test_plain_text(self):
+        assert row_kind(_item("hello world")) == "text"
+
+    def test_url(self):
+        assert row_kind(_item("https://example.com/page")) == "url"
+
+    @pytest.mark.parametrize("value", [
+        "https://example.com/cat.png",
+        "<svg xmlns='http://www.w3.org/2000/svg'></svg>",
+        "data:image/png;base64,iVBORw0KGgo=",
+    ])
+    def test_rich_content_is_thumbnail(self, rich, value):
+        assert row_kind(_item(value)) == "thumbnail"
+
+    def test_rich_content_is_text_when_previews_are_off(self, monkeypatch):
+        monkeypatch.setattr(list_row, "PREVIEW_RICH_CONTENT", False)
+        assert row_kind(_item("https://example.com/cat.png")) == "text"
+
+
+# ---------------------------------------------------------------------------
+# row_display
+# ---------------------------------------------------------------------------
+
+
+class TestRowDisplay:
+    def test_computed_once_per_item(self, monkeypatch):
+        calls = []
+        real = list_row._is_url
+        monkeypatch.setattr(list_row, "_is_url", lambda text: calls.append(text) or real(text))
+        item = _item("hello")
+        first = row_display(item)
+        assert row_display(dict(item, pinned=True)) is first
+        assert len(calls) == 1
+
+    def test_changed_value_is_a_new_model(self):
+        item = _item("hello")
+        first = row_display(item)
+        item["value"] = "goodbye"
+        assert row_display(item) is not first
+        assert row_display(item).labels == ("goodbye", "goodbye")
+
+    def test_text_labels_per_layout(self):
+        display = row_display(_item("one\ntwo\nthree\nfour"))
+        assert display.labels == ("one\ntwo\nthree...", "one...")
+
+    def test_long_text_is_cut_at_a_word(self):
+        value = "word " * 40
+        normal, compact = row_display(_item(value)).labels
+        assert normal.endswith("...") and len(normal) <= 153
+        assert compact == value[:79] + "..."
+
+    def test_url_labels_per_layout(self):
+        url = "https://example.com/" + "a" * 100
+        normal, compact = row_display(_item(url)).labels
+        assert (len(normal), len(compact)) == (80, 50)
+        assert normal.endswith("…")
+
+    def test_image_label_is_the_basename(self):
+        display = row_display(_item("/tmp/dir/shot.png", "/tmp/dir/shot.png"))
+        assert display.labels == ("shot.png", "shot.png")
+
+    def test_timestamp_is_parsed(self):
+        display = row_display(_item("hello"))
+        assert display.timestamp.year == 2024
+
+    def test_bad_timestamp_is_kept_as_text(self):
+        display = row_display(dict(_item("hello"), recorded="yesterday-ish"))
+        assert display.timestamp is None
+        assert display.recorded == "yesterday-ish"
+
+
+# ---------------------------------------------------------------------------
+# bind_list_row
+# ---------------------------------------------------------------------------
+
+
+class TestBindListRow:
+    def test_sets_item_attributes(self):
+        row = _fake_build("text", False, False, None)
+        item = _item("first line\nsecond line")
+        bind_list_row(row, _info(item, 7), MagicMock(), MagicMock())
+        assert row.item_id == item_id(item)
+        assert row.filtered_index == 7
+        assert row.item_value == item["value"]
+        row.content_label.set_text.assert_called_with("first line\nsecond line")
+        row.time_label.set_label.assert_called_with("Jan 01, 2024, 12:00")
+
+    def test_compact_row_gets_the_compact_label(self):
+        row = _fake_build("text", True, False, None)
+        bind_list_row(row, _info(_item("first line\nsecond line")), MagicMock(), MagicMock())
+        row.content_label.set_text.assert_called_with("first line...")
+
+    def test_search_highlight_uses_the_match_spans(self):
+        row = _fake_build("text", False, False, None)
+        info = _info(_item("say hello"))
+        info["match_spans"] = [(4, 9)]
+        bind_list_row(row, info, MagicMock(), MagicMock(), "helo", True)
+        row.content_label.set_markup.assert_called_once_with(
+            highlight_spans("say hello", [(4, 9)])
+        )
+
+    def test_stale_image_is_dropped_after_rebind(self, rich):
+        handler = MagicMock()
+        callback = MagicMock()
+        row = _fake_build("thumbnail", False, False, None)
+        bind_list_row(row, _info(_item("https://example.com/a.png")), handler, callback)
+        first_update = handler.load_remote_image_async.call_args.args[-1]
+        bind_list_row(row, _info(_item("https://example.com/b.png")), handler, callback)
+        second_update = handler.load_remote_image_async.call_args.args[-1]
+
+        first_update("container", "placeholder", "old pixbuf", None)
+        callback.assert_not_called()
+        second_update("container", "placeholder", "new pixbuf", None)
+        callback.assert_called_once_with("container", "placeholder", "new pixbuf", None)
+
+
+# ---------------------------------------------------------------------------
+# RowPool
+# ---------------------------------------------------------------------------
+
+
+class TestRowPool:
+    def test_released_row_is_rebound(self, pool):
+        row = pool.acquire(_info(_item("one")))
+        pool.release(row)
+        second = _item("two")
+        assert pool.acquire(_info(second, 3)) is row
+        assert row.item_id == item_id(second)
+        assert row.filtered_index == 3
+        assert (pool.built, pool.rebound) == (1, 1)
+
+    def test_rows_are_pooled_per_kind(self, pool):
+        row = pool.acquire(_info(_item("text")))
+        pool.release(row)
+        assert pool.acquire(_info(_item("https://example.com/"))) is not row
+        assert len(pool) == 1
+
+    def test_rows_are_pooled_per_layout(self, pool):
+        row = pool.acquire(_info(_item("one")))
+        pool.release(row)
+        assert pool.acquire(_info(_item("two")), compact_mode=True) is not row
+
+    def test_release_drops_pending_images_and_selection(self, pool):
+        row = pool.acquire(_info(_item("https://example.com/a.png")))
+        pool.release(row)
+        assert row.bind_token is None
+        row.get_style_context().remove_class.assert_called_with("selected-row")
+
+    def test_release_stops_a_running_pin_wiggle(self, pool):
+        row = pool.acquire(_info(_item("one")))
+        row.pin_box.pin_wiggle = object()
+        pool.release(row)
+        assert row.pin_box.pin_wiggle is None
+        row.pin_box.pack_end.reset_mock()
+        pool.acquire(_info(_item("two")))
+        row.pin_box.pack_end.assert_called_once()
+
+    def test_free_rows_are_bounded(self, pool):
+        rows = [pool.acquire(_info(_item(str(i)))) for i in range(4)]
+        for row in rows:
+            pool.release(row)
+        assert len(pool) == 2
+
+    def test_rows_without_a_kind_are_ignored(self, pool):
+        pool.release(object())
+        assert len(pool) == 0
@@ -0,0 +1,406 @@
+"""Tests for ListViewMixin — keyed row updates and the row window."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from clipse_gui.controller_mixins import list_view_mixin
+from clipse_gui.controller_mixins.list_view_mixin import ListViewMixin
+from clipse_gui.data_manager import item_id
+from clipse_gui.row_scheduler import RowBuildScheduler
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+ROW_HEIGHT = 10
+
+
+class FakeAllocation:
+    def __init__(self, y, height):
+        self.y = y
+        self.height = height
+
+
+class FakeRow:
+    def __init__(self, list_box):
+        self._list_box = list_box
+        self._context = MagicMock()
+
+    def get_parent(self):
+        return self._list_box if self in self._list_box.rows else None
+
+    def get_style_context(self):
+        return self._context
+
+    def show_all(self):
+        pass
+
+    def get_allocation(self):
+        return FakeAllocation(self._list_box.rows.index(self) * ROW_HEIGHT, ROW_HEIGHT)
+
+
+class FakeSpacer:
+    def __init__(self):
+        self.height = 0
+
+    def set_size_request(self, width, height):
+        self.height = height
+
+
+class FakeListBox:
+    """List-backed stand-in for the Gtk.ListBox calls the mixin makes.
+
+    Rows are laid out right away, ROW_HEIGHT each, below *top_spacer*.
+    """
+
+    def __init__(self, top_spacer):
+        self.rows = []
+        self.selected = None
+        self._top_spacer = top_spacer
+        self.tick_callbacks = []
+
+    def get_children(self):
+        return list(self.rows)
+
+    def get_allocation(self):
+        return FakeAllocation(self._top_spacer.height, len(self.rows) * ROW_HEIGHT)
+
+    def add(self, row):
+        self.rows.append(row)
+
+    def insert(self, row, position):
+        self.rows.insert(position, row)
+
+    def remove(self, row):
+        self.rows.remove(row)
+        if self.selected is row:
+            self.selected = None
+
+    def get_selected_row(self):
+        return self.selected
+
+    def select_row(self, row):
+        self.selected = row
+
+    def freeze_child_notify(self):
+        pass
+
+    def thaw_child_notify(self):
+        pass
+
+    def add_tick_callback(self, callback):
+        self.tick_callbacks.append(callback)
+        return len(self.tick_callbacks)
+
+    def remove_tick_callback(self, tick_id):
+        self.tick_callbacks[tick_id - 1] = None
+
+
+class FakeFrameClock:
+    def __init__(self):
+        self.frame = 0
+
+    def get_frame_counter(self):
+        return self.frame
+
+
+class FakeAdjustment:
+    def __init__(self, page_size):
+        self.value = 0
+        self.page_size = page_size
+
+    def get_value(self):
+        return self.value
+
+    def set_value(self, value):
+        self.value = value
+
+    def get_page_size(self):
+        return self.page_size
+
+
+class FakeRowPool:
+    def __init__(self):
+        self.released = []
+
+    def release(self, row):
+        self.released.append(row)
+
+
+class FakeController(ListViewMixin):
+    def __init__(self):
+        self.row_pool = FakeRowPool()
+        self.top_spacer = FakeSpacer()
+        self.bottom_spacer = FakeSpacer()
+        self.list_box = FakeListBox(self.top_spacer)
+        self.row_scheduler = RowBuildScheduler(self.list_box)
+        self.vadj = None
+        self._list_view_filter = None
+        self._row_window = (0, 0)
+        self._row_target = (0, 0)
+        self._row_view = (0, 0)
+        self._row_height = None
+        self._scroll_anchor = None
+        self._updating_rows = False
+        self._offscreen_selection = None
+        self.search_term = ""
+        self.show_only_pinned = False
+        self.compact_mode = False
+        self.hover_to_select = False
+        self.selected_ids = set()
+        self.filtered_items = []
+        self.created = []
+
+    def _create_row(self, item_info):
+        row = FakeRow(self.list_box)
+        row.item = item_info["item"]
+        row.item_id = item_id(item_info["item"])
+        row.filtered_index = item_info["filtered_index"]
+        row.render_state = self._row_render_state()
+        row.item_pinned = item_info["item"].get("pinned", False)
+        self.created.append(row)
+        return row
+
+
+def _item(value, pinned=False):
+    return {"value": value, "pinned": pinned, "recorded": value, "filePath": None}
+
+
+def _run_frames(controller, clock=None):
+    """Runs the row builder's tick callbacks until it is done."""
+    clock = clock or FakeFrameClock()
+    for callback in controller.list_box.tick_callbacks:
+        while callback is not None and callback(controller.list_box, clock):
+            clock.frame += 1
+        clock.frame += 1
+
+
+def _show(controller, items):
+    controller.filtered_items = [
+        {"item": item, "original_index": index} for index, item in enumerate(items)
+    ]
+    controller.created = []
+    controller.populate_list_view()
+    _run_frames(controller)
+    controller._on_rows_laid_out()
+    return controller.list_box.get_children()
+
+
+def _values(rows):
+    return [row.item["value"] for row in rows]
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(list_view_mixin, "INITIAL_LOAD_COUNT", 5)
+    monkeypatch.setattr(list_view_mixin, "ROW_OVERSCAN", 2)
+    monkeypatch.setattr(list_view_mixin, "HIGHLIGHT_SEARCH", True)
+    return FakeController()
+
+
+# ---------------------------------------------------------------------------
+# Keyed updates
+# ---------------------------------------------------------------------------
+
+class TestPopulateListView:
+    def test_first_population_creates_initial_rows(self, controller):
+        items = [_item(str(i)) for i in range(20)]
+        rows = _show(controller, items)
+        # INITIAL_LOAD_COUNT plus the overscan below them
+        assert _values(rows) == [str(i) for i in range(7)]
+        assert len(controller.created) == 7
+        assert controller.bottom_spacer.height > 0
+
+    def test_prepended_item_creates_one_row(self, controller):
+        items = [_item(str(i)) for i in range(5)]
+        old_rows = list(_show(controller, items))
+        new = _item("new")
+        rows = _show(controller, [new] + items)
+        assert controller.created == [rows[0]]
+        assert rows[1:] == old_rows
+        assert [row.filtered_index for row in rows] == [0, 1, 2, 3, 4, 5]
+
+    def test_removed_item_drops_only_its_row(self, controller):
+        items = [_item(str(i)) for i in range(5)]
+        old_rows = list(_show(controller, items))
+        rows = _show(controller, items[:2] + items[3:])
+        assert controller.created == []
+        assert rows == old_rows[:2] + old_rows[3:]
+        assert controller.row_pool.released == [old_rows[2]]
+
+    def test_moved_item_keeps_its_row(self, controller):
+        items = [_item(str(i)) for i in range(4)]
+        old_rows = list(_show(controller, items))
+        rows = _show(controller, [items[2], items[0], items[1], items[3]])
+        assert controller.created == []
+        assert rows == [old_rows[2], old_rows[0], old_rows[1], old_rows[3]]
+
+    def test_pin_change_recreates_the_row(self, controller):
+        items = [_item(str(i)) for i in range(3)]
+        old_rows = list(_show(controller, items))
+        items[1]["pinned"] = True
+        rows = _show(controller, items)
+        assert controller.created == [rows[1]]
+        assert rows[1] is not old_rows[1]
+
+    def test_new_search_term_recreates_highlighted_rows(self, controller):
+        items = [_item(str(i)) for i in range(3)]
+        _show(controller, items)
+        controller.search_term = "1"
+        _show(controller, items)
+        assert len(controller.created) == 3
+
+    def test_reloaded_items_keep_their_rows(self, controller):
+        items = [_item(str(i)) for i in range(4)]
+        old_rows = list(_show(controller, items))
+        rows = _show(controller, [dict(item) for item in items])
+        assert controller.created == []
+        assert rows == old_rows
+
+    def test_selected_ids_mark_rows(self, controller):
+        items = [_item(str(i)) for i in range(3)]
+        rows = _show(controller, items)
+        controller.selected_ids = {item_id(dict(items[2]))}
+        _show(controller, items)
+        rows[2].get_style_context().add_class.assert_called_with("selected-row")
+        rows[1].get_style_context().remove_class.assert_called_with("selected-row")
+
+    def test_selection_survives_update(self, controller):
+        items = [_item(str(i)) for i in range(5)]
+        rows = _show(controller, items)
+        controller.list_box.select_row(rows[3])
+        _show(controller, [items[3]] + items[:3] + items[4:])
+        assert controller.list_box.get_selected_row() is rows[3]
+
+
+# ---------------------------------------------------------------------------
+# Row window
+# ---------------------------------------------------------------------------
+
+def _scroll(controller, value):
+    controller.vadj.set_value(value)
+    controller._update_row_window()
+    _run_frames(controller)
+    controller._on_rows_laid_out()
+
+
+def _top_value(controller):
+    """Value of the item at the top of the view."""
+    index, _offset = controller._first_visible_row()
+    return controller.filtered_items[index]["item"]["value"]
+
+
+class TestRowWindow:
+    @pytest.fixture
+    def scrolled(self, controller):
+        controller.vadj = FakeAdjustment(page_size=5 * ROW_HEIGHT)
+        _show(controller, [_item(str(i)) for i in range(1000)])
+        return controller
+
+    def test_rows_stay_bounded_when_scrolling_deep(self, scrolled):
+        for value in (2_000, 20_000, 50_000):
+            _scroll(scrolled, value)
+            rows = scrolled.list_box.get_children()
+            assert len(rows) <= 5 + 2 + 2 * 2
+            start, end = scrolled._row_window
+            assert [row.filtered_index for row in rows] == list(range(start, end))
+        assert start > 500
+
+    def test_spacers_stand_in_for_rows_not_built(self, scrolled):
+        _scroll(scrolled, 20_000)
+        start, end = scrolled._row_window
+        assert scrolled.top_spacer.height == start * ROW_HEIGHT
+        assert scrolled.bottom_spacer.height == (1000 - end) * ROW_HEIGHT
+
+    def test_view_keeps_its_place_when_the_window_moves(self, scrolled):
+        _scroll(scrolled, 2_000)
+        top = _top_value(scrolled)
+        _scroll(scrolled, scrolled.vadj.get_value() + 3 * ROW_HEIGHT)
+        assert int(_top_value(scrolled)) == int(top) + 3
+
+    def test_small_scroll_reuses_the_window(self, scrolled):
+        _scroll(scrolled, 2_000)
+        window = scrolled._row_window
+        scrolled.created = []
+        _scroll(scrolled, scrolled.vadj.get_value() + ROW_HEIGHT)
+        assert scrolled._row_window == window
+        assert scrolled.created == []
+
+    def test_prepended_item_keeps_the_top_item(self, scrolled):
+        _scroll(scrolled, 2_000)
+        top = _top_value(scrolled)
+        items = [info["item"] for info in scrolled.filtered_items]
+        _show(scrolled, [_item("new")] + items)
+        scrolled._on_rows_laid_out()
+        assert _top_value(scrolled) == top
+
+    def test_new_search_starts_at_the_top(self, scrolled):
+        _scroll(scrolled, 2_000)
+        items = [info["item"] for info in scrolled.filtered_items]
+        scrolled.search_term = "1"
+        _show(scrolled, items[1::2])
+        scrolled._on_rows_laid_out()
+        assert scrolled._row_window[0] == 0
+        assert scrolled.vadj.get_value() == 0
+
+    def test_selection_comes_back_with_its_row(self, scrolled):
+        selected = scrolled.list_box.get_children()[1]
+        scrolled.list_box.select_row(selected)
+        _scroll(scrolled, 20_000)
+        assert scrolled.list_box.get_selected_row() is None
+        _scroll(scrolled, 0)
+        row = scrolled.list_box.get_selected_row()
+        assert row is not None and row.item_id == selected.item_id
+
+    def test_row_for_index(self, scrolled):
+        _scroll(scrolled, 20_000)
+        start, end = scrolled._row_window
+        assert scrolled._row_for_index(start).filtered_index == start
+        assert scrolled._row_for_index(end) is None
+        assert scrolled._row_for_index(0) is None
+
+
+# ---------------------------------------------------------------------------
+# Frame-budgeted building
+# ---------------------------------------------------------------------------
+
+class TestBudgetedBuilding:
+    @pytest.fixture
+    def slow(self, controller, monkeypatch):
+        """Three new rows fit in a frame."""
+        monkeypatch.setattr(
+            controller.row_scheduler, "rows_within", lambda seconds, default: 3
+        )
+        controller.vadj = FakeAdjustment(page_size=5 * ROW_HEIGHT)
+        return controller
+
+    def test_rows_in_view_come_first(self, slow):
+        slow.filtered_items = [
+            {"item": _item(str(i)), "original_index": i} for i in range(100)
+        ]
+        slow.populate_list_view()
+        assert _values(slow.list_box.get_children()) == ["0", "1", "2"]
+        assert slow.row_scheduler.busy
+
+    def test_rows_nearest_the_view_follow(self, slow):
+        _show(slow, [_item(str(i)) for i in range(1000)])
+        slow.vadj.set_value(5_000)
+        slow._update_row_window()
+        view_start, view_end = slow._row_view
+        start, end = slow._row_window
+        assert (start, end) == (view_start, view_start + 3)
+        # The next frame finishes the view, then grows to both sides
+        tick = slow.list_box.tick_callbacks[-1]
+        clock = FakeFrameClock()
+        while slow._row_window[1] < view_end:
+            clock.frame += 1
+            tick(slow.list_box, clock)
+        assert slow._row_window[0] >= view_start - 1
+        _run_frames(slow, clock)
+        assert slow._row_window == slow._row_target
+
+    def test_each_row_is_built_once(self, slow):
+        items = [_item(str(i)) for i in range(100)]
+        rows = _show(slow, items)
+        assert len(slow.created) == len(rows)
@@ -0,0 +1,163 @@
+"""Tests for clipse_gui/row_scheduler.py — frame-budgeted row building."""
+
+import pytest
+
+from clipse_gui.row_scheduler import RowBuildScheduler
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class FakeWidget:
+    def __init__(self):
+        self.callbacks = {}
+        self._next_id = 0
+
+    def add_tick_callback(self, callback):
+        self._next_id += 1
+        self.callbacks[self._next_id] = callback
+        return self._next_id
+
+    def remove_tick_callback(self, tick_id):
+        del self.callbacks[tick_id]
+
+
+class FakeFrameClock:
+    def __init__(self):
+        self.frame = 0
+
+    def get_frame_counter(self):
+        return self.frame
+
+
+class Steps:
+    """A step that needs *count* calls to finish."""
+
+    def __init__(self, count):
+        self.count = count
+        self.budgets = []
+
+    def __call__(self, budget):
+        self.budgets.append(budget)
+        return len(self.budgets) >= self.count
+
+
+def _frame(widget, clock, frames=1):
+    """Advances the clock by *frames* and runs the tick callbacks."""
+    clock.frame += frames
+    for tick_id, callback in list(widget.callbacks.items()):
+        if not callback(widget, clock):
+            del widget.callbacks[tick_id]
+
+
+@pytest.fixture
+def widget():
+    return FakeWidget()
+
+
+@pytest.fixture
+def scheduler(widget):
+    return RowBuildScheduler(widget, budget_ms=8)
+
+
+# ---------------------------------------------------------------------------
+# Running steps
+# ---------------------------------------------------------------------------
+
+
+class TestSteps:
+    def test_first_step_runs_right_away(self, scheduler, widget):
+        step = Steps(1)
+        scheduler.start(step)
+        assert step.budgets == [0.008]
+        assert not scheduler.busy
+        assert widget.callbacks == {}
+
+    def test_one_step_per_frame(self, scheduler, widget):
+        step = Steps(3)
+        scheduler.start(step)
+        clock = FakeFrameClock()
+        _frame(widget, clock)
+        assert len(step.budgets) == 2
+        _frame(widget, clock)
+        assert len(step.budgets) == 3
+        assert not scheduler.busy
+        assert widget.callbacks == {}
+        assert scheduler.frames == 3
+
+    def test_new_build_replaces_the_running_one(self, scheduler, widget):
+        old = Steps(5)
+        scheduler.start(old)
+        new = Steps(2)
+        scheduler.start(new)
+        _frame(widget, FakeFrameClock())
+        assert len(old.budgets) == 1
+        assert len(new.budgets) == 2
+        assert len(widget.callbacks) == 0
+
+    def test_cancel(self, scheduler, widget):
+        step = Steps(5)
+        scheduler.start(step)
+        scheduler.cancel()
+        assert not scheduler.busy
+        assert widget.callbacks == {}
+
+
+# ---------------------------------------------------------------------------
+# Skipped frames
+# ---------------------------------------------------------------------------
+
+
+class TestSkippedFrames:
+    def test_counts_frames_the_clock_skipped(self, scheduler, widget):
+        scheduler.start(Steps(4))
+        clock = FakeFrameClock()
+        _frame(widget, clock)
+        _frame(widget, clock, frames=3)
+        _frame(widget, clock)
+        assert scheduler.skipped == 2
+        assert scheduler.total_skipped == 2
+
+    def test_smooth_build_skips_nothing(self, scheduler, widget):
+        scheduler.start(Steps(3))
+        clock = FakeFrameClock()
+        _frame(widget, clock)
+        _frame(widget, clock)
+        assert scheduler.skipped == 0
+
+    def test_total_adds_up_builds(self, scheduler, widget):
+        clock = FakeFrameClock()
+        for _ in range(2):
+            scheduler.start(Steps(3))
+            _frame(widget, clock)
+            _frame(widget, clock, frames=2)
+        assert scheduler.skipped == 1
+        assert scheduler.total_skipped == 2
+
+
+# ---------------------------------------------------------------------------
+# Row cost
+# ---------------------------------------------------------------------------
+
+
+class TestRowCost:
+    def test_default_until_measured(self, scheduler):
+        assert scheduler.rows_within(0.008, default=12) == 12
+
+    def test_rows_fitting_the_budget(self, scheduler):
+        scheduler.record(10, 0.010)
+        assert scheduler.rows_within(0.008, default=12) == 8
+
+    def test_at_least_one_row(self, scheduler):
+        scheduler.record(1, 0.050)
+        assert scheduler.rows_within(0.008, default=12) == 1
+
+    def test_cost_is_smoothed(self, scheduler):
+        scheduler.record(10, 0.010)
+        scheduler.record(10, 0.020)
+        assert scheduler.rows_within(0.012, default=12) == 10
+
+    def test_no_rows_is_not_a_measurement(self, scheduler):
+        scheduler.record(0, 0.005)
+        assert scheduler.rows_within(0.008, default=12) == 12
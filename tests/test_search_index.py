@@ -0,0 +1,316 @@
+"""Tests for clipse_gui/search_index.py — SearchIndex sync and indexed fuzzy_search."""
+
+import random
+
+import pytest
+
+from clipse_gui.search_index import SearchFieldCache, SearchIndex, build_search_fields
+from clipse_gui.utils import SearchCancelled, fuzzy_search
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _make_item(value, pinned=False, file_path="", recorded="2024-01-01T00:00:00"):
+    return {"value": value, "pinned": pinned, "filePath": file_path, "recorded": recorded}
+
+
+def _indexed(items):
+    index = SearchIndex()
+    index.sync(items)
+    return index
+
+
+def _summary(results):
+    return [(r["original_index"], r["match_quality"]) for r in results]
+
+
+_WORDS = [
+    "hello", "world", "config", "configuration", "conf", "python", "typhon",
+    "clipboard", "history", "foo", "foobar", "bar", "baz", "image.png",
+    "/home/user/photo.png", "Résumé", "naïve", "log", "error", "errno",
+]
+
+
+def _random_corpus(rng, count):
+    items = []
+    for i in range(count):
+        words = rng.choices(_WORDS, k=rng.randint(0, 6))
+        file_path = "/tmp/" + rng.choice(_WORDS) if rng.random() < 0.2 else ""
+        items.append(
+            _make_item(
+                " ".join(words),
+                pinned=rng.random() < 0.3,
+                file_path=file_path,
+                recorded=f"2024-01-01T00:00:{i:02d}",
+            )
+        )
+    return items
+
+
+# ---------------------------------------------------------------------------
+# Equivalence with the linear scan
+# ---------------------------------------------------------------------------
+
+class TestIndexedFuzzySearch:
+    @pytest.mark.parametrize("term", [
+        "hel", "hello world", "conf", "configx", "foobar", "foobarbaz",
+        "helo", "PHOTO", "png", "résumé", "err log", "zzzz", "foo foo",
+    ])
+    @pytest.mark.parametrize("only_pinned", [False, True])
+    def test_matches_linear_scan(self, term, only_pinned):
+        items = _random_corpus(random.Random(7), 60)
+        index = _indexed(items)
+        expected = fuzzy_search(items, term, show_only_pinned=only_pinned)
+        actual = fuzzy_search(
+            items, term, show_only_pinned=only_pinned, search_index=index
+        )
+        assert _summary(actual) == _summary(expected)
+
+    @pytest.mark.parametrize("term", ["helo", "confg", "typhon", "err log"])
+    def test_pure_python_similarity_matches_linear_scan(self, term):
+        items = _random_corpus(random.Random(9), 60)
+        index = SearchIndex(use_numpy=False)
+        index.sync(items)
+        expected = fuzzy_search(items, term)
+        assert _summary(fuzzy_search(items, term, search_index=index)) == _summary(expected)
+
+    @pytest.mark.parametrize("term", [
+        "helo", "confg", "configuratoin", "pyhton", "hello wrld", "clipbaord", "zzzz",
+    ])
+    def test_edit_distance_matcher_matches_linear_scan(self, term):
+        items = _random_corpus(random.Random(13), 60)
+        index = SearchIndex(fuzzy_matcher="edit_distance")
+        index.sync(items)
+        expected = fuzzy_search(items, term, fuzzy_matcher="edit_distance")
+        assert _summary(fuzzy_search(items, term, search_index=index)) == _summary(expected)
+
+    def test_edit_distance_matcher_rejects_anagrams(self):
+        items = [_make_item("python"), _make_item("typhon")]
+        charset = fuzzy_search(items, "pythn")
+        edit = fuzzy_search(items, "pythn", fuzzy_matcher="edit_distance")
+        assert [r["original_index"] for r in charset] == [0, 1]
+        assert [r["original_index"] for r in edit] == [0]
+
+    def test_unknown_fuzzy_matcher_is_rejected(self):
+        with pytest.raises(ValueError):
+            SearchIndex(fuzzy_matcher="soundex")
+
+    def test_results_reference_original_items(self):
+        items = [_make_item("alpha"), _make_item("beta")]
+        results = fuzzy_search(items, "beta", search_index=_indexed(items))
+        assert results[0]["item"] is items[1]
+        assert results[0]["original_index"] == 1
+
+    def test_ties_keep_history_order(self):
+        items = [_make_item("foo one"), _make_item("foo two"), _make_item("foo three")]
+        results = fuzzy_search(items, "foo", search_index=_indexed(items))
+        assert [r["original_index"] for r in results] == [0, 1, 2]
+
+    def test_none_file_path_is_ignored(self):
+        items = [{"value": "hello", "filePath": None, "recorded": "x"}]
+        results = fuzzy_search(items, "hello", search_index=_indexed(items))
+        assert len(results) == 1
+
+
+# ---------------------------------------------------------------------------
+# Incremental maintenance
+# ---------------------------------------------------------------------------
+
+class TestSync:
+    def test_new_item_becomes_searchable(self):
+        items = [_make_item("alpha")]
+        index = _indexed(items)
+        items.insert(0, _make_item("gamma", recorded="2024-02-01"))
+        index.sync(items)
+        results = fuzzy_search(items, "gamma", search_index=index)
+        assert [r["original_index"] for r in results] == [0]
+        assert len(index) == 2
+
+    def test_removed_item_drops_out(self):
+        items = [_make_item("alpha"), _make_item("beta")]
+        index = _indexed(items)
+        del items[0]
+        index.sync(items)
+        assert fuzzy_search(items, "alpha", search_index=index) == []
+        assert fuzzy_search(items, "beta", search_index=index)[0]["original_index"] == 0
+        assert "alpha" not in index._postings
+
+    def test_reloaded_items_are_not_retokenized(self, monkeypatch):
+        items = _random_corpus(random.Random(3), 20)
+        index = _indexed(items)
+        reloaded = [dict(item) for item in items]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("unchanged item was re-tokenized")
+
+        monkeypatch.setattr("clipse_gui.search_index.build_search_fields", fail)
+        index.sync(reloaded)
+        results = fuzzy_search(reloaded, "hello", search_index=index)
+        assert all(r["item"] is reloaded[r["original_index"]] for r in results)
+
+    def test_duplicate_content_is_tracked_separately(self):
+        items = [_make_item("same"), _make_item("same")]
+        index = _indexed(items)
+        assert len(fuzzy_search(items, "same", search_index=index)) == 2
+        index.sync([dict(items[0])])
+        assert len(index) == 1
+
+
+# ---------------------------------------------------------------------------
+# Trigram substring lookup
+# ---------------------------------------------------------------------------
+
+class TestTrigramLookup:
+    def test_finds_infix_substring(self):
+        index = _indexed([_make_item("configuration file")])
+        assert index._words_containing("figur") == ["configuration"]
+
+    def test_requires_every_trigram(self):
+        index = _indexed([_make_item("abcdef abxyz")])
+        assert index._words_containing("abcx") == []
+
+    def test_short_tokens_fall_back_to_scan(self):
+        index = _indexed([_make_item("ab cab xyz")])
+        assert sorted(index._words_containing("ab")) == ["ab", "cab"]
+
+    def test_removed_words_leave_no_trigrams(self):
+        items = [_make_item("unique"), _make_item("other")]
+        index = _indexed(items)
+        index.sync(items[1:])
+        assert "niq" not in index._trigram_words
+        assert "oth" in index._trigram_words
+
+
+# ---------------------------------------------------------------------------
+# Query cache and incremental narrowing
+# ---------------------------------------------------------------------------
+
+class TestQueryCache:
+    def _typed(self, query):
+        return [query[:i] for i in range(1, len(query) + 1)]
+
+    @pytest.mark.parametrize("query", ["configuration", "hello world", "foobarbaz"])
+    def test_typing_and_backspacing_match_linear_scan(self, query):
+        items = _random_corpus(random.Random(11), 80)
+        index = _indexed(items)
+        terms = self._typed(query)
+        for term in terms + terms[::-1]:
+            expected = fuzzy_search(items, term)
+            assert _summary(fuzzy_search(items, term, search_index=index)) == _summary(expected)
+
+    def test_narrowing_keeps_similarity_only_matches(self):
+        # "cnf" does not match "config", but the longer "cnfig" does through
+        # the similarity fallback, so it must not be narrowed away.
+        items = [_make_item("config")] + [_make_item(f"cnfigx{i}") for i in range(20)]
+        index = _indexed(items)
+        assert 0 not in [r["original_index"] for r in fuzzy_search(items, "cnf", search_index=index)]
+        results = fuzzy_search(items, "cnfig", search_index=index)
+        assert _summary(results) == _summary(fuzzy_search(items, "cnfig"))
+        assert 0 in [r["original_index"] for r in results]
+
+    def test_repeated_query_is_served_from_cache(self, monkeypatch):
+        items = [_make_item("hello world")]
+        index = _indexed(items)
+        first = index.search(["hello"])
+        monkeypatch.setattr(index, "_score_token", lambda *args: pytest.fail("cache miss"))
+        assert index.search(["hello"]) is first
+
+    def test_sync_invalidates_cache(self):
+        items = [_make_item("hello")]
+        index = _indexed(items)
+        assert len(index.search(["hello"])) == 1
+        items.append(_make_item("hello again", recorded="2024-02-01"))
+        index.sync(items)
+        assert len(index.search(["hello"])) == 2
+
+    def test_cache_is_bounded(self):
+        index = SearchIndex(cache_size=2)
+        index.sync([_make_item("a b c")])
+        for token in ["aaa", "bbb", "ccc"]:
+            index.search([token])
+        assert len(index._result_cache) == 2
+        assert ("aaa",) not in index._result_cache
+
+    def test_zero_cache_size_disables_caching(self):
+        index = SearchIndex(cache_size=0)
+        index.sync([_make_item("hello")])
+        index.search(["hello"])
+        assert not index._result_cache
+
+    def test_cancelled_search_caches_nothing(self):
+        index = _indexed([_make_item("hello world")])
+        with pytest.raises(SearchCancelled):
+            index.search(["helo"], cancelled=lambda: True)
+        assert not index._token_cache
+        assert not index._result_cache
+        assert len(index.search(["helo"])) == 1
+
+    def test_posting_walk_can_be_cancelled(self):
+        items = [_make_item(f"common {i}") for i in range(5000)]
+        index = _indexed(items)
+        with pytest.raises(SearchCancelled):
+            index._walk_postings([{"common": 100}], cancelled=lambda: True)
+        with pytest.raises(SearchCancelled):
+            index._score_candidates(
+                [id(item) for item in items], [{"common": 100}], cancelled=lambda: True
+            )
+
+    def test_linear_scan_can_be_cancelled(self):
+        with pytest.raises(SearchCancelled):
+            fuzzy_search([_make_item("hello")], "hello", cancelled=lambda: True)
+
+    def test_whitespace_only_query_matches_nothing(self):
+        items = [_make_item("hello")]
+        assert fuzzy_search(items, "   ", search_index=_indexed(items)) == []
+
+
+# ---------------------------------------------------------------------------
+# Precomputed search fields
+# ---------------------------------------------------------------------------
+
+class TestSearchFields:
+    def test_fields_are_lowercased_words(self):
+        fields = build_search_fields(_make_item("Hello  World", file_path="/Tmp/A.png"))
+        assert fields.words == {"hello", "world", "/tmp/a.png"}
+
+    def test_long_fields_are_truncated(self):
+        fields = build_search_fields(_make_item("abc " * 10 + "tail"), max_chars=8)
+        assert fields.words == {"abc"}
+        assert "tail" not in fields.words
+
+    def test_truncated_words_are_not_searchable(self):
+        items = [_make_item("short needle"), _make_item("x" * 50 + " needle")]
+        index = SearchIndex(field_cache=SearchFieldCache(max_chars=20))
+        index.sync(items)
+        results = fuzzy_search(items, "needle", search_index=index)
+        assert [r["original_index"] for r in results] == [0]
+
+    def test_prime_reuses_and_forgets_entries(self):
+        cache = SearchFieldCache()
+        kept, dropped = _make_item("kept"), _make_item("dropped", recorded="x")
+        cache.prime([kept, dropped])
+        fields = cache.get(kept)
+        cache.prime([dict(kept)])
+        assert len(cache) == 1
+        assert cache.get(dict(kept)) is fields
+
+    def test_forget_drops_entries(self):
+        cache = SearchFieldCache()
+        kept, dropped = _make_item("kept"), _make_item("dropped")
+        cache.prime([kept, dropped])
+        cache.forget([("2024-01-01T00:00:00", "dropped", "")])
+        assert len(cache) == 1
+
+    def test_index_uses_primed_fields(self, monkeypatch):
+        items = _random_corpus(random.Random(5), 20)
+        cache = SearchFieldCache()
+        cache.prime(items)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("primed item was re-tokenized")
+
+        monkeypatch.setattr("clipse_gui.search_index.build_search_fields", fail)
+        index = SearchIndex(field_cache=cache)
+        index.sync(items)
+        assert len(index) == 20
@@ -0,0 +1,103 @@
+"""Tests for clipse_gui/search_pool.py — sharded search in worker processes."""
+
+import random
+
+import pytest
+
+from clipse_gui.search_pool import PoolMatches, SearchPool
+from clipse_gui.utils import SearchCancelled, fuzzy_search
+from tests.test_search_index import _make_item, _random_corpus, _summary
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def shared_pool():
+    pool = SearchPool(2)
+    yield pool
+    pool.stop()
+
+
+@pytest.fixture
+def pool(shared_pool):
+    shared_pool.clear()
+    return shared_pool
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+class TestSearchPool:
+    @pytest.mark.parametrize("term", ["hel", "hello world", "helo", "png", "zzzz"])
+    def test_matches_linear_scan(self, pool, term):
+        items = _random_corpus(random.Random(7), 60)
+        pool.sync(items)
+        expected = fuzzy_search(items, term)
+        assert _summary(fuzzy_search(items, term, search_index=pool)) == _summary(expected)
+
+    def test_deltas_reach_the_shards(self, pool):
+        items = [_make_item("alpha"), _make_item("beta", recorded="2024-01-02")]
+        pool.sync(items)
+        items.insert(0, _make_item("gamma", recorded="2024-02-01"))
+        del items[1]
+        pool.sync(items)
+        assert fuzzy_search(items, "alpha", search_index=pool) == []
+        results = fuzzy_search(items, "gamma", search_index=pool)
+        assert [r["original_index"] for r in results] == [0]
+        assert fuzzy_search(items, "beta", search_index=pool)[0]["original_index"] == 1
+
+    def test_reloaded_items_keep_their_slots(self, pool):
+        items = [_make_item("alpha"), _make_item("beta", recorded="2024-01-02")]
+        pool.sync(items)
+        slots = sorted(pool._items)
+        reloaded = [dict(item) for item in items]
+        pool.sync(reloaded)
+        assert sorted(pool._items) == slots
+        results = fuzzy_search(reloaded, "beta", search_index=pool)
+        assert results[0]["item"] is reloaded[1]
+
+    def test_cancelled_search_raises(self, pool):
+        items = [_make_item("hello")]
+        pool.sync(items)
+        with pytest.raises(SearchCancelled):
+            pool.search(["hello"], cancelled=lambda: True)
+        # Replies to the abandoned query must not leak into the next one
+        assert pool.search(["hello"]) == {min(pool._items): 100}
+
+    @pytest.mark.parametrize("term", ["hel", "hello world", "helo", "png", "zzzz"])
+    def test_ranked_search_matches_linear_scan(self, pool, term):
+        items = _random_corpus(random.Random(11), 200)
+        pool.sync(items)
+        expected = fuzzy_search(items, term)
+        results = fuzzy_search(items, term, search_index=pool, top_k=3)
+        assert isinstance(results, PoolMatches)
+        assert len(results) == len(expected)
+        assert _summary(results) == _summary(expected)
+
+    def test_shards_send_only_their_best_matches(self, pool):
+        pool.sync([_make_item(f"hello {n}") for n in range(40)])
+        replies = pool._query(["hello"], 5, None)
+        assert [len(entries) for _, entries in replies] == [5, 5]
+        assert sum(count for count, _ in replies) == 40
+
+    def test_ranked_ties_follow_history_order_after_edits(self, pool):
+        items = [_make_item(f"hello {n}") for n in range(30)]
+        pool.sync(items)
+        items.insert(0, _make_item("hello front"))
+        items.insert(12, _make_item("hello middle"))
+        del items[20]
+        pool.sync(items)
+        results = fuzzy_search(items, "hello", search_index=pool, top_k=2)
+        assert [r["item"] for r in results] == items
+
+    def test_reordered_history_renumbers_order_keys(self, pool):
+        items = [_make_item(f"hello {n}") for n in range(30)]
+        pool.sync(items)
+        epoch = pool._order_epoch
+        items.reverse()
+        pool.sync(items)
+        assert pool._order_epoch != epoch
+        results = fuzzy_search(items, "hello", search_index=pool, top_k=2)
+        assert [r["item"] for r in results] == items
@@ -0,0 +1,93 @@
+"""Tests for clipse_gui/search_worker.py — background search with cancellation."""
+
+import threading
+
+import pytest
+
+from clipse_gui.search_worker import SearchWorker
+from clipse_gui.utils import SearchCancelled
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class _Recorder:
+    """Stands in for GLib.idle_add and collects delivered results."""
+
+    def __init__(self):
+        self.results = []
+        self.dispatched = threading.Event()
+
+    def dispatch(self, func, *args):
+        func(*args)
+        self.dispatched.set()
+
+    def on_done(self, result):
+        self.results.append(result)
+
+
+@pytest.fixture
+def recorder():
+    return _Recorder()
+
+
+@pytest.fixture
+def worker(recorder):
+    worker = SearchWorker(dispatch=recorder.dispatch)
+    yield worker
+    worker.stop()
+
+
+def _blocking_search(started, release, result="slow"):
+    def search(cancelled):
+        started.set()
+        release.wait(5)
+        if cancelled():
+            raise SearchCancelled()
+        return result
+
+    return search
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+class TestSearchWorker:
+    def test_result_is_delivered(self, worker, recorder):
+        worker.submit(lambda cancelled: ["a"], recorder.on_done)
+        assert recorder.dispatched.wait(5)
+        assert recorder.results == [["a"]]
+
+    def test_new_submission_cancels_running_search(self, worker, recorder):
+        started, release = threading.Event(), threading.Event()
+        worker.submit(_blocking_search(started, release), recorder.on_done)
+        assert started.wait(5)
+        worker.submit(lambda cancelled: "latest", recorder.on_done)
+        release.set()
+        assert recorder.dispatched.wait(5)
+        assert recorder.results == ["latest"]
+
+    def test_stale_result_is_not_delivered(self, recorder):
+        queued = []
+        dispatched = threading.Event()
+
+        def dispatch(func, *args):
+            queued.append((func, args))
+            dispatched.set()
+
+        worker = SearchWorker(dispatch=dispatch)
+        worker.submit(lambda cancelled: "old", recorder.on_done)
+        assert dispatched.wait(5)
+        # The term changes while the result is waiting for the main loop
+        worker.cancel()
+        func, args = queued[0]
+        func(*args)
+        assert recorder.results == []
+        worker.stop()
+
+    def test_errors_do_not_stop_the_worker(self, worker, recorder):
+        worker.submit(lambda cancelled: 1 / 0, recorder.on_done)
+        worker.submit(lambda cancelled: "ok", recorder.on_done)
+        assert recorder.dispatched.wait(5)
+        assert recorder.results == ["ok"]
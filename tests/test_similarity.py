@@ -0,0 +1,76 @@
+"""Tests for clipse_gui/similarity.py — vectorized character-set similarity."""
+
+import random
+import string
+
+import pytest
+
+from clipse_gui.utils import _calculate_similarity
+
+np = pytest.importorskip("numpy")
+
+from clipse_gui.similarity import BitmaskScorer
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _expected(words, token, threshold=0.7):
+    result = {}
+    for word in words:
+        if len(word) > 2:
+            similarity = _calculate_similarity(word, token)
+            if similarity > threshold:
+                result[word] = similarity
+    return result
+
+
+def _random_words(rng, count, alphabet=string.ascii_lowercase):
+    return {
+        "".join(rng.choices(alphabet, k=rng.randint(1, 12))) for _ in range(count)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+class TestBitmaskScorer:
+    @pytest.mark.parametrize("token", ["hello", "helo", "abc", "zzzzzz", "a", ""])
+    def test_matches_calculate_similarity_exactly(self, token):
+        words = _random_words(random.Random(1), 3000, "abcdehlnoz")
+        scorer = BitmaskScorer()
+        for word in words:
+            scorer.add(word)
+        assert dict(scorer.similarities(token, 0.7)) == _expected(words, token)
+
+    def test_more_than_64_distinct_characters(self):
+        alphabet = string.ascii_letters + string.digits + "éèàüößçñ"
+        words = _random_words(random.Random(2), 500, alphabet)
+        scorer = BitmaskScorer()
+        for word in words:
+            scorer.add(word)
+        for token in ["Résumé", "naïve", "ABCxyz09"]:
+            assert dict(scorer.similarities(token, 0.5)) == _expected(words, token, 0.5)
+
+    def test_removed_words_are_not_returned_and_rows_recycled(self):
+        scorer = BitmaskScorer()
+        for word in ["hello", "hellos", "world"]:
+            scorer.add(word)
+        scorer.remove("hellos")
+        assert dict(scorer.similarities("hello", 0.7)) == {"hello": 1.0}
+        scorer.add("helloo")
+        assert "helloo" in scorer
+        assert len(scorer) == 3
+
+    def test_short_words_are_ignored(self):
+        scorer = BitmaskScorer()
+        scorer.add("ab")
+        assert len(scorer) == 0
+
+    def test_grows_past_initial_capacity(self):
+        words = _random_words(random.Random(3), 5000)
+        scorer = BitmaskScorer()
+        for word in words:
+            scorer.add(word)
+        assert dict(scorer.similarities("random", 0.7)) == _expected(words, "random")
@@ -1,4 +1,5 @@
-"""Tests for clipse_gui/ui/text.py — escape_markup, highlight_search_term, _format_text_content.
+"""Tests for clipse_gui/ui/text.py — escape_markup, highlight_search_term, highlight_spans,
+_format_text_content.
 
 gi.require_version is handled by conftest.py before this module is collected.
 """
@@ -12,6 +13,7 @@ from clipse_gui.ui.text import (
     _format_text_content,
     escape_markup,
     highlight_search_term,
+    highlight_spans,
 )
 
 
@@ -126,6 +128,30 @@ class TestHighlightSearchTerm:
         assert result.count(HIGHLIGHT_SPAN) == expected_count
 
 
+# ---------------------------------------------------------------------------
+# highlight_spans
+# ---------------------------------------------------------------------------
+
+class TestHighlightSpans:
+    def test_no_spans_returns_escaped_text(self):
+        assert highlight_spans("a <b>", []) == "a &lt;b&gt;"
+
+    def test_spans_are_wrapped(self):
+        result = highlight_spans("hello big world", [(0, 5), (10, 15)])
+        assert result == (
+            f"{HIGHLIGHT_SPAN}hello{HIGHLIGHT_CLOSE} big "
+            f"{HIGHLIGHT_SPAN}world{HIGHLIGHT_CLOSE}"
+        )
+
+    def test_highlighted_text_is_escaped(self):
+        result = highlight_spans("x <tag> y", [(2, 7)])
+        assert f"{HIGHLIGHT_SPAN}&lt;tag&gt;{HIGHLIGHT_CLOSE}" in result
+
+    def test_spans_past_the_end_are_clipped(self):
+        result = highlight_spans("hello", [(3, 9), (12, 15)])
+        assert result == f"hel{HIGHLIGHT_SPAN}lo{HIGHLIGHT_CLOSE}"
+
+
 # ---------------------------------------------------------------------------
 # _format_text_content
 # ---------------------------------------------------------------------------
@@ -0,0 +1,85 @@
+"""Tests for clipse_gui/typo_index.py — edit-distance lookups over a vocabulary."""
+
+import random
+
+import pytest
+
+from clipse_gui.typo_index import TypoIndex
+from clipse_gui.utils import SearchCancelled, _levenshtein
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _brute_force(words, token, max_distance):
+    return sorted(
+        (word, _levenshtein(word, token))
+        for word in words
+        if _levenshtein(word, token) <= max_distance
+    )
+
+
+def _random_words(rng, count):
+    return {
+        "".join(rng.choices("abcdefgh", k=rng.randint(1, 9))) for _ in range(count)
+    }
+
+
+# ---------------------------------------------------------------------------
+# _levenshtein
+# ---------------------------------------------------------------------------
+
+class TestLevenshtein:
+    @pytest.mark.parametrize("a, b, expected", [
+        ("", "", 0),
+        ("abc", "", 3),
+        ("kitten", "sitting", 3),
+        ("flaw", "lawn", 2),
+        ("config", "cnofig", 2),
+        ("same", "same", 0),
+    ])
+    def test_distance(self, a, b, expected):
+        assert _levenshtein(a, b) == expected
+        assert _levenshtein(b, a) == expected
+
+    def test_cutoff_reports_one_past_the_limit(self):
+        assert _levenshtein("kitten", "sitting", 1) == 2
+        assert _levenshtein("a", "abcdef", 2) == 3
+        assert _levenshtein("flaw", "lawn", 2) == 2
+
+
+# ---------------------------------------------------------------------------
+# TypoIndex
+# ---------------------------------------------------------------------------
+
+class TestTypoIndex:
+    @pytest.mark.parametrize("max_distance", [0, 1, 2])
+    def test_find_matches_brute_force(self, max_distance):
+        words = _random_words(random.Random(4), 800)
+        index = TypoIndex(words)
+        for token in ["abcde", "hgfedcba", "aaaa", "bad", "cafebabe", "", "a"]:
+            assert sorted(index.find(token, max_distance)) == _brute_force(
+                words, token, max_distance
+            )
+
+    def test_prefixes_of_other_words_are_found(self):
+        index = TypoIndex(["abc", "abcd", "abcde", "abd"])
+        assert sorted(index.find("abc", 1)) == [("abc", 0), ("abcd", 1), ("abd", 1)]
+
+    def test_added_and_removed_words(self):
+        index = TypoIndex(["hello", "hallo"])
+        index.add("hullo")
+        index.remove("hallo")
+        index.add("hallo")
+        index.remove("hullo")
+        assert sorted(index.find("hello", 1)) == [("hallo", 1), ("hello", 0)]
+        assert len(index) == 2
+        assert "hullo" not in index
+
+    def test_cancelled_lookup_raises(self):
+        index = TypoIndex(_random_words(random.Random(6), 5000))
+        with pytest.raises(SearchCancelled):
+            index.find("abcdefgh", 2, cancelled=lambda: True)
+
+    def test_empty_index(self):
+        assert TypoIndex().find("anything", 2) == []
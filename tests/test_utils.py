@@ -1,11 +1,17 @@
-"""Tests for clipse_gui/utils.py — format_date, fuzzy_search, _calculate_similarity."""
+"""Tests for clipse_gui/utils.py — format_date, fuzzy_search, RankedMatches, _calculate_similarity."""
 
 from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from clipse_gui.utils import _calculate_similarity, format_date, fuzzy_search
-
+from clipse_gui.utils import (
+    MATCH_SPAN_CHARS,
+    RankedMatches,
+    _calculate_similarity,
+    format_date,
+    fuzzy_search,
+    match_spans,
+)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -225,6 +231,98 @@ class TestFuzzySearch:
         assert results == []
 
 
+class TestFuzzySearchTopK:
+    def _items(self):
+        words = ["hello", "help", "helo world", "shell", "hello hello", "yellow"]
+        return [_make_item(f"{words[i % len(words)]} {i}") for i in range(60)]
+
+    def test_matches_full_sort(self):
+        items = self._items()
+        expected = fuzzy_search(items, "hel")
+        results = fuzzy_search(items, "hel", top_k=5)
+        assert isinstance(results, RankedMatches)
+        assert len(results) == len(expected)
+        assert list(results) == expected
+
+    def test_only_head_is_ranked_up_front(self):
+        results = fuzzy_search(self._items(), "hel", top_k=5)
+        assert len(results._ranked) == 5
+        results[12]
+        assert len(results._ranked) == 13
+
+    def test_slices_and_negative_indices(self):
+        items = self._items()
+        expected = fuzzy_search(items, "hel")
+        results = fuzzy_search(items, "hel", top_k=3)
+        assert results[2:8] == expected[2:8]
+        assert results[-1] == expected[-1]
+        with pytest.raises(IndexError):
+            results[len(expected)]
+
+    def test_delete_ranks_only_up_to_the_match(self):
+        items = self._items()
+        expected = fuzzy_search(items, "hel")
+        results = fuzzy_search(items, "hel", top_k=3)
+        del results[4]
+        assert len(results._ranked) == 4
+        del expected[4]
+        assert len(results) == len(expected)
+        assert list(results) == expected
+
+    def test_empty_search_is_unaffected(self):
+        items = self._items()
+        assert fuzzy_search(items, "", top_k=5) == fuzzy_search(items, "")
+
+
+# ---------------------------------------------------------------------------
+# match_spans
+# ---------------------------------------------------------------------------
+
+class TestMatchSpans:
+    def test_each_token_is_located(self):
+        assert match_spans("Hello big World", ["world", "hello"]) == [(0, 5), (10, 15)]
+
+    def test_all_occurrences(self):
+        assert match_spans("cat cat", ["cat"]) == [(0, 3), (4, 7)]
+
+    def test_overlapping_spans_are_merged(self):
+        assert match_spans("foobar", ["foo", "oba"]) == [(0, 5)]
+
+    def test_prefix_word(self):
+        # "conf" is a word the token starts with
+        assert match_spans("edit conf now", ["config"]) == [(5, 9)]
+
+    def test_fuzzy_word(self):
+        assert match_spans("say helo there", ["hello"]) == [(4, 8)]
+
+    def test_edit_distance_word(self):
+        text = "python typhon"
+        assert match_spans(text, ["pythn"], "edit_distance") == [(0, 6)]
+
+    def test_unmatched_token_adds_nothing(self):
+        assert match_spans("hello", ["zzzz"]) == []
+
+    def test_offsets_survive_lowercasing(self):
+        text = "İstanbul hello"
+        assert match_spans(text, ["hello"]) == [(9, 14)]
+
+    def test_fuzzy_search_attaches_spans(self):
+        items = [_make_item("say hello"), _make_item("hello hello")]
+        results = fuzzy_search(items, "hello", with_spans=True)
+        assert [r["match_spans"] for r in results] == [[(4, 9)], [(0, 5), (6, 11)]]
+
+    def test_ranked_matches_attach_spans_lazily(self):
+        items = [_make_item(f"hello {i}") for i in range(10)]
+        results = fuzzy_search(items, "hello", top_k=2, with_spans=True)
+        assert "match_spans" not in results._heap[0][2]
+        assert results[5]["match_spans"] == [(0, 5)]
+
+    def test_spans_cover_only_the_start_of_long_values(self):
+        items = [_make_item("x" * MATCH_SPAN_CHARS + " hello")]
+        results = fuzzy_search(items, "hello", with_spans=True)
+        assert results[0]["match_spans"] == []
+
+
 # ---------------------------------------------------------------------------
 # _calculate_similarity
 # ---------------------------------------------------------------------------